@@ -0,0 +1,39 @@
+import os
+
+# Benchmarks run against the test database, never production
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+import pytest
+from models import db
+from database import reset_database
+from benchmarks.synthetic_data import build_catalogue
+
+
+def _size(name, default):
+    return int(os.environ.get(f'BENCH_{name}', default))
+
+
+@pytest.fixture(scope='session')
+def catalogue():
+    """
+    Builds one synthetic catalogue for the whole benchmark session.
+    Sizes come from BENCH_FILAMENTS, BENCH_PRODUCTS, BENCH_PARTS, BENCH_SALES and BENCH_DAYS.
+    """
+    reset_database()
+    db.connect(reuse_if_open=True)
+    sizes = build_catalogue(
+        filaments=_size('FILAMENTS', 30),
+        products=_size('PRODUCTS', 200),
+        parts_per_product=_size('PARTS', 3),
+        sales=_size('SALES', 5000),
+        days=_size('DAYS', 365),
+    )
+    yield sizes
+    db.close()
+
+
+@pytest.fixture(autouse=True)
+def _record_catalogue_size(request, catalogue):
+    """Stores the catalogue size with each result so baselines are comparable."""
+    if 'benchmark' in request.fixturenames:
+        request.getfixturevalue('benchmark').extra_info.update(catalogue)
@@ -0,0 +1,91 @@
+"""
+Synthetic catalogue generator for benchmarks.
+
+Builds N filaments, M products with K parts each, and S sales (single-line
+orders of 1-4 units) spread over the last D days. Rows are written with
+multi-row INSERTs so that large catalogues build in seconds.
+"""
+from models import db, Filament, Product, Part, ProductFilament, PartFilament, Order, OrderLine
+from peewee import chunked
+from datetime import datetime, timedelta
+from decimal import Decimal
+import random
+
+INSERT_BATCH_SIZE = 100
+
+
+def build_catalogue(filaments=30, products=200, parts_per_product=3, sales=5000, days=365, seed=42):
+    """
+    Populates the current database (expected to be empty) and returns a dict
+    with the created counts.
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+
+    with db.atomic():
+        _insert(Filament, [
+            {
+                'brand': 'Synthetic',
+                'material': rng.choice(['PLA', 'PETG', 'ABS']),
+                'color': f'Color {i}',
+                'cost_per_roll': Decimal(rng.randint(1200, 3000)) / 100,
+                'grams_per_roll': Decimal('1000'),
+                'grams_remaining': Decimal(rng.randint(0, 1000)),
+                'rolls_in_stock': rng.randint(0, 5),
+            }
+            for i in range(filaments)
+        ])
+        filament_ids = [f.id for f in Filament.select(Filament.id)]
+
+        _insert(Product, [
+            {
+                'product_type': f'Type {i // 10}',
+                'size': f'Size {i % 10}',
+                'color_variant': f'Variant {i}',
+                'inventory_count': rng.randint(0, 10),
+            }
+            for i in range(products)
+        ])
+        product_ids = [p.id for p in Product.select(Product.id)]
+
+        # Every product has a little direct usage; parts carry the bulk
+        _insert(ProductFilament, [
+            {'product': pid, 'filament': rng.choice(filament_ids), 'grams_needed': Decimal(rng.randint(1, 20))}
+            for pid in product_ids
+        ])
+        _insert(Part, [
+            {'product': pid, 'name': f'Part {k}', 'print_time_hours': Decimal(rng.randint(10, 600)) / 100}
+            for pid in product_ids for k in range(parts_per_product)
+        ])
+        part_ids = [p.id for p in Part.select(Part.id)]
+        _insert(PartFilament, [
+            {'part': part_id, 'filament': fid, 'grams_needed': Decimal(rng.randint(5, 400))}
+            for part_id in part_ids for fid in rng.sample(filament_ids, min(2, len(filament_ids)))
+        ])
+
+        dates = [now - timedelta(days=rng.uniform(0, days)) for _ in range(sales)]
+        _insert(Order, [{'date': date} for date in dates])
+        order_ids = [o.id for o in Order.select(Order.id).order_by(Order.id)]
+        _insert(OrderLine, [
+            {
+                'order': order_id,
+                'date': date,
+                'product': rng.choice(product_ids),
+                'quantity': rng.randint(1, 4),
+                'total_value': Decimal(rng.randint(1000, 8000)) / 100,
+            }
+            for order_id, date in zip(order_ids, dates)
+        ])
+
+    return {
+        'filaments': filaments,
+        'products': products,
+        'parts': len(part_ids),
+        'sales': sales,
+        'days': days,
+    }
+
+
+def _insert(model, rows):
+    for batch in chunked(rows, INSERT_BATCH_SIZE):
+        model.insert_many(batch).execute()
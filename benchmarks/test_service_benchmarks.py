@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from models import Product
+from services.inventory_service import InventoryService
+
+
+def test_get_analytics_data_last_year(benchmark):
+    end = datetime.now() + timedelta(days=1)
+    start = end - timedelta(days=366)
+    data = benchmark(InventoryService.get_analytics_data, start, end)
+    assert data['total_sales_count'] > 0
+
+
+def test_get_todo_data(benchmark):
+    benchmark(InventoryService.get_todo_data)
+
+
+def test_calculate_printable_counts_all_products(benchmark):
+    products = list(InventoryService.get_all_products())
+    benchmark(InventoryService.calculate_printable_counts, products)
+
+
+def test_create_sale_bulk_order(benchmark):
+    product = Product.select().first()
+    benchmark(InventoryService.create_sale, product, 50, Decimal('500.00'))
+
+
+def test_overview_refresh_data(benchmark):
+    """The service calls OverviewView.refresh makes: products, printable counts, filaments, to-do."""
+    def run():
+        products = list(InventoryService.get_all_products())
+        printable = InventoryService.calculate_printable_counts(products)
+        filaments = list(InventoryService.get_all_filaments())
+        todo = InventoryService.get_todo_data()
+        return products, printable, filaments, todo
+
+    benchmark(run)
+
+
+def test_sales_view_refresh_data(benchmark):
+    """The data SalesView.refresh renders: the first page of sales and their labels."""
+    def run():
+        sales, _ = InventoryService.get_sales_page()
+        return [str(sale) for sale in sales]
+
+    benchmark(run)
+
+
+def test_product_and_filament_lists(benchmark):
+    def run():
+        return list(InventoryService.get_all_products()), list(InventoryService.get_all_filaments())
+
+    benchmark(run)
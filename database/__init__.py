@@ -1,2 +1,2 @@
-from .db_manager import initialize_database, reset_database
+from .db_manager import initialize_database, reset_database, rebuild_sales_rollup
 from .seed_data import seed_example_data
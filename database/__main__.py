@@ -0,0 +1,35 @@
+"""
+Database maintenance commands.
+
+Usage:
+    python -m database rebuild-rollup
+    python -m database seed
+
+Set INVENTORYMANAGER_ENV=test to run a command against the test database.
+"""
+import argparse
+from models import db
+from . import initialize_database, rebuild_sales_rollup, seed_example_data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m database", description="InventoryManager database maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild-rollup", help="Recompute the daily sales rollup from the sale table")
+    subparsers.add_parser("seed", help="Add the example filaments, product and sales")
+    args = parser.parse_args(argv)
+
+    initialize_database()
+    db.connect(reuse_if_open=True)
+    try:
+        if args.command == "rebuild-rollup":
+            rebuild_sales_rollup()
+        elif args.command == "seed":
+            seed_example_data()
+    finally:
+        if not db.is_closed():
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
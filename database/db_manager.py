@@ -1,11 +1,100 @@
-from models import db, Filament, FilamentPurchase, Product, Part, ProductFilament, PartFilament, Sale
+from models import (db, Filament, FilamentPurchase, Product, Part, ProductFilament, PartFilament, Order,
+                    OrderLine, OrderLineFilament, DailySalesRollup, StockMovement, StockSnapshot, Metadata)
+from models.base import notify_write
+from peewee import fn, Case, OperationalError
+from .migrations import apply_migrations, get_schema_version, set_schema_version, LATEST_VERSION
+
+MODELS = [Filament, FilamentPurchase, Product, Part, ProductFilament, PartFilament, Order, OrderLine,
+          OrderLineFilament, DailySalesRollup, StockMovement, StockSnapshot, Metadata]
+
+# Keeps DailySalesRollup in step with the orderline table. Triggers run inside
+# the writing statement's transaction, so every write path (InventoryService,
+# seeding, bulk inserts, cascading product deletes) updates the rollup atomically.
+ROLLUP_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS orderline_rollup_insert AFTER INSERT ON orderline
+    BEGIN
+        INSERT INTO dailysalesrollup (date, product_id, units, revenue, cost, costed_units)
+        VALUES (date(NEW.date), NEW.product_id, NEW.quantity, ROUND(NEW.total_value, 2),
+                ROUND(COALESCE(NEW.unit_cost, 0) * NEW.quantity, 2),
+                CASE WHEN NEW.unit_cost IS NULL THEN 0 ELSE NEW.quantity END)
+        ON CONFLICT (date, product_id) DO UPDATE
+        SET units = units + excluded.units, revenue = ROUND(revenue + excluded.revenue, 2),
+            cost = ROUND(cost + excluded.cost, 2), costed_units = costed_units + excluded.costed_units;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS orderline_rollup_delete AFTER DELETE ON orderline
+    BEGIN
+        UPDATE dailysalesrollup
+        SET units = units - OLD.quantity, revenue = ROUND(revenue - OLD.total_value, 2),
+            cost = ROUND(cost - ROUND(COALESCE(OLD.unit_cost, 0) * OLD.quantity, 2), 2),
+            costed_units = costed_units - CASE WHEN OLD.unit_cost IS NULL THEN 0 ELSE OLD.quantity END
+        WHERE date = date(OLD.date) AND product_id = OLD.product_id;
+        DELETE FROM dailysalesrollup
+        WHERE date = date(OLD.date) AND product_id = OLD.product_id AND units <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS orderline_rollup_update
+    AFTER UPDATE OF date, product_id, quantity, total_value, unit_cost ON orderline
+    BEGIN
+        UPDATE dailysalesrollup
+        SET units = units - OLD.quantity, revenue = ROUND(revenue - OLD.total_value, 2),
+            cost = ROUND(cost - ROUND(COALESCE(OLD.unit_cost, 0) * OLD.quantity, 2), 2),
+            costed_units = costed_units - CASE WHEN OLD.unit_cost IS NULL THEN 0 ELSE OLD.quantity END
+        WHERE date = date(OLD.date) AND product_id = OLD.product_id;
+        DELETE FROM dailysalesrollup
+        WHERE date = date(OLD.date) AND product_id = OLD.product_id AND units <= 0;
+        INSERT INTO dailysalesrollup (date, product_id, units, revenue, cost, costed_units)
+        VALUES (date(NEW.date), NEW.product_id, NEW.quantity, ROUND(NEW.total_value, 2),
+                ROUND(COALESCE(NEW.unit_cost, 0) * NEW.quantity, 2),
+                CASE WHEN NEW.unit_cost IS NULL THEN 0 ELSE NEW.quantity END)
+        ON CONFLICT (date, product_id) DO UPDATE
+        SET units = units + excluded.units, revenue = ROUND(revenue + excluded.revenue, 2),
+            cost = ROUND(cost + excluded.cost, 2), costed_units = costed_units + excluded.costed_units;
+    END
+    """,
+]
+
+def _create_schema():
+    db.create_tables(MODELS)
+    for trigger_sql in ROLLUP_TRIGGERS:
+        db.execute_sql(trigger_sql)
+
+def _stored_schema_version():
+    """The schema version recorded in the database, or None before the metadata table exists."""
+    try:
+        return get_schema_version()
+    except OperationalError:
+        return None
 
 def initialize_database():
-    """Create all tables if they don't exist"""
-    db.connect()
-    db.create_tables([Filament, FilamentPurchase, Product, Part, ProductFilament, PartFilament, Sale])
+    """
+    Create all tables if they don't exist and migrate existing databases to the current schema.
+    A database already at the latest schema version is left alone after one metadata query.
+    A connection the calling thread already has open (e.g. the service worker's) is reused
+    and left open.
+    """
+    opened = db.connect(reuse_if_open=True)
+    if _stored_schema_version() == LATEST_VERSION:
+        if opened:
+            db.close()
+        return
+    if not Product.table_exists():
+        # New database: create_tables builds the current schema directly
+        _create_schema()
+        set_schema_version(LATEST_VERSION)
+    else:
+        rollup_missing = not DailySalesRollup.table_exists()
+        apply_migrations()
+        _create_schema()
+        if rollup_missing and OrderLine.select().exists():
+            # Existing database from before the rollup table: backfill it once
+            rebuild_sales_rollup()
     print("Database initialized successfully!")
-    db.close()
+    if opened:
+        db.close()
 
 def reset_database():
     """Drop and recreate all tables (USE WITH CAUTION)"""
@@ -17,7 +106,34 @@ def reset_database():
     for table in all_tables:
         db.execute_sql(f'DROP TABLE IF EXISTS "{table}";')
     db.execute_sql('PRAGMA foreign_keys = ON;')
-    
-    db.create_tables([Filament, FilamentPurchase, Product, Part, ProductFilament, PartFilament, Sale])
+
+    _create_schema()
+    set_schema_version(LATEST_VERSION)
+    # Caches derived from the old contents are now meaningless
+    notify_write(None)
     print("Database reset complete!")
-    db.close()
\ No newline at end of file
+    db.close()
+
+def rebuild_sales_rollup():
+    """
+    Recomputes DailySalesRollup from the orderline table.
+    Needed once for databases created before the rollup existed, or to repair it.
+    """
+    day = fn.date(OrderLine.date)
+    costed = Case(None, [(OrderLine.unit_cost.is_null(), 0)], OrderLine.quantity)
+    with db.atomic():
+        DailySalesRollup.delete().execute()
+        query = (OrderLine
+                 .select(day, OrderLine.product, fn.SUM(OrderLine.quantity),
+                         fn.ROUND(fn.SUM(OrderLine.total_value), 2),
+                         fn.ROUND(fn.TOTAL(fn.ROUND(OrderLine.unit_cost * OrderLine.quantity, 2)), 2),
+                         fn.SUM(costed))
+                 .group_by(day, OrderLine.product))
+        DailySalesRollup.insert_from(
+            query,
+            [DailySalesRollup.date, DailySalesRollup.product, DailySalesRollup.units, DailySalesRollup.revenue,
+             DailySalesRollup.cost, DailySalesRollup.costed_units]
+        ).execute()
+    rows = DailySalesRollup.select().count()
+    print(f"Rebuilt sales rollup ({rows} rows).")
+    return rows
@@ -0,0 +1,206 @@
+"""
+Versioned schema migrations.
+
+The schema version is stored in the Metadata table. initialize_database()
+stamps new databases with LATEST_VERSION (create_tables already builds the
+current schema) and runs apply_migrations() on existing ones, which applies
+every migration newer than the stored version, in order, each in its own
+transaction.
+
+To change the schema: update the models, then append a migration written
+against the previous schema. Never edit or reorder migrations that have
+shipped.
+"""
+from models import db, Metadata
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Migration 3: consecutive unit rows of a product at most this far apart are one sale
+SALE_UNIT_GAP_SECONDS = 1
+
+
+def _add_sale_indexes():
+    # Same names as the indexes create_tables builds from Sale.Meta
+    db.execute_sql('CREATE INDEX IF NOT EXISTS "sale_date" ON "sale" ("date")')
+    db.execute_sql('CREATE INDEX IF NOT EXISTS "sale_product_id_date" ON "sale" ("product_id", "date")')
+
+
+def _has_column(table, column):
+    return any(c.name == column for c in db.get_columns(table))
+
+
+def _record_sale_costs():
+    if _has_column('sale', 'unit_cost'):
+        return
+    db.execute_sql('ALTER TABLE "sale" ADD COLUMN "unit_cost" DECIMAL(10, 2)')
+    db.execute_sql(
+        'CREATE TABLE IF NOT EXISTS "salefilament" ("id" INTEGER NOT NULL PRIMARY KEY, '
+        '"sale_id" INTEGER NOT NULL, "filament_id" INTEGER NOT NULL, '
+        '"grams" DECIMAL(10, 2) NOT NULL, "cost" DECIMAL(10, 4) NOT NULL, '
+        'FOREIGN KEY ("sale_id") REFERENCES "sale" ("id") ON DELETE CASCADE, '
+        'FOREIGN KEY ("filament_id") REFERENCES "filament" ("id") ON DELETE CASCADE)'
+    )
+    db.execute_sql('CREATE INDEX IF NOT EXISTS "salefilament_sale_id" ON "salefilament" ("sale_id")')
+    db.execute_sql('CREATE INDEX IF NOT EXISTS "salefilament_filament_id" ON "salefilament" ("filament_id")')
+
+    # initialize_database recreates the rollup triggers with the cost columns
+    for trigger in ('sale_rollup_insert', 'sale_rollup_delete', 'sale_rollup_update'):
+        db.execute_sql(f'DROP TRIGGER IF EXISTS "{trigger}"')
+
+    # Earlier sales did not record their cost; the best estimate left is today's
+    # prices. Worked out in SQL from the BOM tables of this schema version, so
+    # that later changes to the models or services cannot change this migration.
+    db.execute_sql(
+        'CREATE TEMP TABLE "sale_usage" AS '
+        'SELECT u."product_id", u."filament_id", SUM(u."grams") AS "grams", '
+        # REAL: NUMERIC columns hold whole numbers as integers, which would divide as integers
+        'CAST(SUM(u."grams") AS REAL) * f."cost_per_roll" / f."grams_per_roll" AS "cost" FROM ('
+        '  SELECT "product_id", "filament_id", "grams_needed" AS "grams" FROM "productfilament" '
+        '  UNION ALL '
+        '  SELECT p."product_id", pf."filament_id", pf."grams_needed" '
+        '  FROM "partfilament" pf JOIN "part" p ON p."id" = pf."part_id") u '
+        'JOIN "filament" f ON f."id" = u."filament_id" '
+        'WHERE u."product_id" IN (SELECT "product_id" FROM "sale") '
+        'GROUP BY u."product_id", u."filament_id"'
+    )
+    db.execute_sql(
+        'UPDATE "sale" SET "unit_cost" = (SELECT ROUND(SUM(su."cost"), 2) FROM "sale_usage" su '
+        'WHERE su."product_id" = "sale"."product_id") '
+        'WHERE "product_id" IN (SELECT "product_id" FROM "sale_usage")'
+    )
+    db.execute_sql(
+        'INSERT INTO "salefilament" ("sale_id", "filament_id", "grams", "cost") '
+        'SELECT s."id", su."filament_id", ROUND(su."grams", 2), ROUND(su."cost", 4) '
+        'FROM "sale" s JOIN "sale_usage" su ON su."product_id" = s."product_id"'
+    )
+    db.execute_sql('DROP TABLE "temp"."sale_usage"')
+
+    # A database from before the rollup gets it, with these columns, from initialize_database
+    if db.table_exists('dailysalesrollup'):
+        db.execute_sql('ALTER TABLE "dailysalesrollup" ADD COLUMN "cost" DECIMAL(10, 2) NOT NULL DEFAULT 0')
+        db.execute_sql('ALTER TABLE "dailysalesrollup" ADD COLUMN "costed_units" INTEGER NOT NULL DEFAULT 0')
+        # Every sale of a product now has the same unit cost
+        db.execute_sql(
+            'UPDATE "dailysalesrollup" SET "costed_units" = "units", "cost" = ROUND("units" * '
+            '(SELECT "unit_cost" FROM "sale" WHERE "sale"."product_id" = "dailysalesrollup"."product_id" LIMIT 1), 2)'
+        )
+
+
+def _collapse_sales_into_orders():
+    if not db.table_exists('sale'):
+        return
+    # Same schema create_tables builds from Order, OrderLine and OrderLineFilament
+    db.execute_sql('CREATE TABLE IF NOT EXISTS "order" ("id" INTEGER NOT NULL PRIMARY KEY, "date" DATETIME NOT NULL)')
+    db.execute_sql(
+        'CREATE TABLE IF NOT EXISTS "orderline" ("id" INTEGER NOT NULL PRIMARY KEY, "order_id" INTEGER NOT NULL, '
+        '"date" DATETIME NOT NULL, "product_id" INTEGER NOT NULL, "quantity" INTEGER NOT NULL, '
+        '"total_value" DECIMAL(10, 2) NOT NULL, "unit_cost" DECIMAL(10, 2), '
+        'FOREIGN KEY ("order_id") REFERENCES "order" ("id") ON DELETE CASCADE, '
+        'FOREIGN KEY ("product_id") REFERENCES "product" ("id") ON DELETE CASCADE)'
+    )
+    db.execute_sql(
+        'CREATE TABLE IF NOT EXISTS "orderlinefilament" ("id" INTEGER NOT NULL PRIMARY KEY, '
+        '"line_id" INTEGER NOT NULL, "filament_id" INTEGER NOT NULL, '
+        '"grams" DECIMAL(10, 2) NOT NULL, "cost" DECIMAL(10, 4) NOT NULL, '
+        'FOREIGN KEY ("line_id") REFERENCES "orderline" ("id") ON DELETE CASCADE, '
+        'FOREIGN KEY ("filament_id") REFERENCES "filament" ("id") ON DELETE CASCADE)'
+    )
+    for name, table, columns in (
+        ('orderline_order_id', 'orderline', '"order_id"'),
+        ('orderline_product_id', 'orderline', '"product_id"'),
+        ('orderline_date', 'orderline', '"date"'),
+        ('orderline_product_id_date', 'orderline', '"product_id", "date"'),
+        ('orderlinefilament_line_id', 'orderlinefilament', '"line_id"'),
+        ('orderlinefilament_filament_id', 'orderlinefilament', '"filament_id"'),
+    ):
+        db.execute_sql(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({columns})')
+
+    # create_sale wrote one row per unit, one after the other: a run of
+    # consecutive ids of the same product, each dated a moment after the one
+    # before, is one sale and becomes one line of its own order. Both keep the
+    # id of the run's first unit, which StockMovement.sale_id already points at.
+    db.execute_sql(
+        'CREATE TEMP TABLE "sale_line" AS '
+        'SELECT "id" AS "sale_id", MIN("id") OVER (PARTITION BY "run") AS "line_id" FROM ('
+        '  SELECT "id", SUM("starts_run") OVER (ORDER BY "id") AS "run" FROM ('
+        '    SELECT "id", CASE WHEN "product_id" = LAG("product_id") OVER w '
+        '      AND (julianday("date") - julianday(LAG("date") OVER w)) * 86400 BETWEEN 0 AND ? '
+        '      THEN 0 ELSE 1 END AS "starts_run" '
+        '    FROM "sale" WINDOW w AS (ORDER BY "id")))',
+        (SALE_UNIT_GAP_SECONDS,)
+    )
+    db.execute_sql(
+        'INSERT INTO "order" ("id", "date") '
+        'SELECT s."id", s."date" FROM "sale" s JOIN "sale_line" m ON m."sale_id" = s."id" WHERE m."line_id" = s."id"'
+    )
+    db.execute_sql(
+        'INSERT INTO "orderline" ("id", "order_id", "date", "product_id", "quantity", "total_value", "unit_cost") '
+        'SELECT m."line_id", m."line_id", MIN(s."date"), MIN(s."product_id"), COUNT(*), '
+        'ROUND(SUM(s."total_value"), 2), '
+        # A line is costed only if every unit of it was
+        'CASE WHEN COUNT(s."unit_cost") = COUNT(*) THEN ROUND(AVG(s."unit_cost"), 2) END '
+        'FROM "sale" s JOIN "sale_line" m ON m."sale_id" = s."id" GROUP BY m."line_id"'
+    )
+    db.execute_sql(
+        'INSERT INTO "orderlinefilament" ("line_id", "filament_id", "grams", "cost") '
+        'SELECT m."line_id", sf."filament_id", ROUND(SUM(sf."grams"), 2), ROUND(SUM(sf."cost"), 4) '
+        'FROM "salefilament" sf JOIN "sale_line" m ON m."sale_id" = sf."sale_id" '
+        'GROUP BY m."line_id", sf."filament_id"'
+    )
+    db.execute_sql('DROP TABLE "temp"."sale_line"')
+
+    # initialize_database creates the rollup triggers on orderline
+    for trigger in ('sale_rollup_insert', 'sale_rollup_delete', 'sale_rollup_update'):
+        db.execute_sql(f'DROP TRIGGER IF EXISTS "{trigger}"')
+    db.execute_sql('DROP TABLE "salefilament"')
+    db.execute_sql('DROP TABLE "sale"')
+
+    # Rounding the line costs can move the rollup's cost by a cent; recompute it from the lines
+    if db.table_exists('dailysalesrollup'):
+        db.execute_sql('DELETE FROM "dailysalesrollup"')
+        db.execute_sql(
+            'INSERT INTO "dailysalesrollup" ("date", "product_id", "units", "revenue", "cost", "costed_units") '
+            'SELECT date("date"), "product_id", SUM("quantity"), ROUND(SUM("total_value"), 2), '
+            'ROUND(TOTAL(ROUND("unit_cost" * "quantity", 2)), 2), '
+            'SUM(CASE WHEN "unit_cost" IS NULL THEN 0 ELSE "quantity" END) '
+            'FROM "orderline" GROUP BY date("date"), "product_id"'
+        )
+
+
+# (version, description, apply)
+MIGRATIONS = [
+    (1, "Index sale by date and by (product, date)", _add_sale_indexes),
+    (2, "Record material cost and filament usage on each sale", _record_sale_costs),
+    (3, "Collapse unit sale rows into orders and order lines with a quantity", _collapse_sales_into_orders),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version():
+    """Returns the schema version recorded in the database (0 if none)."""
+    return int(Metadata.get_value(Metadata.SCHEMA_VERSION, 0))
+
+
+def set_schema_version(version):
+    Metadata.set_value(Metadata.SCHEMA_VERSION, version)
+
+
+def apply_migrations():
+    """
+    Applies pending migrations in order and returns the versions applied.
+    Each migration and its version bump commit together.
+    """
+    Metadata.create_table(safe=True)
+    current = get_schema_version()
+    applied = []
+    for version, description, apply in MIGRATIONS:
+        if version <= current:
+            continue
+        with db.atomic():
+            apply()
+            set_schema_version(version)
+        logger.info(f"Applied migration {version}: {description}")
+        applied.append(version)
+    return applied
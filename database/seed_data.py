@@ -1,4 +1,4 @@
-from models import Filament, Product, Part, PartFilament, Sale, db
+from models import Filament, Product, Part, PartFilament, OrderLine, Metadata, db
 from decimal import Decimal
 from datetime import datetime, timedelta
 import random
@@ -6,11 +6,21 @@ import random
 def seed_example_data():
     """
     Seeds the database with the Gothic hide example and some sales if it doesn't already exist.
-    Also calls the Etsy products population script.
+    Also calls the Etsy products population script when it is installed.
+    Run it with `python -m database seed`; a database that was seeded once is
+    recognised with a single metadata lookup and left alone.
     """
+    if Metadata.get_value(Metadata.SEEDED):
+        print("Example data already seeded.")
+        return
+
     # 1. Populate Etsy products first
-    from .populate_etsy_products import populate_etsy_products
-    populate_etsy_products()
+    try:
+        from .populate_etsy_products import populate_etsy_products
+    except ImportError:
+        print("Etsy products script not available, skipping.")
+    else:
+        populate_etsy_products()
 
     # Use a transaction to ensure atomicity
     with db.atomic():
@@ -74,7 +84,7 @@ def seed_example_data():
             print("Gothic hide example data already exists.")
 
         # 3. Seed some sales if none exist
-        if Sale.select().count() == 0:
+        if OrderLine.select().count() == 0:
             print("Seeding example sales...")
             base_price = Decimal('45.00')
             # Create sales over the last 30 days
@@ -84,13 +94,15 @@ def seed_example_data():
                 # Randomize price slightly
                 price = base_price + Decimal(str(random.uniform(-5, 10))).quantize(Decimal('0.01'))
                 
-                Sale.create(
+                OrderLine.create(
                     product=product,
                     total_value=price,
                     date=sale_date
                 )
             print(f"Seeded 20 sales for {product}.")
 
+        Metadata.set_value(Metadata.SEEDED, 1)
+
 if __name__ == "__main__":
     from database import initialize_database
     initialize_database()
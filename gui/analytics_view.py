@@ -1,10 +1,10 @@
 import customtkinter as ctk
 from services.inventory_service import InventoryService
+from services.analytics_service import AnalyticsService, DEFAULT_CHART_WIDTH_PX
+from gui.view_models import view_models
 from datetime import datetime, timedelta
 from decimal import Decimal
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.dates as mdates
+from gui.sales_chart import SalesChart
 
 class AnalyticsView(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -51,7 +51,7 @@ class AnalyticsView(ctk.CTkFrame):
         # Chart Area
         self.chart_frame = ctk.CTkFrame(self.results_scroll)
         self.chart_frame.pack(fill="x", padx=10, pady=10)
-        self.canvas = None
+        self.chart = None  # SalesChart, built with the first data
 
         # Product Breakdown Area
         self.prod_lbl = ctk.CTkLabel(self.results_scroll, text="Product Breakdown", font=ctk.CTkFont(size=16, weight="bold"))
@@ -68,21 +68,43 @@ class AnalyticsView(ctk.CTkFrame):
         self.status_label = ctk.CTkLabel(self, text="")
         self.status_label.grid(row=2, column=0, pady=5)
 
+        self.refresh()
+
     def refresh(self):
-        """Fetches and displays analytics data."""
+        """
+        Displays the last analytics for the date range at once, then fetches
+        them again on the service worker if anything has been written since.
+        """
         try:
             start = datetime.strptime(self.start_date_var.get(), "%Y-%m-%d")
             end = datetime.strptime(self.end_date_var.get(), "%Y-%m-%d")
-            
-            data = InventoryService.get_analytics_data(start, end)
-            
+        except ValueError:
+            self.status_label.configure(text="Error: Invalid date format. Use YYYY-MM-DD", text_color="red")
+            return
+
+        # Days, weeks or months, whichever fits the chart's width
+        bucket = AnalyticsService.choose_bucket(start, end, self.chart_width_px())
+        key = ("analytics", start, end, bucket)
+        if not view_models.is_current(key):
+            self.status_label.configure(text="Loading analytics...", text_color=("gray10", "gray90"))
+        view_models.load(
+            self, key,
+            lambda: InventoryService.get_analytics_data(start, end, bucket),
+            lambda data: self.show_analytics(data, start, end),
+            on_error=lambda e: self.status_label.configure(text=f"Error: {str(e)}", text_color="red"),
+            group="analytics"
+        )
+
+    def show_analytics(self, data, start, end):
+        """Displays analytics data."""
+        try:
             # Update Summary
             self.total_sales_lbl.configure(text=f"Total Sales: {data['total_sales_count']}")
             self.gross_rev_lbl.configure(text=f"Gross Revenue: ${data['gross_revenue']:.2f}")
             self.net_profit_lbl.configure(text=f"Net Profit: ${data['net_profit']:.2f}")
             
             # Update Chart
-            self.update_chart(data['daily_stats'], start, end)
+            self.update_chart(data['daily_stats'], start, end, data['bucket'])
 
             # Update Product Breakdown
             for widget in self.prod_container.winfo_children():
@@ -122,74 +144,16 @@ class AnalyticsView(ctk.CTkFrame):
             
             self.status_label.configure(text="Analytics updated.", text_color="green")
             
-        except ValueError:
-            self.status_label.configure(text="Error: Invalid date format. Use YYYY-MM-DD", text_color="red")
         except Exception as e:
             self.status_label.configure(text=f"Error: {str(e)}", text_color="red")
 
-    def update_chart(self, daily_stats, start, end):
-        if self.canvas:
-            self.canvas.get_tk_widget().destroy()
-
-        # Prepare data
-        dates = []
-        revenues = []
-        profits = []
-        
-        curr = start
-        while curr <= end:
-            date_str = curr.strftime("%Y-%m-%d")
-            dates.append(curr)
-            stats = daily_stats.get(date_str, {'revenue': 0, 'profit': 0})
-            revenues.append(float(stats['revenue']))
-            profits.append(float(stats['profit']))
-            curr += timedelta(days=1)
-
-        # Matplotlib Styling for dark/light mode
-        appearance_mode = ctk.get_appearance_mode()
-        if appearance_mode == "Dark":
-            bg_color = "#2b2b2b"  # CTK default dark
-            text_color = "white"
-            grid_color = "#4a4a4a"
-        else:
-            bg_color = "#ebebeb"  # CTK default light
-            text_color = "black"
-            grid_color = "#d1d1d1"
-
-        # Create plot
-        fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
-        fig.patch.set_facecolor(bg_color)
-        ax.set_facecolor(bg_color)
-
-        # Plot with smoother lines and nicer colors
-        ax.plot(dates, revenues, label='Revenue', color='#1f77b4', marker='o', linewidth=2, markersize=4)
-        ax.plot(dates, profits, label='Profit', color='#2ca02c', marker='s', linewidth=2, markersize=4)
-        
-        ax.set_title("Sales Over Time", color=text_color, fontsize=14, fontweight='bold', pad=15)
-        ax.set_xlabel("Date", color=text_color, fontsize=10)
-        ax.set_ylabel("USD ($)", color=text_color, fontsize=10)
-        
-        # Legend styling
-        legend = ax.legend(facecolor=bg_color, edgecolor=grid_color)
-        plt.setp(legend.get_texts(), color=text_color)
-        
-        # Grid styling
-        ax.grid(True, linestyle='--', alpha=0.6, color=grid_color)
-        
-        # Spines
-        for spine in ax.spines.values():
-            spine.set_color(grid_color)
-            
-        # Ticks
-        ax.tick_params(colors=text_color, labelsize=9)
-        
-        # Format dates
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d'))
-        fig.autofmt_xdate()
-        plt.tight_layout()
+    def chart_width_px(self):
+        if self.chart is not None:
+            return self.chart.width_px()
+        width = self.chart_frame.winfo_width()
+        return width if width > 1 else DEFAULT_CHART_WIDTH_PX
 
-        # Embed in Tkinter
-        self.canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(fill="both", expand=True)
-        plt.close(fig)
+    def update_chart(self, daily_stats, start, end, bucket='day'):
+        if self.chart is None:
+            self.chart = SalesChart(self.chart_frame)
+        self.chart.set_series(daily_stats, start, end, bucket)
@@ -0,0 +1,18 @@
+def run_in_background(widget, fn, *args, on_done, on_error=None, group=None):
+    """
+    Runs fn(*args) on the main window's ServiceExecutor and calls on_done(result)
+    (or on_error(exception)) back on the GUI thread. Without an executor (a view
+    used outside MainWindow) the call runs synchronously.
+    """
+    executor = getattr(widget.winfo_toplevel(), 'executor', None)
+    if executor is not None:
+        return executor.submit(fn, *args, on_done=on_done, on_error=on_error, group=group)
+    try:
+        result = fn(*args)
+    except Exception as e:
+        if on_error is None:
+            raise
+        on_error(e)
+    else:
+        on_done(result)
+    return None
@@ -1,5 +1,7 @@
 import customtkinter as ctk
 from services.inventory_service import InventoryService
+from gui.virtual_list import VirtualList, button_row_template
+from gui.view_models import view_models
 from decimal import Decimal
 
 class FilamentView(ctk.CTkFrame):
@@ -20,8 +22,12 @@ class FilamentView(ctk.CTkFrame):
         self.list_label = ctk.CTkLabel(self.list_frame, text="Filament List", font=ctk.CTkFont(size=16, weight="bold"))
         self.list_label.pack(pady=10)
         
-        self.scrollable_frame = ctk.CTkScrollableFrame(self.list_frame, label_text="Available Filaments")
-        self.scrollable_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        ctk.CTkLabel(self.list_frame, text="Available Filaments").pack()
+        self.filament_list = VirtualList(self.list_frame, templates={
+            'filament': button_row_template(
+                self.select_filament, lambda fil: f"{fil.brand or 'Generic'} {fil.color} {fil.material}"),
+        })
+        self.filament_list.pack(fill="both", expand=True, padx=10, pady=10)
         
         self.add_btn = ctk.CTkButton(self.list_frame, text="Add New Filament", command=self.prepare_new_filament)
         self.add_btn.pack(pady=10)
@@ -64,32 +70,29 @@ class FilamentView(ctk.CTkFrame):
         self.delete_btn = ctk.CTkButton(self.details_frame, text="Delete Filament", fg_color="red", hover_color="darkred", command=self.delete_filament)
         self.delete_btn.grid(row=len(fields)+1, column=1, pady=20)
         
+        # Purchases add whole rolls to stock and are recorded in the stock ledger
+        self.purchase_rolls_var = ctk.StringVar(value="1")
+        purchase_frame = ctk.CTkFrame(self.details_frame, fg_color="transparent")
+        purchase_frame.grid(row=len(fields)+2, column=0, columnspan=2, pady=5)
+        ctk.CTkLabel(purchase_frame, text="Rolls Purchased:").grid(row=0, column=0, padx=10)
+        ctk.CTkEntry(purchase_frame, textvariable=self.purchase_rolls_var, width=60).grid(row=0, column=1, padx=5)
+        self.purchase_btn = ctk.CTkButton(purchase_frame, text="Record Purchase", command=self.record_purchase)
+        self.purchase_btn.grid(row=0, column=2, padx=10)
+        
         self.status_label = ctk.CTkLabel(self.details_frame, text="")
-        self.status_label.grid(row=len(fields)+2, column=0, columnspan=2)
+        self.status_label.grid(row=len(fields)+3, column=0, columnspan=2)
         
-        self.load_filaments()
+        self.refresh()
 
     def load_filaments(self):
-        # Clear current list
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-            
         try:
-            filaments = InventoryService.get_all_filaments()
-            for fil in filaments:
-                btn = ctk.CTkButton(
-                    self.scrollable_frame, 
-                    text=f"{fil.brand or 'Generic'} {fil.color} {fil.material}",
-                    fg_color="transparent",
-                    text_color=("gray10", "gray90"),
-                    hover_color=("gray70", "gray30"),
-                    anchor="w",
-                    command=lambda f=fil: self.select_filament(f)
-                )
-                btn.pack(fill="x", padx=5, pady=2)
+            self.show_filaments(list(InventoryService.get_all_filaments()))
         except Exception as e:
             print(f"Error loading filaments: {e}")
 
+    def show_filaments(self, filaments):
+        self.filament_list.set_rows(('filament', fil) for fil in filaments)
+
     def select_filament(self, filament):
         self.selected_filament_id = filament.id
         self.brand_var.set(filament.brand or "")
@@ -130,6 +133,20 @@ class FilamentView(ctk.CTkFrame):
         except Exception as e:
             self.status_label.configure(text=f"Error: {str(e)}", text_color="red")
 
+    def record_purchase(self):
+        if not self.selected_filament_id:
+            self.status_label.configure(text="No filament selected.", text_color="orange")
+            return
+        try:
+            rolls = int(self.purchase_rolls_var.get())
+            if rolls <= 0:
+                raise ValueError("Rolls purchased must be positive.")
+            purchase = InventoryService.record_filament_purchase(self.selected_filament_id, rolls)
+            self.rolls_stock_var.set(str(purchase.filament.rolls_in_stock))
+            self.status_label.configure(text=f"Recorded purchase of {rolls} rolls.", text_color="green")
+        except Exception as e:
+            self.status_label.configure(text=f"Error: {str(e)}", text_color="red")
+
     def delete_filament(self):
         if self.selected_filament_id:
             try:
@@ -144,7 +161,9 @@ class FilamentView(ctk.CTkFrame):
 
     def refresh(self):
         """Called when database is switched or view is focused."""
-        self.load_filaments()
+        view_models.load(self, "filaments", lambda: list(InventoryService.get_all_filaments()),
+                         self.show_filaments, on_error=lambda e: print(f"Error loading filaments: {e}"),
+                         group="filaments")
         # Only prepare new if nothing is selected
         if self.selected_filament_id is None:
             self.prepare_new_filament()
@@ -1,13 +1,22 @@
 import customtkinter as ctk
-from .overview_view import OverviewView
-from .filament_view import FilamentView
-from .product_view import ProductView
-from .sales_view import SalesView
-from .analytics_view import AnalyticsView
+from .view_models import view_models
 from models.base import set_database, db
-from database import initialize_database, seed_example_data
+from database import initialize_database
+from services.executor import ServiceExecutor
+import importlib
 import os
 
+# Tab name -> (module, class) of its view. Views are imported and built the
+# first time their tab is opened, so e.g. matplotlib only loads with analytics.
+VIEWS = {
+    "overview": ("gui.overview_view", "OverviewView"),
+    "filaments": ("gui.filament_view", "FilamentView"),
+    "products": ("gui.product_view", "ProductView"),
+    "sales": ("gui.sales_view", "SalesView"),
+    "analytics": ("gui.analytics_view", "AnalyticsView"),
+}
+FRAME_NAMES = tuple(VIEWS)
+
 class MainWindow(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -15,6 +24,10 @@ class MainWindow(ctk.CTk):
         self.title("InventoryManager")
         self.geometry("1100x700")
 
+        # Database work started by the views runs on this worker thread
+        self.executor = ServiceExecutor()
+        self.executor.attach(self)
+
         # set grid layout 1x2
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
@@ -57,12 +70,8 @@ class MainWindow(ctk.CTk):
                                                                 command=self.change_appearance_mode_event)
         self.appearance_mode_menu.grid(row=7, column=0, padx=20, pady=20, sticky="s")
 
-        # create frames
-        self.overview_frame = OverviewView(self, corner_radius=0, fg_color="transparent")
-        self.filament_frame = FilamentView(self, corner_radius=0, fg_color="transparent")
-        self.product_frame = ProductView(self, corner_radius=0, fg_color="transparent")
-        self.sales_frame = SalesView(self, corner_radius=0, fg_color="transparent")
-        self.analytics_frame = AnalyticsView(self, corner_radius=0, fg_color="transparent")
+        # Views built so far, by tab name (see build_frame)
+        self.frames = {}
 
         # dataset selection in top right of navigation or main area?
         # User said "upper right". Let's put it in a small frame at the top of the main area or just as a widget.
@@ -90,7 +99,14 @@ class MainWindow(ctk.CTk):
         # select default frame
         self.select_frame_by_name("overview")
 
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
     def select_frame_by_name(self, name):
+        # Results still on their way to the views being left are no longer wanted
+        for other in FRAME_NAMES:
+            if other != name:
+                self.executor.cancel_group(other)
+
         # set button color for selected button
         self.overview_button.configure(fg_color=("gray75", "gray25") if name == "overview" else "transparent")
         self.filament_button.configure(fg_color=("gray75", "gray25") if name == "filaments" else "transparent")
@@ -99,31 +115,24 @@ class MainWindow(ctk.CTk):
         self.analytics_button.configure(fg_color=("gray75", "gray25") if name == "analytics" else "transparent")
 
         # show selected frame
-        if name == "overview":
-            self.overview_frame.grid(row=1, column=1, sticky="nsew")
-            self.overview_frame.refresh()
-        else:
-            self.overview_frame.grid_forget()
-        if name == "filaments":
-            self.filament_frame.grid(row=1, column=1, sticky="nsew")
-            self.filament_frame.refresh()
-        else:
-            self.filament_frame.grid_forget()
-        if name == "products":
-            self.product_frame.grid(row=1, column=1, sticky="nsew")
-            self.product_frame.refresh()
+        for other, frame in self.frames.items():
+            if other != name:
+                frame.grid_forget()
+        frame = self.frames.get(name)
+        if frame is None:
+            # A new view loads its data itself
+            frame = self.build_frame(name)
         else:
-            self.product_frame.grid_forget()
-        if name == "sales":
-            self.sales_frame.grid(row=1, column=1, sticky="nsew")
-            self.sales_frame.refresh()
-        else:
-            self.sales_frame.grid_forget()
-        if name == "analytics":
-            self.analytics_frame.grid(row=1, column=1, sticky="nsew")
-            self.analytics_frame.refresh()
-        else:
-            self.analytics_frame.grid_forget()
+            frame.refresh()
+        frame.grid(row=1, column=1, sticky="nsew")
+
+    def build_frame(self, name):
+        """Imports and builds the view for a tab."""
+        module_name, class_name = VIEWS[name]
+        view_class = getattr(importlib.import_module(module_name), class_name)
+        frame = view_class(self, corner_radius=0, fg_color="transparent")
+        self.frames[name] = frame
+        return frame
 
     def overview_button_event(self):
         self.select_frame_by_name("overview")
@@ -143,36 +152,69 @@ class MainWindow(ctk.CTk):
     def change_appearance_mode_event(self, new_appearance_mode):
         ctk.set_appearance_mode(new_appearance_mode)
 
+    def apply_pending_edits(self):
+        """Writes inline edits still waiting for their idle delay."""
+        overview = self.frames.get("overview")
+        if overview is not None:
+            overview.apply_edits()
+
+    def on_close(self):
+        self.apply_pending_edits()
+        self.destroy()
+
     def change_dataset_event(self, new_dataset):
-        try:
-            # Close current connection
-            if not db.is_closed():
-                db.close()
-            
-            # Switch database
-            env = "test" if new_dataset == "Test" else "prod"
-            set_database(env)
-            
-            # Re-initialize (ensure tables exist)
-            initialize_database()
-            
-            # Re-open connection for the app session
-            db.connect()
-
-            # Seed example data if needed
-            seed_example_data()
-            
-            # Refresh current view
-            self.overview_frame.refresh()
-            self.filament_frame.refresh()
-            self.product_frame.refresh()
-            self.sales_frame.refresh()
-            self.analytics_frame.refresh()
-            
-            print(f"Switched to {new_dataset} database.")
-        except Exception as e:
-            # Log and possibly show a message box in a real app
-            print(f"Error switching dataset: {e}")
-            # Try to revert or stay in a safe state
-            set_database("prod")
-            db.connect(reuse_if_open=True)
+        # Buffered edits belong to the database being left
+        self.apply_pending_edits()
+        # Loads for the views are no longer wanted; writes already queued are kept
+        for name in FRAME_NAMES:
+            self.executor.cancel_group(name)
+        self.dataset_menu.configure(state="disabled")
+        # The worker runs tasks in order: once this one is done, every write queued so far reached the old database
+        self.executor.submit(lambda: None, on_done=lambda _: self.start_dataset_switch(new_dataset),
+                             on_error=self.dataset_switch_failed, group="dataset")
+
+    def start_dataset_switch(self, new_dataset):
+        # Close this thread's connection; it is reopened on the new database when the switch is done
+        if not db.is_closed():
+            db.close()
+        # Switched here, so that no write made from this thread after the switch reaches the old database
+        old_database = db.obj
+        env = "test" if new_dataset == "Test" else "prod"
+        set_database(env)
+        # Migrations run on the worker; the window stays responsive
+        self.executor.submit(self.switch_database, old_database,
+                             on_done=lambda _: self.dataset_switched(new_dataset),
+                             on_error=self.dataset_switch_failed, group="dataset")
+
+    @staticmethod
+    def switch_database(old_database):
+        """Runs on the service worker thread, after db has been pointed at the new database."""
+        # Close the worker's connection to the old database
+        if not old_database.is_closed():
+            old_database.close()
+
+        # Re-initialize (ensure tables exist); a no-op beyond one query for an up-to-date database
+        initialize_database()
+
+    def dataset_switched(self, new_dataset):
+        # Re-open connection for the app session
+        db.connect(reuse_if_open=True)
+        self.dataset_menu.configure(state="normal")
+
+        # Snapshots of the old database must not be shown, even briefly
+        view_models.clear()
+
+        # Refresh the views built so far; the others load the new data when first opened
+        for frame in self.frames.values():
+            frame.refresh()
+
+        print(f"Switched to {new_dataset} database.")
+
+    def dataset_switch_failed(self, error):
+        # Log and possibly show a message box in a real app
+        print(f"Error switching dataset: {error}")
+        # Try to revert or stay in a safe state
+        set_database("prod")
+        db.connect(reuse_if_open=True)
+        self.dataset_menu.set("Production")
+        self.dataset_menu.configure(state="normal")
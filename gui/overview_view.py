@@ -1,5 +1,10 @@
 import customtkinter as ctk
 from services.inventory_service import InventoryService
+from gui.virtual_list import VirtualList
+from gui.reconcile import KeyedRows, configure_if_changed, set_if_changed
+from gui.view_models import view_models
+from gui.background import run_in_background
+from gui.pending_edits import PendingEdits
 from decimal import Decimal
 
 class OverviewView(ctk.CTkFrame):
@@ -19,8 +24,26 @@ class OverviewView(ctk.CTkFrame):
         self.prod_label = ctk.CTkLabel(self.product_list_frame, text="Product Inventory", font=ctk.CTkFont(size=16, weight="bold"))
         self.prod_label.pack(pady=10)
         
-        self.prod_scroll = ctk.CTkScrollableFrame(self.product_list_frame)
-        self.prod_scroll.pack(fill="both", expand=True, padx=10, pady=10)
+        # Column titles stay fixed above the list
+        header = ctk.CTkFrame(self.product_list_frame, fg_color="transparent")
+        header.pack(fill="x", padx=15)
+        header.grid_columnconfigure(0, weight=1) # Product/Size
+        header.grid_columnconfigure(1, weight=0) # In Stock
+        header.grid_columnconfigure(2, weight=0) # Printable
+        header.grid_columnconfigure(3, weight=0) # Limiting filament
+        ctk.CTkLabel(header, text="Product / Size", width=200, anchor="w", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, sticky="w")
+        ctk.CTkLabel(header, text="Stock", width=60, font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, padx=5)
+        ctk.CTkLabel(header, text="Printable", width=60, font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, padx=5)
+        ctk.CTkLabel(header, text="Limited By", width=120, anchor="w", font=ctk.CTkFont(weight="bold")).grid(row=0, column=3, padx=5)
+        # Scrollbar column of the list below
+        ctk.CTkLabel(header, text="", width=16).grid(row=0, column=4)
+
+        self.prod_list = VirtualList(self.product_list_frame, templates={
+            'type': (self._create_type_row, self._bind_header_row),
+            'color': (self._create_color_row, self._bind_header_row),
+            'product': (self._create_product_row, self._bind_product_row),
+        })
+        self.prod_list.pack(fill="both", expand=True, padx=10, pady=10)
         
         # --- Top Right: Right Panel (Filaments + To-Do) ---
         self.right_panel = ctk.CTkFrame(self, fg_color="transparent")
@@ -36,8 +59,20 @@ class OverviewView(ctk.CTkFrame):
         self.fil_label = ctk.CTkLabel(self.filament_list_frame, text="Filament Stock", font=ctk.CTkFont(size=16, weight="bold"))
         self.fil_label.pack(pady=10)
         
-        self.fil_scroll = ctk.CTkScrollableFrame(self.filament_list_frame)
-        self.fil_scroll.pack(fill="both", expand=True, padx=10, pady=10)
+        header = ctk.CTkFrame(self.filament_list_frame, fg_color="transparent")
+        header.pack(fill="x", padx=15)
+        header.grid_columnconfigure(0, weight=1)
+        header.grid_columnconfigure(1, weight=0)
+        header.grid_columnconfigure(2, weight=0)
+        ctk.CTkLabel(header, text="Filament", width=180, anchor="w", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, sticky="w")
+        ctk.CTkLabel(header, text="Rolls", width=60, font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, padx=5)
+        ctk.CTkLabel(header, text="Grams", width=70, font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, padx=5)
+        ctk.CTkLabel(header, text="", width=16).grid(row=0, column=3)
+
+        self.fil_list = VirtualList(self.filament_list_frame, templates={
+            'filament': (self._create_filament_row, self._bind_filament_row),
+        })
+        self.fil_list.pack(fill="both", expand=True, padx=10, pady=10)
 
         # To-Do Section
         self.todo_frame = ctk.CTkFrame(self.right_panel)
@@ -48,6 +83,7 @@ class OverviewView(ctk.CTkFrame):
 
         self.todo_scroll = ctk.CTkScrollableFrame(self.todo_frame)
         self.todo_scroll.pack(fill="both", expand=True, padx=10, pady=10)
+        self.build_todo()
         
         # --- Bottom: New Sale Area ---
         self.sale_frame = ctk.CTkFrame(self)
@@ -79,66 +115,34 @@ class OverviewView(ctk.CTkFrame):
         
         self.all_products = []
         self.all_filaments = []
+        self.printable_counts = {}  # product id -> PrintableCapacity(count, bottleneck)
+        # Inline stock edits, keyed by ('product' | 'filament', id), written together once editing pauses
+        self.pending_edits = PendingEdits(self, self.write_stock_edits)
         
         self.refresh()
 
     def load_products(self):
-        for widget in self.prod_scroll.winfo_children():
-            widget.destroy()
-        
-        self.all_products = list(InventoryService.get_all_products())
-        
-        # Header
-        header = ctk.CTkFrame(self.prod_scroll, fg_color="transparent")
-        header.pack(fill="x", padx=5)
-        # We'll use a consistent grid for headers and rows
-        header.grid_columnconfigure(0, weight=1) # Product/Size
-        header.grid_columnconfigure(1, weight=0) # In Stock
-        header.grid_columnconfigure(2, weight=0) # Printable
-        
-        ctk.CTkLabel(header, text="Product / Size", width=200, anchor="w", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, sticky="w")
-        ctk.CTkLabel(header, text="Stock", width=60, font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, padx=5)
-        ctk.CTkLabel(header, text="Printable", width=60, font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, padx=5)
+        products = list(InventoryService.get_all_products())
+        self.show_products(products, InventoryService.calculate_printable_counts(products))
+
+    def show_products(self, products, printable_counts):
+        self.all_products = products
+        self.printable_counts = printable_counts
         
+        # Flatten into rows: a type header, then a color header per sub-group, then the products
+        rows = []
         current_type = None
         current_color = None
-        
         for prod in self.all_products:
-            # 1. Type Header
             if prod.product_type != current_type:
                 current_type = prod.product_type
                 current_color = None # Reset color when type changes
-                type_header = ctk.CTkFrame(self.prod_scroll, fg_color=("gray70", "gray20"), corner_radius=4)
-                type_header.pack(fill="x", pady=(15, 2), padx=5)
-                ctk.CTkLabel(type_header, text=current_type.upper(), font=ctk.CTkFont(size=14, weight="bold")).pack(pady=2)
-
-            # 2. Color Header (Sub-group)
+                rows.append(('type', current_type.upper()))
             if prod.color_variant != current_color:
                 current_color = prod.color_variant
-                color_header = ctk.CTkFrame(self.prod_scroll, fg_color=("gray80", "gray30"), corner_radius=4)
-                color_header.pack(fill="x", pady=(5, 2), padx=(15, 5))
-                ctk.CTkLabel(color_header, text=current_color, font=ctk.CTkFont(size=12, weight="bold")).pack(pady=1)
-
-            row = ctk.CTkFrame(self.prod_scroll, fg_color="transparent")
-            row.pack(fill="x", pady=1, padx=(30, 5))
-            row.grid_columnconfigure(0, weight=1)
-            row.grid_columnconfigure(1, weight=0)
-            row.grid_columnconfigure(2, weight=0)
-            
-            # Show just the size in the row, since Type and Color are in the header
-            ctk.CTkLabel(row, text=prod.size, width=200, anchor="w").grid(row=0, column=0, sticky="w", padx=(20, 0))
-            
-            # Modifiable inventory count
-            inv_var = ctk.StringVar(value=str(prod.inventory_count))
-            inv_entry = ctk.CTkEntry(row, textvariable=inv_var, width=60)
-            inv_entry.grid(row=0, column=1, padx=5)
-            # Binding focus out to save
-            inv_entry.bind("<FocusOut>", lambda e, p=prod, v=inv_var: self.update_product_inventory(p, v))
-            inv_entry.bind("<Return>", lambda e, p=prod, v=inv_var: self.update_product_inventory(p, v))
-            
-            # Non-modifiable printable count
-            printable = InventoryService.calculate_printable_count(prod)
-            ctk.CTkLabel(row, text=str(printable), width=60).grid(row=0, column=2, padx=5)
+                rows.append(('color', current_color))
+            rows.append(('product', prod))
+        self.prod_list.set_rows(rows)
 
         # Update sale dropdown - still use full name for dropdown
         product_names = [str(p) for p in self.all_products]
@@ -146,54 +150,124 @@ class OverviewView(ctk.CTkFrame):
         if product_names and not self.sale_product_var.get():
             self.sale_product_var.set(product_names[0])
 
-    def load_filaments(self):
-        for widget in self.fil_scroll.winfo_children():
-            widget.destroy()
+    def _create_type_row(self, container):
+        frame = ctk.CTkFrame(container, fg_color=("gray70", "gray20"), corner_radius=4)
+        frame.pack(fill="both", expand=True, pady=(4, 2), padx=5)
+        label = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=14, weight="bold"))
+        label.pack(expand=True)
+        return label
+
+    def _create_color_row(self, container):
+        frame = ctk.CTkFrame(container, fg_color=("gray80", "gray30"), corner_radius=4)
+        frame.pack(fill="both", expand=True, pady=(4, 2), padx=(15, 5))
+        label = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=12, weight="bold"))
+        label.pack(expand=True)
+        return label
+
+    def _bind_header_row(self, label, text):
+        configure_if_changed(label, text=text)
+
+    def _create_product_row(self, container):
+        # shown: the text last put in each entry by a bind, to tell typed text from it
+        row = {'product': None, 'inv_var': ctk.StringVar(), 'shown': {}}
+        frame = ctk.CTkFrame(container, fg_color="transparent")
+        frame.pack(fill="both", expand=True, pady=1, padx=(30, 5))
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_columnconfigure(1, weight=0)
+        frame.grid_columnconfigure(2, weight=0)
+        frame.grid_columnconfigure(3, weight=0)
         
-        self.all_filaments = list(InventoryService.get_all_filaments())
+        # Show just the size in the row, since Type and Color are in the header
+        row['size_label'] = ctk.CTkLabel(frame, text="", width=200, anchor="w")
+        row['size_label'].grid(row=0, column=0, sticky="w", padx=(20, 0))
         
-        # Header
-        header = ctk.CTkFrame(self.fil_scroll, fg_color="transparent")
-        header.pack(fill="x", padx=5)
-        header.grid_columnconfigure(0, weight=1)
-        header.grid_columnconfigure(1, weight=0)
-        header.grid_columnconfigure(2, weight=0)
+        # Modifiable inventory count
+        inv_entry = ctk.CTkEntry(frame, textvariable=row['inv_var'], width=60)
+        inv_entry.grid(row=0, column=1, padx=5)
+        # Leaving the field buffers the edit; Return also applies everything buffered
+        inv_entry.bind("<FocusOut>", lambda e: self.update_product_inventory(row['product'], row['inv_var']))
+        inv_entry.bind("<Return>",
+                       lambda e: self.update_product_inventory(row['product'], row['inv_var'], apply=True))
         
-        ctk.CTkLabel(header, text="Filament", width=180, anchor="w", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, sticky="w")
-        ctk.CTkLabel(header, text="Rolls", width=60, font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, padx=5)
-        ctk.CTkLabel(header, text="Grams", width=70, font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, padx=5)
+        # Non-modifiable printable count
+        row['printable_label'] = ctk.CTkLabel(frame, text="", width=60)
+        row['printable_label'].grid(row=0, column=2, padx=5)
+
+        # Filament that runs out first
+        row['bottleneck_label'] = ctk.CTkLabel(frame, text="", width=120, anchor="w", text_color=("gray40", "gray60"))
+        row['bottleneck_label'].grid(row=0, column=3, padx=5)
+        return row
+
+    def _bind_product_row(self, row, prod):
+        # A pooled row is rebound while scrolling, possibly with its entry still focused
+        if self._typed_into(row, 'inv_var'):
+            self.update_product_inventory(row['product'], row['inv_var'])
+        row['product'] = prod
+        configure_if_changed(row['size_label'], text=prod.size)
+        count = self.pending_edits.get(('product', prod.id), 'inventory_count', prod.inventory_count)
+        self._show_in_entry(row, 'inv_var', str(count))
+        capacity = self.printable_counts.get(prod.id)
+        bottleneck = capacity.bottleneck if capacity else None
+        configure_if_changed(row['printable_label'], text=str(capacity.count if capacity else 0))
+        configure_if_changed(row['bottleneck_label'], text=f"{bottleneck.brand} {bottleneck.color}" if bottleneck else "-")
+
+    def load_filaments(self):
+        self.show_filaments(list(InventoryService.get_all_filaments()))
+
+    def show_filaments(self, filaments):
+        self.all_filaments = filaments
+        self.fil_list.set_rows(('filament', fil) for fil in self.all_filaments)
+
+    def _create_filament_row(self, container):
+        row = {'filament': None, 'rolls_var': ctk.StringVar(), 'grams_var': ctk.StringVar(), 'shown': {}}
+        frame = ctk.CTkFrame(container, fg_color="transparent")
+        frame.pack(fill="both", expand=True, pady=2, padx=5)
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_columnconfigure(1, weight=0)
+        frame.grid_columnconfigure(2, weight=0)
+        
+        row['name_label'] = ctk.CTkLabel(frame, text="", width=180, anchor="w")
+        row['name_label'].grid(row=0, column=0, sticky="w")
         
-        for fil in self.all_filaments:
-            row = ctk.CTkFrame(self.fil_scroll, fg_color="transparent")
-            row.pack(fill="x", pady=2, padx=5)
-            row.grid_columnconfigure(0, weight=1)
-            row.grid_columnconfigure(1, weight=0)
-            row.grid_columnconfigure(2, weight=0)
-            
-            ctk.CTkLabel(row, text=f"{fil.brand} {fil.color}", width=180, anchor="w").grid(row=0, column=0, sticky="w")
-            
-            # Modifiable rolls in stock
-            rolls_var = ctk.StringVar(value=str(fil.rolls_in_stock))
-            rolls_entry = ctk.CTkEntry(row, textvariable=rolls_var, width=60)
-            rolls_entry.grid(row=0, column=1, padx=5)
-            
-            rolls_entry.bind("<FocusOut>", lambda e, f=fil, v=rolls_var: self.update_filament_rolls(f, v))
-            rolls_entry.bind("<Return>", lambda e, f=fil, v=rolls_var: self.update_filament_rolls(f, v))
-
-            # Modifiable grams remaining
-            grams_var = ctk.StringVar(value=f"{fil.grams_remaining:.1f}")
-            grams_entry = ctk.CTkEntry(row, textvariable=grams_var, width=70)
-            grams_entry.grid(row=0, column=2, padx=5)
-            
-            grams_entry.bind("<FocusOut>", lambda e, f=fil, v=grams_var: self.update_filament_grams(f, v))
-            grams_entry.bind("<Return>", lambda e, f=fil, v=grams_var: self.update_filament_grams(f, v))
-
-    def load_todo(self):
-        for widget in self.todo_scroll.winfo_children():
-            widget.destroy()
-
-        todo_data = InventoryService.get_todo_data()
+        # Modifiable rolls in stock
+        rolls_entry = ctk.CTkEntry(frame, textvariable=row['rolls_var'], width=60)
+        rolls_entry.grid(row=0, column=1, padx=5)
+        rolls_entry.bind("<FocusOut>", lambda e: self.update_filament_rolls(row['filament'], row['rolls_var']))
+        rolls_entry.bind("<Return>",
+                         lambda e: self.update_filament_rolls(row['filament'], row['rolls_var'], apply=True))
 
+        # Modifiable grams remaining
+        grams_entry = ctk.CTkEntry(frame, textvariable=row['grams_var'], width=70)
+        grams_entry.grid(row=0, column=2, padx=5)
+        grams_entry.bind("<FocusOut>", lambda e: self.update_filament_grams(row['filament'], row['grams_var']))
+        grams_entry.bind("<Return>",
+                         lambda e: self.update_filament_grams(row['filament'], row['grams_var'], apply=True))
+        return row
+
+    def _bind_filament_row(self, row, fil):
+        if self._typed_into(row, 'rolls_var'):
+            self.update_filament_rolls(row['filament'], row['rolls_var'])
+        if self._typed_into(row, 'grams_var'):
+            self.update_filament_grams(row['filament'], row['grams_var'])
+        row['filament'] = fil
+        configure_if_changed(row['name_label'], text=f"{fil.brand} {fil.color}")
+        key = ('filament', fil.id)
+        self._show_in_entry(row, 'rolls_var', str(self.pending_edits.get(key, 'rolls_in_stock', fil.rolls_in_stock)))
+        grams = self.pending_edits.get(key, 'grams_remaining', fil.grams_remaining)
+        self._show_in_entry(row, 'grams_var', f"{grams:.1f}")
+
+    @staticmethod
+    def _typed_into(row, var_name):
+        """Whether the entry holds text typed since the last bind, not yet buffered by FocusOut/Return."""
+        shown = row['shown'].get(var_name)
+        return shown is not None and row[var_name].get() != shown
+
+    @staticmethod
+    def _show_in_entry(row, var_name, text):
+        set_if_changed(row[var_name], text)
+        row['shown'][var_name] = text
+
+    def build_todo(self):
         # Create a container frame for columns
         container = ctk.CTkFrame(self.todo_scroll, fg_color="transparent")
         container.pack(fill="both", expand=True)
@@ -205,88 +279,179 @@ class OverviewView(ctk.CTkFrame):
         print_col.grid(row=0, column=0, sticky="nsew", padx=5)
 
         ctk.CTkLabel(print_col, text="NEXT THINGS TO PRINT", font=ctk.CTkFont(size=12, weight="bold"), text_color=("gray40", "gray60")).pack(pady=(10, 5))
-        
-        if not todo_data['to_print']:
-            ctk.CTkLabel(print_col, text="Everything is stocked!").pack()
-        else:
-            for prod in todo_data['to_print']:
-                needed = 3 - prod.inventory_count
-                row = ctk.CTkFrame(print_col, fg_color="transparent")
-                row.pack(fill="x", padx=5, pady=2)
-                ctk.CTkLabel(row, text=str(prod), anchor="w").pack(side="left")
-                ctk.CTkLabel(row, text=f"Print {needed}", font=ctk.CTkFont(weight="bold"), text_color="orange").pack(side="right")
+        self.print_empty_label = ctk.CTkLabel(print_col, text="Everything is stocked!")
+        self.print_rows = KeyedRows(print_col, self._create_todo_row, self._bind_print_row)
 
         # Right Column: Filaments to Order
         order_col = ctk.CTkFrame(container, fg_color="transparent")
         order_col.grid(row=0, column=1, sticky="nsew", padx=5)
 
         ctk.CTkLabel(order_col, text="FILAMENTS TO ORDER", font=ctk.CTkFont(size=12, weight="bold"), text_color=("gray40", "gray60")).pack(pady=(10, 5))
+        self.order_empty_label = ctk.CTkLabel(order_col, text="Stock levels sufficient.")
+        self.order_rows = KeyedRows(order_col, self._create_todo_row, self._bind_order_row,
+                                    key=lambda item: item['filament'])
 
-        if not todo_data['to_order']:
-            ctk.CTkLabel(order_col, text="Stock levels sufficient.").pack()
-        else:
-            for item in todo_data['to_order']:
-                fil = item['filament']
-                row = ctk.CTkFrame(order_col, fg_color="transparent")
-                row.pack(fill="x", padx=5, pady=2)
-                ctk.CTkLabel(row, text=f"{fil.brand} {fil.color}", anchor="w").pack(side="left")
-                ctk.CTkLabel(row, text=f"Order {item['rolls']} rolls", font=ctk.CTkFont(weight="bold"), text_color="red").pack(side="right")
-
-    def update_product_inventory(self, product, var):
+    def show_todo(self, todo_data):
+        self.print_rows.update(todo_data['to_print'])
+        self._show_if_empty(self.print_empty_label, todo_data['to_print'])
+        self.order_rows.update(todo_data['to_order'])
+        self._show_if_empty(self.order_empty_label, todo_data['to_order'])
+
+    def _show_if_empty(self, label, items):
+        if items:
+            label.pack_forget()
+        elif not label.winfo_manager():
+            label.pack()
+
+    def _create_todo_row(self, frame):
+        name_label = ctk.CTkLabel(frame, text="", anchor="w")
+        name_label.pack(side="left")
+        action_label = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(weight="bold"))
+        action_label.pack(side="right")
+        return name_label, action_label
+
+    def _bind_print_row(self, labels, prod):
+        needed = 3 - prod.inventory_count
+        configure_if_changed(labels[0], text=str(prod))
+        configure_if_changed(labels[1], text=f"Print {needed}", text_color="orange")
+
+    def _bind_order_row(self, labels, item):
+        fil = item['filament']
+        configure_if_changed(labels[0], text=f"{fil.brand} {fil.color}")
+        configure_if_changed(labels[1], text=f"Order {item['rolls']} rolls", text_color="red")
+
+    def update_product_inventory(self, product, var, apply=False):
+        key = ('product', product.id)
         try:
-            new_val = int(var.get())
-            if product.inventory_count != new_val:
-                product.inventory_count = new_val
-                product.save()
-                self.status_label.configure(text=f"Updated {product} inventory to {new_val}", text_color="green")
-                self.load_todo() # Refresh todo list
+            self._buffer_edit(key, 'inventory_count', int(var.get()), product.inventory_count)
         except ValueError:
-            var.set(str(product.inventory_count))
+            var.set(str(self.pending_edits.get(key, 'inventory_count', product.inventory_count)))
+        if apply:
+            self.apply_edits()
 
-    def update_filament_rolls(self, filament, var):
+    def update_filament_rolls(self, filament, var, apply=False):
+        key = ('filament', filament.id)
         try:
-            new_val = int(var.get())
-            if filament.rolls_in_stock != new_val:
-                filament.rolls_in_stock = new_val
-                filament.save()
-                self.status_label.configure(text=f"Updated {filament} rolls to {new_val}", text_color="green")
-                # Reload products to update printable count and todo
-                self.load_products()
-                self.load_todo()
+            self._buffer_edit(key, 'rolls_in_stock', int(var.get()), filament.rolls_in_stock)
         except ValueError:
-            var.set(str(filament.rolls_in_stock))
+            var.set(str(self.pending_edits.get(key, 'rolls_in_stock', filament.rolls_in_stock)))
+        if apply:
+            self.apply_edits()
 
-    def update_filament_grams(self, filament, var):
+    def update_filament_grams(self, filament, var, apply=False):
+        key = ('filament', filament.id)
         try:
-            new_val = Decimal(var.get())
-            if filament.grams_remaining != new_val:
-                filament.grams_remaining = new_val
-                filament.save()
-                self.status_label.configure(text=f"Updated {filament} grams to {new_val}", text_color="green")
-                # Reload products to update printable count and todo
-                self.load_products()
-                self.load_todo()
+            self._buffer_edit(key, 'grams_remaining', Decimal(var.get()), filament.grams_remaining)
         except Exception:
-            var.set(f"{filament.grams_remaining:.1f}")
+            var.set(f"{self.pending_edits.get(key, 'grams_remaining', filament.grams_remaining):.1f}")
+        if apply:
+            self.apply_edits()
+
+    def _buffer_edit(self, key, field, value, stored):
+        # Typing the stored value back cancels the edit
+        if value == stored:
+            self.pending_edits.discard(key, field)
+        else:
+            self.pending_edits.put(key, field, value)
+
+    def apply_edits(self):
+        """Writes the buffered stock edits now instead of after the idle delay."""
+        self.pending_edits.flush()
+
+    def write_stock_edits(self, edits):
+        """Writes flushed stock edits in one transaction on the worker, then updates only the rows they affect."""
+        products = {p.id: p for p in self.all_products}
+        filaments = {f.id: f for f in self.all_filaments}
+        product_counts = {}
+        filament_stock = {}
+        for (kind, entity_id), fields in edits.items():
+            if kind == 'product' and entity_id in products:
+                product_counts[products[entity_id]] = fields['inventory_count']
+            elif kind == 'filament' and entity_id in filaments:
+                filament_stock[filaments[entity_id]] = fields
+        # Not tied to the overview's group: leaving the tab must not drop the write
+        run_in_background(self, self.save_stock_edits, product_counts, filament_stock, list(self.all_products),
+                          on_done=lambda changes: self.show_stock_changes(product_counts, filament_stock, changes),
+                          on_error=self.stock_edits_failed)
+
+    @staticmethod
+    def save_stock_edits(products, filaments, all_products):
+        """
+        Applies the edits and fetches what they change on screen: the IDs of the
+        products using the edited filaments, their printable counts and the to-do
+        list. Runs on the service worker thread.
+        """
+        InventoryService.apply_stock_edits(products, filaments)
+        users = InventoryService.products_using_filaments(f.id for f in filaments)
+        affected = [p for p in all_products if p.id in users]
+        return {
+            'users': users,
+            'printable_counts': InventoryService.calculate_printable_counts(affected) if affected else {},
+            'todo': InventoryService.get_todo_data(),
+        }
+
+    def stock_edits_failed(self, error):
+        self.show_error(error)
+        # Nothing was written; show what is stored
+        self.refresh()
+
+    def show_stock_changes(self, products, filaments, changes):
+        """
+        Updates the views of edited products and filaments, the printable
+        counts of the products using the filaments, and the to-do list.
+        """
+        self.status_label.configure(text=f"Saved stock of {len(products) + len(filaments)} items",
+                                    text_color="green")
+        users = changes['users']
+        # A new dict: the old one may belong to a cached snapshot
+        self.printable_counts = {**self.printable_counts, **changes['printable_counts']}
+        product_ids = users | {p.id for p in products}
+        filament_ids = {f.id for f in filaments}
+        self.prod_list.rebind(lambda kind, data: kind == 'product' and data.id in product_ids)
+        self.fil_list.rebind(lambda kind, data: data.id in filament_ids)
+        self.show_todo(changes['todo'])
 
     def record_sale(self):
+        # The sale is checked against the stock as edited; the edits are queued ahead of it
+        self.apply_edits()
         try:
             prod_str = self.sale_product_var.get()
             qty = int(self.sale_qty_var.get())
             val = Decimal(self.sale_value_var.get() or "0")
-            
-            selected_prod = next((p for p in self.all_products if str(p) == prod_str), None)
-            
-            if selected_prod:
-                InventoryService.create_sale(selected_prod, qty, val)
-                self.status_label.configure(text=f"Recorded sale of {qty}x {selected_prod}", text_color="green")
-                self.refresh() # Full refresh to update inventory and filaments
-            else:
-                self.status_label.configure(text="Error: Product not found", text_color="red")
         except Exception as e:
-            self.status_label.configure(text=f"Error: {str(e)}", text_color="red")
+            self.show_error(e)
+            return
+
+        selected_prod = next((p for p in self.all_products if str(p) == prod_str), None)
+        if not selected_prod:
+            self.status_label.configure(text="Error: Product not found", text_color="red")
+            return
+        run_in_background(self, InventoryService.create_sale, selected_prod, qty, val,
+                          on_done=lambda _: self.sale_recorded(qty, selected_prod), on_error=self.show_error)
+
+    def sale_recorded(self, qty, product):
+        self.status_label.configure(text=f"Recorded sale of {qty}x {product}", text_color="green")
+        self.refresh() # Full refresh to update inventory and filaments
+
+    @staticmethod
+    def fetch_overview_data():
+        """Everything the overview shows; runs on the service worker thread."""
+        products = list(InventoryService.get_all_products())
+        return {
+            'products': products,
+            'printable_counts': InventoryService.calculate_printable_counts(products),
+            'filaments': list(InventoryService.get_all_filaments()),
+            'todo': InventoryService.get_todo_data(),
+        }
+
+    def show_overview_data(self, data):
+        self.show_products(data['products'], data['printable_counts'])
+        self.show_filaments(data['filaments'])
+        self.show_todo(data['todo'])
+
+    def show_error(self, error):
+        self.status_label.configure(text=f"Error: {str(error)}", text_color="red")
 
     def refresh(self):
-        self.load_products()
-        self.load_filaments()
-        self.load_todo()
+        view_models.load(self, "overview", self.fetch_overview_data, self.show_overview_data,
+                         on_error=self.show_error, group="overview")
@@ -0,0 +1,63 @@
+# Idle time after the last edit before buffered edits are written
+EDIT_DEBOUNCE_MS = 800
+
+
+class PendingEdits:
+    """
+    Buffers inline edits so that they are written together.
+
+    put(key, field, value) records an edit of one entity; a later edit of the
+    same key and field replaces the earlier one, so each entity is written
+    once however often it was edited. Every put restarts an idle timer of
+    delay_ms on widget; when it fires, or when flush() is called, the buffer
+    is emptied and handed to apply(edits) as {key: {field: value}}.
+    """
+
+    def __init__(self, widget, apply, delay_ms=EDIT_DEBOUNCE_MS):
+        self._widget = widget
+        self._apply = apply
+        self._delay_ms = delay_ms
+        self._edits = {}
+        self._timer = None
+
+    def __len__(self):
+        return len(self._edits)
+
+    def put(self, key, field, value):
+        self._edits.setdefault(key, {})[field] = value
+        self._restart_timer()
+
+    def discard(self, key, field):
+        """Drops a buffered edit, e.g. one changed back to the stored value."""
+        fields = self._edits.get(key)
+        if fields is not None:
+            fields.pop(field, None)
+            if not fields:
+                del self._edits[key]
+        if not self._edits:
+            self._cancel_timer()
+
+    def get(self, key, field, default=None):
+        """The buffered value of a field, or default if it has no pending edit."""
+        return self._edits.get(key, {}).get(field, default)
+
+    def flush(self):
+        """Applies the buffered edits now; a no-op if there are none."""
+        self._cancel_timer()
+        if not self._edits:
+            return
+        edits, self._edits = self._edits, {}
+        self._apply(edits)
+
+    def _restart_timer(self):
+        self._cancel_timer()
+        self._timer = self._widget.after(self._delay_ms, self._on_idle)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._widget.after_cancel(self._timer)
+            self._timer = None
+
+    def _on_idle(self):
+        self._timer = None
+        self.flush()
@@ -1,5 +1,7 @@
 import customtkinter as ctk
 from services.inventory_service import InventoryService
+from gui.virtual_list import VirtualList, button_row_template
+from gui.view_models import view_models
 from decimal import Decimal
 
 class ProductView(ctk.CTkFrame):
@@ -21,8 +23,11 @@ class ProductView(ctk.CTkFrame):
         self.list_label = ctk.CTkLabel(self.list_frame, text="Product List", font=ctk.CTkFont(size=16, weight="bold"))
         self.list_label.pack(pady=10)
         
-        self.scrollable_frame = ctk.CTkScrollableFrame(self.list_frame, label_text="Available Products")
-        self.scrollable_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        ctk.CTkLabel(self.list_frame, text="Available Products").pack()
+        self.product_list = VirtualList(self.list_frame, templates={
+            'product': button_row_template(self.select_product),
+        })
+        self.product_list.pack(fill="both", expand=True, padx=10, pady=10)
         
         self.add_btn = ctk.CTkButton(self.list_frame, text="Add New Product", command=self.prepare_new_product)
         self.add_btn.pack(pady=10)
@@ -76,36 +81,17 @@ class ProductView(ctk.CTkFrame):
         self.status_label.pack()
         
         self.all_filaments = []
-        self.load_filaments_list()
-        self.load_products()
-
-    def load_filaments_list(self):
-        try:
-            self.all_filaments = list(InventoryService.get_all_filaments())
-        except Exception as e:
-            print(f"Error loading filaments for product parts: {e}")
+        self.refresh()
 
     def load_products(self):
-        # Clear current list
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-            
         try:
-            products = InventoryService.get_all_products()
-            for prod in products:
-                btn = ctk.CTkButton(
-                    self.scrollable_frame, 
-                    text=str(prod),
-                    fg_color="transparent",
-                    text_color=("gray10", "gray90"),
-                    hover_color=("gray70", "gray30"),
-                    anchor="w",
-                    command=lambda p=prod: self.select_product(p)
-                )
-                btn.pack(fill="x", padx=5, pady=2)
+            self.show_products(list(InventoryService.get_all_products()))
         except Exception as e:
             print(f"Error loading products: {e}")
 
+    def show_products(self, products):
+        self.product_list.set_rows(('product', prod) for prod in products)
+
     def select_product(self, product):
         self.selected_product_id = product.id
         self.type_var.set(product.product_type)
@@ -277,9 +263,21 @@ class ProductView(ctk.CTkFrame):
         else:
             self.status_label.configure(text="No product selected to delete.", text_color="orange")
 
+    @staticmethod
+    def fetch_product_data():
+        """Runs on the service worker thread."""
+        return {
+            'filaments': list(InventoryService.get_all_filaments()),
+            'products': list(InventoryService.get_all_products()),
+        }
+
     def refresh(self):
-        self.load_filaments_list()
-        self.load_products()
+        view_models.load(self, "products", self.fetch_product_data, self.show_product_data,
+                         on_error=lambda e: print(f"Error loading products: {e}"), group="products")
+
+    def show_product_data(self, data):
+        self.all_filaments = data['filaments']
+        self.show_products(data['products'])
         
         # Update existing dropdowns with new filament list
         filament_options = [f"{f.brand} {f.color} {f.material}" for f in self.all_filaments]
@@ -0,0 +1,70 @@
+import customtkinter as ctk
+
+
+def configure_if_changed(widget, **options):
+    """Configures only the options whose value differs from what the widget currently has."""
+    changed = {name: value for name, value in options.items() if widget.cget(name) != value}
+    if changed:
+        widget.configure(**changed)
+
+
+def set_if_changed(var, value):
+    """Sets a tkinter variable only if its value differs."""
+    if var.get() != value:
+        var.set(value)
+
+
+class KeyedRows:
+    """
+    Keeps the rows packed into a container in step with a list of items.
+
+    Each row lives in its own transparent frame; create(frame) builds its
+    widgets and returns a handle, bind(handle, item) fills them. update()
+    matches items to existing rows by key(item): rows for keys that are still
+    present are kept and rebound, rows for new keys are created and rows for
+    keys that disappeared are destroyed. Existing rows are only re-packed
+    when their order changes. Bind functions should use configure_if_changed /
+    set_if_changed so that rebinding an unchanged row repaints nothing.
+    """
+
+    def __init__(self, container, create, bind, key=lambda item: item, **pack_options):
+        self._container = container
+        self._create = create
+        self._bind = bind
+        self._key = key
+        self._pack_options = pack_options or {'fill': "x", 'padx': 5, 'pady': 2}
+        self._rows = {}   # key -> (frame, handle)
+        self._order = []  # keys in packed order
+
+    def __len__(self):
+        return len(self._order)
+
+    def update(self, items):
+        rows = {}
+        order = []
+        for item in items:
+            key = self._key(item)
+            row = self._rows.pop(key, None)
+            if row is None:
+                frame = ctk.CTkFrame(self._container, fg_color="transparent")
+                row = (frame, self._create(frame))
+            self._bind(row[1], item)
+            rows[key] = row
+            order.append(key)
+
+        for frame, _ in self._rows.values():
+            frame.destroy()
+
+        kept = [key for key in self._order if key in rows]
+        if order[:len(kept)] == kept:
+            # Only appended rows: pack them after the existing ones
+            for key in order[len(kept):]:
+                rows[key][0].pack(**self._pack_options)
+        else:
+            for key in order:
+                rows[key][0].pack_forget()
+            for key in order:
+                rows[key][0].pack(**self._pack_options)
+
+        self._rows = rows
+        self._order = order
@@ -0,0 +1,189 @@
+import customtkinter as ctk
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import matplotlib.dates as mdates
+import numpy as np
+from services.analytics_service import MIN_PIXELS_PER_POINT
+
+# Colors per appearance mode: (background, text, grid); backgrounds are the CTk defaults
+THEMES = {
+    "Dark": ("#2b2b2b", "white", "#4a4a4a"),
+    "Light": ("#ebebeb", "black", "#d1d1d1"),
+}
+
+# Date labels on the x axis per analytics bucket; week ranges can span years
+DATE_FORMATS = {'day': '%m-%d', 'week': '%Y-%m-%d', 'month': '%Y-%m'}
+
+
+def bucket_starts(start, end, bucket='day'):
+    """Returns the datetime64[D] start of every day, week (Monday) or month overlapping start..end."""
+    first = np.datetime64(start.date(), 'D')
+    last = np.datetime64(end.date(), 'D')
+    if bucket == 'week':
+        monday = first - (first.astype(np.int64) - 4) % 7  # 1970-01-01 was a Thursday
+        return np.arange(monday, last + 1, 7)
+    if bucket == 'month':
+        return np.arange(first.astype('datetime64[M]'), last.astype('datetime64[M]') + 1).astype('datetime64[D]')
+    return np.arange(first, last + 1)
+
+
+def daily_series(daily_stats, start, end, bucket='day'):
+    """
+    Returns (dates, revenue, profit) for every bucket from start to end
+    inclusive: a datetime64[D] array of bucket starts and two float arrays,
+    0 for buckets without sales. daily_stats is {'YYYY-MM-DD': {'revenue',
+    'profit', ...}} keyed by bucket start, as returned by get_analytics_data.
+    """
+    dates = bucket_starts(start, end, bucket)
+    revenue = np.zeros(len(dates))
+    profit = np.zeros(len(dates))
+    if daily_stats and len(dates):
+        days = list(daily_stats)
+        keys = np.array(days, dtype='datetime64[D]')
+        index = np.minimum(np.searchsorted(dates, keys), len(dates) - 1)
+        found = dates[index] == keys
+        revenue[index[found]] = np.array([float(daily_stats[d]['revenue']) for d in days])[found]
+        profit[index[found]] = np.array([float(daily_stats[d]['profit']) for d in days])[found]
+    return dates, revenue, profit
+
+
+def downsample_minmax(x, y, max_points):
+    """
+    Reduces (x, y) to at most max_points points by splitting it into
+    max_points // 2 runs and keeping the minimum and maximum of each, in
+    their original order, so peaks and dips survive. Shorter series are returned as is.
+    """
+    if len(x) <= max_points or max_points < 2:
+        return x, y
+    runs = max_points // 2
+    edges = np.linspace(0, len(y), runs + 1).astype(np.int64)
+    lows = np.minimum.reduceat(y, edges[:-1])
+    highs = np.maximum.reduceat(y, edges[:-1])
+    # Index of the first occurrence of each run's min and max
+    run_of = np.repeat(np.arange(runs), np.diff(edges))
+    positions = np.arange(len(y))
+    is_low = y == lows[run_of]
+    is_high = y == highs[run_of]
+    first_low = np.full(runs, len(y))
+    first_high = np.full(runs, len(y))
+    np.minimum.at(first_low, run_of[is_low], positions[is_low])
+    np.minimum.at(first_high, run_of[is_high], positions[is_high])
+    keep = np.unique(np.concatenate([first_low, first_high]))
+    return x[keep], y[keep]
+
+
+class SalesChart:
+    """
+    Revenue and profit per day, week or month, drawn on one Figure and FigureCanvasTkAgg that
+    live as long as the chart.
+
+    set_series() swaps the line data in place. When the axis limits stay the
+    same only the lines are redrawn over the cached background (blitting);
+    otherwise the canvas does one full redraw, which also refreshes the cached
+    background.
+    """
+
+    def __init__(self, master):
+        self.figure = Figure(figsize=(8, 4), dpi=100)
+        self.ax = self.figure.add_subplot()
+        self.ax.xaxis_date()
+        self.ax.xaxis.set_major_formatter(mdates.DateFormatter(DATE_FORMATS['day']))
+
+        # Animated lines are left out of full redraws and drawn by _draw_lines
+        self.revenue_line, = self.ax.plot([], [], label='Revenue', color='#1f77b4', marker='o',
+                                          linewidth=2, markersize=4, animated=True)
+        self.profit_line, = self.ax.plot([], [], label='Profit', color='#2ca02c', marker='s',
+                                         linewidth=2, markersize=4, animated=True)
+
+        self.ax.set_title("Sales Over Time", fontsize=14, fontweight='bold', pad=15)
+        self.ax.set_xlabel("Date", fontsize=10)
+        self.ax.set_ylabel("USD ($)", fontsize=10)
+        self.legend = self.ax.legend()
+        self.figure.autofmt_xdate()
+        self.figure.tight_layout()
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self._background = None
+        self._theme = None
+        self._bucket = 'day'
+        self.apply_theme()
+
+    def apply_theme(self):
+        """Colors the figure for the current appearance mode; a no-op if it has not changed."""
+        theme = THEMES.get(ctk.get_appearance_mode(), THEMES["Light"])
+        if theme == self._theme:
+            return False
+        self._theme = theme
+        bg_color, text_color, grid_color = theme
+
+        self.figure.patch.set_facecolor(bg_color)
+        self.ax.set_facecolor(bg_color)
+        self.ax.title.set_color(text_color)
+        self.ax.xaxis.label.set_color(text_color)
+        self.ax.yaxis.label.set_color(text_color)
+        self.legend.get_frame().set_facecolor(bg_color)
+        self.legend.get_frame().set_edgecolor(grid_color)
+        for text in self.legend.get_texts():
+            text.set_color(text_color)
+        self.ax.grid(True, linestyle='--', alpha=0.6, color=grid_color)
+        for spine in self.ax.spines.values():
+            spine.set_color(grid_color)
+        self.ax.tick_params(colors=text_color, labelsize=9)
+        return True
+
+    def width_px(self):
+        """Current width of the canvas in pixels."""
+        return int(self.figure.get_figwidth() * self.figure.dpi)
+
+    def set_series(self, daily_stats, start, end, bucket='day'):
+        """Shows the revenue and profit per bucket from start to end."""
+        dates, revenue, profit = daily_series(daily_stats, start, end, bucket)
+        x = mdates.date2num(dates)
+        # The same point budget AnalyticsService.choose_bucket picks the bucket by: day and week
+        # series always fit it, so this only thins month series of ranges too long for one point a month
+        max_points = self.width_px() // MIN_PIXELS_PER_POINT
+        self.revenue_line.set_data(*downsample_minmax(x, revenue, max_points))
+        self.profit_line.set_data(*downsample_minmax(x, profit, max_points))
+
+        limits = (self._x_limits(x), self._y_limits(revenue, profit))
+        restyled = self.apply_theme()
+        if bucket != self._bucket:
+            self._bucket = bucket
+            self.ax.xaxis.set_major_formatter(mdates.DateFormatter(DATE_FORMATS[bucket]))
+            restyled = True
+        if self._background is None or restyled or limits != (self.ax.get_xlim(), self.ax.get_ylim()):
+            # Ticks, labels and background change: full redraw, then _on_draw adds the lines
+            self.ax.set_xlim(*limits[0])
+            self.ax.set_ylim(*limits[1])
+            self.canvas.draw_idle()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        self.ax.draw_artist(self.revenue_line)
+        self.ax.draw_artist(self.profit_line)
+        self.canvas.blit(self.ax.bbox)
+
+    @staticmethod
+    def _x_limits(x):
+        if not len(x):
+            return (0.0, 1.0)
+        margin = max(x[-1] - x[0], 1.0) * 0.02
+        return (float(x[0] - margin), float(x[-1] + margin))
+
+    @staticmethod
+    def _y_limits(revenue, profit):
+        values = np.concatenate([revenue, profit])
+        low = min(float(values.min()), 0.0) if len(values) else 0.0
+        high = float(values.max()) if len(values) else 0.0
+        if high <= low:
+            high = low + 1.0
+        margin = (high - low) * 0.05
+        return (low - margin if low < 0 else low, high + margin)
@@ -1,5 +1,8 @@
 import customtkinter as ctk
-from services.inventory_service import InventoryService
+from services.inventory_service import InventoryService, SALES_PAGE_SIZE
+from gui.virtual_list import VirtualList, button_row_template
+from gui.view_models import view_models
+from gui.background import run_in_background
 from datetime import datetime
 from decimal import Decimal
 
@@ -9,6 +12,9 @@ class SalesView(ctk.CTkFrame):
         
         self.selected_sale_id = None
         self.all_products = []
+        self.sales = []
+        self.sales_cursor = None  # where the next page starts; None once all sales are loaded
+        self.loading_cursor = None  # the cursor of the page being fetched, if any
         
         # Grid layout: Left (List) and Right (Details)
         self.grid_columnconfigure(0, weight=1)
@@ -22,8 +28,11 @@ class SalesView(ctk.CTkFrame):
         self.list_label = ctk.CTkLabel(self.list_frame, text="Sale History", font=ctk.CTkFont(size=16, weight="bold"))
         self.list_label.pack(pady=10)
         
-        self.scrollable_frame = ctk.CTkScrollableFrame(self.list_frame, label_text="Recent Sales")
-        self.scrollable_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        ctk.CTkLabel(self.list_frame, text="Recent Sales").pack()
+        self.sale_list = VirtualList(self.list_frame, templates={
+            'sale': button_row_template(self.select_sale),
+        }, on_near_end=self.load_more_sales)
+        self.sale_list.pack(fill="both", expand=True, padx=10, pady=10)
         
         # --- Right Side: Details ---
         self.details_frame = ctk.CTkFrame(self)
@@ -35,6 +44,7 @@ class SalesView(ctk.CTkFrame):
         # Form fields
         self.product_var = ctk.StringVar()
         self.date_var = ctk.StringVar()
+        self.quantity_var = ctk.StringVar()
         self.value_var = ctk.StringVar()
         
         ctk.CTkLabel(self.details_frame, text="Product:").grid(row=1, column=0, padx=10, pady=5, sticky="e")
@@ -45,54 +55,64 @@ class SalesView(ctk.CTkFrame):
         self.date_entry = ctk.CTkEntry(self.details_frame, textvariable=self.date_var, width=200)
         self.date_entry.grid(row=2, column=1, padx=10, pady=5, sticky="w")
         
-        ctk.CTkLabel(self.details_frame, text="Total Value ($):").grid(row=3, column=0, padx=10, pady=5, sticky="e")
+        ctk.CTkLabel(self.details_frame, text="Quantity:").grid(row=3, column=0, padx=10, pady=5, sticky="e")
+        self.quantity_entry = ctk.CTkEntry(self.details_frame, textvariable=self.quantity_var, width=100)
+        self.quantity_entry.grid(row=3, column=1, padx=10, pady=5, sticky="w")
+        
+        ctk.CTkLabel(self.details_frame, text="Total Value ($):").grid(row=4, column=0, padx=10, pady=5, sticky="e")
         self.value_entry = ctk.CTkEntry(self.details_frame, textvariable=self.value_var, width=100)
-        self.value_entry.grid(row=3, column=1, padx=10, pady=5, sticky="w")
+        self.value_entry.grid(row=4, column=1, padx=10, pady=5, sticky="w")
         
         self.save_btn = ctk.CTkButton(self.details_frame, text="Save Changes", command=self.save_sale)
-        self.save_btn.grid(row=4, column=0, pady=20)
+        self.save_btn.grid(row=5, column=0, pady=20)
         
         self.delete_btn = ctk.CTkButton(self.details_frame, text="Delete Sale", fg_color="red", hover_color="darkred", command=self.delete_sale)
-        self.delete_btn.grid(row=4, column=1, pady=20)
+        self.delete_btn.grid(row=5, column=1, pady=20)
         
         self.status_label = ctk.CTkLabel(self.details_frame, text="")
-        self.status_label.grid(row=5, column=0, columnspan=2)
+        self.status_label.grid(row=6, column=0, columnspan=2)
         
         self.refresh()
 
-    def load_sales(self):
-        # Clear current list
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-            
-        try:
-            sales = InventoryService.get_active_sales()
-            for sale in sales:
-                btn = ctk.CTkButton(
-                    self.scrollable_frame, 
-                    text=str(sale),
-                    fg_color="transparent",
-                    text_color=("gray10", "gray90"),
-                    hover_color=("gray70", "gray30"),
-                    anchor="w",
-                    command=lambda s=sale: self.select_sale(s)
-                )
-                btn.pack(fill="x", padx=5, pady=2)
-        except Exception as e:
-            print(f"Error loading sales: {e}")
+    def show_sales(self, sales, cursor):
+        # A copy: show_more_sales extends the list, which may come from a cached snapshot
+        self.sales = list(sales)
+        self.sales_cursor = cursor
+        self.loading_cursor = None
+        self.sale_list.set_rows(('sale', sale) for sale in self.sales)
 
-    def load_products(self):
-        try:
-            self.all_products = list(InventoryService.get_all_products())
-            product_names = [str(p) for p in self.all_products]
-            self.product_menu.configure(values=product_names)
-        except Exception as e:
-            print(f"Error loading products for sales view: {e}")
+    def load_more_sales(self):
+        """Fetches the next page of sales on the worker; called when the list is scrolled near its end."""
+        if self.sales_cursor is None or self.loading_cursor == self.sales_cursor:
+            return
+        self.loading_cursor = cursor = self.sales_cursor
+        run_in_background(self, InventoryService.get_sales_page, cursor,
+                          on_done=lambda result: self.show_more_sales(cursor, *result),
+                          on_error=self.sales_page_failed, group="sales")
+
+    def show_more_sales(self, cursor, page, next_cursor):
+        # The list was reloaded while the page was on its way
+        if cursor != self.sales_cursor:
+            return
+        self.loading_cursor = None
+        self.sales.extend(page)
+        self.sales_cursor = next_cursor
+        self.sale_list.set_rows(('sale', sale) for sale in self.sales)
+
+    def sales_page_failed(self, error):
+        self.loading_cursor = None
+        print(f"Error loading sales: {error}")
+
+    def show_products(self, products):
+        self.all_products = products
+        product_names = [str(p) for p in self.all_products]
+        self.product_menu.configure(values=product_names)
 
     def select_sale(self, sale):
         self.selected_sale_id = sale.id
         self.product_var.set(str(sale.product))
         self.date_var.set(sale.date.strftime('%Y-%m-%d %H:%M'))
+        self.quantity_var.set(str(sale.quantity))
         self.value_var.set(str(sale.total_value))
         self.status_label.configure(text=f"Editing sale from {sale.date.strftime('%Y-%m-%d')}", text_color=("gray10", "gray90"))
 
@@ -111,31 +131,56 @@ class SalesView(ctk.CTkFrame):
             data = {
                 'product': selected_prod,
                 'date': datetime.strptime(self.date_var.get(), '%Y-%m-%d %H:%M'),
+                'quantity': int(self.quantity_var.get()),
                 'total_value': Decimal(self.value_var.get())
             }
-            
-            InventoryService.update_sale(self.selected_sale_id, **data)
-            self.status_label.configure(text="Saved successfully!", text_color="green")
-            self.load_sales()
         except Exception as e:
-            self.status_label.configure(text=f"Error: {str(e)}", text_color="red")
+            self.show_error(e)
+            return
+
+        sale_id = self.selected_sale_id
+        run_in_background(self, lambda: InventoryService.update_sale(sale_id, **data),
+                          on_done=lambda _: self.sale_saved(), on_error=self.show_error)
+
+    def sale_saved(self):
+        self.status_label.configure(text="Saved successfully!", text_color="green")
+        self.refresh()
 
     def delete_sale(self):
         if self.selected_sale_id:
-            try:
-                InventoryService.delete_sale(self.selected_sale_id)
-                self.status_label.configure(text="Deleted successfully!", text_color="green")
-                self.selected_sale_id = None
-                self.product_var.set("")
-                self.date_var.set("")
-                self.value_var.set("")
-                self.load_sales()
-            except Exception as e:
-                self.status_label.configure(text=f"Error: {str(e)}", text_color="red")
+            run_in_background(self, InventoryService.delete_sale, self.selected_sale_id,
+                              on_done=lambda _: self.sale_deleted(), on_error=self.show_error)
         else:
             self.status_label.configure(text="No sale selected to delete.", text_color="orange")
 
+    def sale_deleted(self):
+        self.status_label.configure(text="Deleted successfully!", text_color="green")
+        self.selected_sale_id = None
+        self.product_var.set("")
+        self.date_var.set("")
+        self.quantity_var.set("")
+        self.value_var.set("")
+        self.refresh()
+
+    def show_error(self, error):
+        self.status_label.configure(text=f"Error: {str(error)}", text_color="red")
+
     def refresh(self):
         """Called when database is switched or view is focused."""
-        self.load_products()
-        self.load_sales()
+        limit = max(len(self.sales), SALES_PAGE_SIZE)
+        view_models.load(self, "sales", lambda: self.fetch_sales_data(limit), self.show_sales_data,
+                         on_error=lambda e: print(f"Error loading sales: {e}"), group="sales")
+
+    @staticmethod
+    def fetch_sales_data(limit):
+        """Runs on the service worker thread."""
+        sales, cursor = InventoryService.get_sales_page(limit=limit)
+        return {
+            'products': list(InventoryService.get_all_products()),
+            'sales': sales,
+            'cursor': cursor,
+        }
+
+    def show_sales_data(self, data):
+        self.show_products(data['products'])
+        self.show_sales(data['sales'], data['cursor'])
@@ -0,0 +1,56 @@
+from models.base import data_version
+from gui.background import run_in_background
+from collections import namedtuple
+
+# The data a view rendered, and the data version it was fetched at
+Snapshot = namedtuple('Snapshot', ['version', 'data'])
+
+
+class ViewModelCache:
+    """
+    Stale-while-revalidate cache of the data each view renders, keyed by view
+    (and by its parameters, e.g. the analytics date range).
+
+    load() first renders the last snapshot for the key, unless the view is
+    already showing it. If nothing has been written since the snapshot was
+    taken (the data version is unchanged) that is all, so switching tabs
+    costs no database time. Otherwise the data is fetched again on the
+    service worker and rendered when it arrives.
+    """
+
+    def __init__(self):
+        self._snapshots = {}  # key -> Snapshot
+        self._shown = {}      # view -> Snapshot it last rendered
+
+    def load(self, view, key, fetch, render, on_error=None, group=None):
+        """Renders the data for `key` with render(data), fetching it with fetch() if it may be stale."""
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None:
+            if self._shown.get(view) is not snapshot:
+                self._shown[view] = snapshot
+                render(snapshot.data)
+            if self.is_current(key):
+                return
+
+        # Read before fetching: a write racing with the fetch leaves the new snapshot stale
+        version = data_version()
+
+        def fetched(data):
+            snapshot = Snapshot(version, data)
+            self._snapshots[key] = snapshot
+            self._shown[view] = snapshot
+            render(data)
+
+        run_in_background(view, fetch, on_done=fetched, on_error=on_error, group=group)
+
+    def is_current(self, key):
+        """Whether the snapshot for `key` exists and nothing has been written since it was taken."""
+        snapshot = self._snapshots.get(key)
+        return snapshot is not None and snapshot.version == data_version()
+
+    def clear(self):
+        self._snapshots.clear()
+        self._shown.clear()
+
+
+view_models = ViewModelCache()
@@ -0,0 +1,226 @@
+import sys
+import customtkinter as ctk
+from gui.reconcile import configure_if_changed
+
+# Lists alive now. The mouse wheel is bound once per application (bind_all
+# bindings cannot be removed one at a time) and dispatched to these.
+_wheel_targets = set()
+
+
+def _dispatch_mouse_wheel(event):
+    for target in list(_wheel_targets):
+        target._on_mouse_wheel(event)
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list that only builds widgets for the rows currently visible.
+
+    Rows are (kind, data) tuples and every row is row_height tall. For each
+    kind, templates[kind] is a (create, bind) pair: create(container) builds
+    the widgets of one row inside a fixed-height container and returns a
+    handle (any object); bind(handle, data) fills them for a row.
+
+    Rows scrolled out of view hand their container back to a per-kind pool
+    and are rebound to the rows scrolling in, so the number of widgets is
+    proportional to the visible height, not to the number of rows.
+
+    set_rows() reconciles by key(kind, data), which defaults to (kind, data);
+    model instances compare by primary key, so a refreshed query keeps its
+    rows. Visible rows whose key is still present keep their widgets and are
+    only rebound, so bind functions should use the gui.reconcile setters to
+    leave unchanged widgets untouched.
+
+    on_near_end, if given, is called (after the current layout, from the
+    event loop) whenever the view reaches the last NEAR_END_ROWS rows; use it
+    to load the next page and append it with set_rows().
+    """
+
+    WHEEL_ROWS = 3  # rows scrolled per mouse wheel notch
+    NEAR_END_ROWS = 10  # on_near_end fires once the last visible row is this close to the end
+
+    def __init__(self, master, templates, row_height=32, key=lambda kind, data: (kind, data),
+                 on_near_end=None, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+
+        self._templates = templates
+        self._row_height = row_height
+        self._key = key
+        self._on_near_end = on_near_end
+        self._near_end_pending = False
+        self._rows = []
+        self._offset = 0      # scroll position, in unscaled pixels
+        self._visible = {}    # row index -> (key, (kind, container, handle))
+        self._placed_y = {}   # container -> y it is currently placed at
+        self._pools = {kind: [] for kind in templates}
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self._viewport.grid(row=0, column=0, sticky="nsew")
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self._viewport.bind("<Configure>", lambda event: self._layout())
+        root = self._root()
+        if not getattr(root, "_virtual_list_wheel_bound", False):
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.bind_all(sequence, _dispatch_mouse_wheel, add="+")
+            root._virtual_list_wheel_bound = True
+        _wheel_targets.add(self)
+
+    def destroy(self):
+        _wheel_targets.discard(self)
+        super().destroy()
+
+    @property
+    def rows(self):
+        return self._rows
+
+    def set_rows(self, rows):
+        """Replaces the list contents, reusing the widgets of visible rows whose key is unchanged."""
+        self._rows = list(rows)
+        # Several visible rows can share a key (e.g. the same color header under two types)
+        retained = {}
+        for key, entry in self._visible.values():
+            retained.setdefault(key, []).append(entry)
+        self._visible = {}
+        self._layout(retained)
+        for entries in retained.values():
+            for entry in entries:
+                self._free(entry)
+
+    def rebind(self, predicate):
+        """
+        Rebinds the visible rows for which predicate(kind, data) is true, for
+        data changed in place; the other rows are left alone.
+        """
+        for index, (_, (kind, _, handle)) in self._visible.items():
+            data = self._rows[index][1]
+            if predicate(kind, data):
+                self._templates[kind][1](handle, data)
+
+    def scroll_to_top(self):
+        self._offset = 0
+        self._layout()
+
+    def _viewport_height(self):
+        return self._viewport.winfo_height() / self._get_widget_scaling()
+
+    def _layout(self, retained=None):
+        row_height = self._row_height
+        height = self._viewport_height()
+        total = len(self._rows) * row_height
+        self._offset = min(max(self._offset, 0), max(0, total - height))
+
+        first = int(self._offset // row_height)
+        last = min(len(self._rows), int((self._offset + height) // row_height) + 1)
+
+        for index in [i for i in self._visible if not first <= i < last]:
+            self._release(index)
+
+        for index in range(first, last):
+            visible = self._visible.get(index)
+            if visible is None:
+                kind, data = self._rows[index]
+                key = self._key(kind, data)
+                entries = retained.get(key) if retained else None
+                entry = entries.pop(0) if entries else None
+                if entry is not None and entry[0] != kind:
+                    self._free(entry)
+                    entry = None
+                if entry is None:
+                    entry = self._acquire(kind)
+                self._templates[kind][1](entry[2], data)
+                visible = self._visible[index] = (key, entry)
+            container = visible[1][1]
+            y = index * row_height - self._offset
+            if self._placed_y.get(container) != y:
+                container.place(x=0, y=y, relwidth=1)
+                self._placed_y[container] = y
+
+        if total <= height or total == 0:
+            self._scrollbar.set(0, 1)
+        else:
+            self._scrollbar.set(self._offset / total, (self._offset + height) / total)
+
+        if self._on_near_end and not self._near_end_pending and last >= len(self._rows) - self.NEAR_END_ROWS:
+            self._near_end_pending = True
+            self.after_idle(self._fire_near_end)
+
+    def _fire_near_end(self):
+        self._near_end_pending = False
+        self._on_near_end()
+
+    def _acquire(self, kind):
+        pool = self._pools[kind]
+        if pool:
+            return pool.pop()
+        container = ctk.CTkFrame(self._viewport, height=self._row_height, fg_color="transparent", corner_radius=0)
+        container.grid_propagate(False)
+        container.pack_propagate(False)
+        handle = self._templates[kind][0](container)
+        return kind, container, handle
+
+    def _release(self, index):
+        self._free(self._visible.pop(index)[1])
+
+    def _free(self, entry):
+        entry[1].place_forget()
+        self._placed_y.pop(entry[1], None)
+        self._pools[entry[0]].append(entry)
+
+    def _scroll_by(self, pixels):
+        self._offset += pixels
+        self._layout()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        total = len(self._rows) * self._row_height
+        if action == "moveto":
+            self._offset = float(value) * total
+            self._layout()
+        elif action == "scroll":
+            step = self._viewport_height() if unit == "pages" else self._row_height
+            self._scroll_by(int(value) * step)
+
+    def _on_mouse_wheel(self, event):
+        if not self.winfo_exists() or not str(event.widget).startswith(str(self._viewport)):
+            return
+        if event.num == 4:
+            notches = -1
+        elif event.num == 5:
+            notches = 1
+        elif sys.platform.startswith("win"):
+            notches = -event.delta / 120
+        else:
+            notches = -1 if event.delta > 0 else 1
+        self._scroll_by(notches * self.WHEEL_ROWS * self._row_height)
+
+
+def button_row_template(command, text=str):
+    """
+    (create, bind) pair for rows made of one flat list button, as used by the
+    list panes of the filament, product and sales views. A row's data is the
+    item itself; text(item) is only evaluated for rows that are shown, and
+    clicking calls command(item).
+    """
+    def create(container):
+        handle = {'item': None}
+        handle['button'] = ctk.CTkButton(
+            container,
+            fg_color="transparent",
+            text_color=("gray10", "gray90"),
+            hover_color=("gray70", "gray30"),
+            anchor="w",
+            command=lambda: command(handle['item'])
+        )
+        handle['button'].pack(fill="both", expand=True, padx=5, pady=2)
+        return handle
+
+    def bind(handle, item):
+        handle['item'] = item
+        configure_if_changed(handle['button'], text=text(item))
+
+    return create, bind
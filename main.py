@@ -1,11 +1,38 @@
+import time
+
+_process_start = time.perf_counter()
+
 from config.logging_config import setup_logging
 import logging
-from database import initialize_database, seed_example_data
+from database import initialize_database
 from models import db
 from gui.main_window import MainWindow
 import customtkinter as ctk
 
+
+class StartupTimer:
+    """Records how long each startup phase took, for the report logged once the window is painted."""
+
+    def __init__(self, start):
+        self.phases = []  # [(phase, seconds)]
+        self._last = start
+
+    def mark(self, phase):
+        """Ends `phase` now; it started where the previous one ended."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self):
+        total = sum(seconds for _, seconds in self.phases)
+        phases = ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.phases)
+        return f"Startup: {phases} (total {total * 1000:.0f} ms)"
+
+
 def main():
+    timer = StartupTimer(_process_start)
+    timer.mark("imports")
+
     # Setup logging
     setup_logging()
     logger = logging.getLogger(__name__)
@@ -14,19 +41,26 @@ def main():
     # Initialize database on first run
     try:
         initialize_database()
-        
+
         # Open connection for the app session
         db.connect()
-
-        # Seed example data if needed
-        seed_example_data()
+        timer.mark("db init")
 
         # Set up GUI
         ctk.set_appearance_mode("System")
         ctk.set_default_color_theme("blue")
 
         app = MainWindow()
+        timer.mark("window")
+
+        def first_paint():
+            app.update_idletasks()
+            timer.mark("first paint")
+            logger.info(timer.report())
+        app.after_idle(first_paint)
+
         app.mainloop()
+        app.executor.shutdown()
 
     except Exception as e:
         logger.error(f"Application crashed: {e}", exc_info=True)
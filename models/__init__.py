@@ -1,7 +1,9 @@
 from .base import db, BaseModel
 from .filament import Filament, FilamentPurchase
 from .product import Product, Part, ProductFilament, PartFilament
-from .sale import Sale
+from .sale import Order, OrderLine, OrderLineFilament, Sale, SaleFilament, DailySalesRollup
+from .stock import StockMovement, StockSnapshot
+from .metadata import Metadata
 
 __all__ = [
     'db',
@@ -12,5 +14,13 @@ __all__ = [
     'Part',
     'ProductFilament',
     'PartFilament',
+    'Order',
+    'OrderLine',
+    'OrderLineFilament',
     'Sale',
+    'SaleFilament',
+    'DailySalesRollup',
+    'StockMovement',
+    'StockSnapshot',
+    'Metadata',
 ]
\ No newline at end of file
@@ -1,7 +1,85 @@
 from peewee import SqliteDatabase, Model, Proxy
 import os
+import re
+import threading
+import time
 from config import DATABASE_PATH, TEST_DATABASE_PATH
 
+# Callables invoked as listener(sql, params, seconds) after every statement.
+# Empty unless query profiling is switched on (see services.query_profiler).
+_query_listeners = []
+
+def add_query_listener(listener):
+    """Registers a callable to be notified of every executed SQL statement."""
+    _query_listeners.append(listener)
+
+def remove_query_listener(listener):
+    """Unregisters a listener added with add_query_listener."""
+    if listener in _query_listeners:
+        _query_listeners.remove(listener)
+
+# Bumped on every write (see notify_write); two equal readings mean nothing
+# was written in between
+_data_version = 0
+_data_version_lock = threading.Lock()
+
+def data_version():
+    """Returns the current data version counter."""
+    return _data_version
+
+def _bump_data_version(table):
+    global _data_version
+    with _data_version_lock:
+        _data_version += 1
+
+# Callables invoked as listener(table) after a statement writes to a table,
+# and as listener(None) when the whole database may have changed
+# (set_database). Used by caches that must drop results derived from a table.
+_write_listeners = [_bump_data_version]
+
+_WRITE_STATEMENT = re.compile(
+    r'\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM'
+    r'|DROP\s+TABLE(?:\s+IF\s+EXISTS)?)\s+"?(\w+)"?',
+    re.IGNORECASE
+)
+
+def add_write_listener(listener):
+    """Registers a callable to be notified of every table written to."""
+    _write_listeners.append(listener)
+
+def remove_write_listener(listener):
+    """Unregisters a listener added with add_write_listener."""
+    if listener in _write_listeners:
+        _write_listeners.remove(listener)
+
+def notify_write(table):
+    """Tells write listeners that `table` (None for every table) has changed."""
+    for listener in list(_write_listeners):
+        listener(table)
+
+class InstrumentedSqliteDatabase(SqliteDatabase):
+    """
+    SqliteDatabase that reports statements and their timing to registered
+    query listeners, and the tables they write to to write listeners.
+    """
+
+    def execute_sql(self, sql, params=None, commit=None):
+        if not _query_listeners:
+            cursor = super().execute_sql(sql, params, commit)
+        else:
+            start = time.perf_counter()
+            try:
+                cursor = super().execute_sql(sql, params, commit)
+            finally:
+                elapsed = time.perf_counter() - start
+                for listener in list(_query_listeners):
+                    listener(sql, params, elapsed)
+        if _write_listeners:
+            match = _WRITE_STATEMENT.match(sql)
+            if match:
+                notify_write(match.group(1).lower())
+        return cursor
+
 # Use Proxy to allow dynamic database switching
 db = Proxy()
 
@@ -14,10 +92,11 @@ def set_database(env_name):
         'ignore_check_constraints': 0,
     }
     if env_name == 'test':
-        actual_db = SqliteDatabase(TEST_DATABASE_PATH, pragmas=pragmas)
+        actual_db = InstrumentedSqliteDatabase(TEST_DATABASE_PATH, pragmas=pragmas)
     else:
-        actual_db = SqliteDatabase(DATABASE_PATH, pragmas=pragmas)
+        actual_db = InstrumentedSqliteDatabase(DATABASE_PATH, pragmas=pragmas)
     db.initialize(actual_db)
+    notify_write(None)
 
 # Initialize with default or environment variable
 initial_env = os.environ.get('INVENTORYMANAGER_ENV', 'prod')
@@ -25,4 +104,4 @@ set_database(initial_env)
 
 class BaseModel(Model):
     class Meta:
-        database = db
\ No newline at end of file
+        database = db
@@ -1,7 +1,47 @@
-from peewee import CharField, DecimalField, IntegerField, ForeignKeyField, DateTimeField
+from peewee import CharField, DecimalField, IntegerField, ForeignKeyField, DateTimeField, Case, chunked
+from collections import namedtuple
 from datetime import datetime
+from decimal import Decimal, ROUND_CEILING
 from .base import BaseModel
 
+# Filaments per UPDATE ... CASE statement (each one binds a handful of parameters)
+STOCK_UPDATE_BATCH_SIZE = 200
+
+# Result of Filament.apply_stock_movements for one filament: new stock plus the applied change
+StockChange = namedtuple('StockChange', ['grams_remaining', 'rolls_in_stock', 'grams_delta', 'rolls_delta'])
+
+
+def roll_over(grams_remaining, rolls_in_stock, grams_per_roll, grams):
+    """
+    Subtracts grams (negative to add back) from an open roll and rolls over
+    between the open roll and rolls_in_stock.
+    Returns the new (grams_remaining, rolls_in_stock).
+
+    Depletion opens as many stocked rolls as needed (the remainder stays
+    negative once stock runs out); reversal moves every full roll's worth
+    back into rolls_in_stock. Computed arithmetically rather than one loop
+    iteration per roll.
+    """
+    grams_remaining = Decimal(str(grams_remaining)) - Decimal(str(grams))
+    grams_per_roll = Decimal(str(grams_per_roll))
+    if grams_per_roll <= 0:
+        return grams_remaining, rolls_in_stock
+
+    # Handle depletion: move to next roll(s)
+    if grams_remaining < 0 and rolls_in_stock > 0:
+        rolls_needed = int((-grams_remaining / grams_per_roll).to_integral_value(rounding=ROUND_CEILING))
+        rolls_opened = min(rolls_in_stock, rolls_needed)
+        rolls_in_stock -= rolls_opened
+        grams_remaining += rolls_opened * grams_per_roll
+
+    # Handle reversal: if grams_remaining exceeds roll capacity, move back to rolls_in_stock
+    if grams_remaining >= grams_per_roll:
+        full_rolls = int(grams_remaining // grams_per_roll)
+        rolls_in_stock += full_rolls
+        grams_remaining -= full_rolls * grams_per_roll
+
+    return grams_remaining, rolls_in_stock
+
 
 class Filament(BaseModel):
     brand = CharField(null=True)
@@ -20,28 +60,40 @@ class Filament(BaseModel):
     def __str__(self):
         return f"{self.color} {self.material}"
 
-    def adjust_inventory(self, grams):
+    @classmethod
+    def apply_stock_movements(cls, grams_by_filament):
         """
-        Adjusts the grams remaining. If it goes below zero, 
-        decrements rolls_in_stock and resets grams_remaining.
-        grams: Decimal to subtract (positive to subtract, negative to add back)
+        Applies stock deductions to many filaments at once.
+        grams_by_filament: {filament_id: grams} (positive to subtract, negative to add back)
+
+        Reads the affected rows with one SELECT and writes them back with one
+        UPDATE ... CASE per batch, instead of a full-row save() per filament.
+        Must run in a transaction that holds the write lock (StockLedger.transaction),
+        so that no other connection changes the rows between the read and the write.
+        Returns {filament_id: StockChange} with the new stock and the applied deltas.
         """
-        from decimal import Decimal
-        self.grams_remaining -= Decimal(str(grams))
-        
-        # Handle depletion: move to next roll
-        while self.grams_remaining < 0 and self.rolls_in_stock > 0:
-            self.rolls_in_stock -= 1
-            self.grams_remaining += self.grams_per_roll
-            
-        # Handle reversal: if grams_remaining exceeds roll capacity, move back to rolls_in_stock
-        while self.grams_remaining >= self.grams_per_roll:
-            # Only move to rolls_in_stock if we are adding back (reversing a sale)
-            # or if we somehow overfilled it.
-            self.rolls_in_stock += 1
-            self.grams_remaining -= self.grams_per_roll
-            
-        self.save()
+        movements = {fid: grams for fid, grams in grams_by_filament.items() if grams}
+        new_stock = {}
+        for batch in chunked(list(movements), STOCK_UPDATE_BATCH_SIZE):
+            current = (cls
+                       .select(cls.id, cls.grams_remaining, cls.rolls_in_stock, cls.grams_per_roll)
+                       .where(cls.id.in_(batch))
+                       .tuples())
+            batch_stock = {}
+            for fid, remaining, rolls, per_roll in current:
+                new_remaining, new_rolls = roll_over(remaining, rolls, per_roll, movements[fid])
+                batch_stock[fid] = StockChange(new_remaining, new_rolls, new_remaining - remaining, new_rolls - rolls)
+            if not batch_stock:
+                continue
+
+            (cls
+             .update(
+                 grams_remaining=Case(cls.id, [(fid, c.grams_remaining) for fid, c in batch_stock.items()]),
+                 rolls_in_stock=Case(cls.id, [(fid, c.rolls_in_stock) for fid, c in batch_stock.items()]))
+             .where(cls.id.in_(list(batch_stock)))
+             .execute())
+            new_stock.update(batch_stock)
+        return new_stock
 
 
 class FilamentPurchase(BaseModel):
@@ -51,4 +103,4 @@ class FilamentPurchase(BaseModel):
     filament = ForeignKeyField(Filament, backref='purchases', on_delete='CASCADE')
     date = DateTimeField(default=datetime.now)
     rolls_bought = IntegerField()
-    grams_added = DecimalField(decimal_places=2)
\ No newline at end of file
+    grams_added = DecimalField(decimal_places=2)
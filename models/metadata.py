@@ -0,0 +1,23 @@
+from peewee import CharField, TextField
+from .base import BaseModel
+
+
+class Metadata(BaseModel):
+    """
+    Key/value settings about the database itself, such as the schema version
+    applied by database.migrations and whether the example data was seeded.
+    """
+    SCHEMA_VERSION = 'schema_version'
+    SEEDED = 'seeded'
+
+    key = CharField(primary_key=True)
+    value = TextField()
+
+    @classmethod
+    def get_value(cls, key, default=None):
+        row = cls.get_or_none(cls.key == key)
+        return row.value if row else default
+
+    @classmethod
+    def set_value(cls, key, value):
+        cls.insert(key=key, value=str(value)).on_conflict_replace().execute()
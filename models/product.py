@@ -49,14 +49,6 @@ class Product(BaseModel):
             pf.save()
         return pf
 
-    def adjust_inventory(self, amount):
-        """
-        Adjusts the inventory count by the given amount (positive or negative).
-        Updates the database immediately.
-        """
-        self.inventory_count += amount
-        self.save()
-
     @property
     def total_print_time(self):
         """Calculates total print time including all parts."""
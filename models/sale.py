@@ -1,15 +1,82 @@
-from peewee import ForeignKeyField, DateTimeField, IntegerField, DecimalField
+from peewee import ForeignKeyField, DateTimeField, DateField, IntegerField, DecimalField
 from datetime import datetime
 from .base import BaseModel
 from .product import Product
+from .filament import Filament
 
-class Sale(BaseModel):
+class Order(BaseModel):
+    """A customer order: the lines sold together at one time."""
+    date = DateTimeField(default=datetime.now)
+
+
+class OrderLine(BaseModel):
     """
-    Represents a sale event. Each record represents a single unit.
+    Represents quantity units of one product sold in an order, for
+    total_value altogether. date repeats the order's date so sales can be
+    indexed and paged by it.
+    unit_cost is the material cost of one unit at the time of the sale, and
+    the OrderLineFilament rows the filament the whole line consumed; both are
+    None/absent for lines recorded without going through
+    InventoryService.create_sale.
     """
+    order = ForeignKeyField(Order, backref='lines', on_delete='CASCADE')
     date = DateTimeField(default=datetime.now)
     product = ForeignKeyField(Product, backref='sales', on_delete='CASCADE')
+    quantity = IntegerField(default=1)
     total_value = DecimalField(decimal_places=2, default=0.00)
+    unit_cost = DecimalField(decimal_places=2, null=True)
+
+    class Meta:
+        # Existing databases get these from database.migrations
+        indexes = (
+            (('date',), False),
+            (('product', 'date'), False),
+        )
+
+    def save(self, *args, **kwargs):
+        # A line saved on its own (the old one-row Sale API) is an order by itself
+        if self.order_id is None:
+            self.order = Order.create(date=self.date)
+        return super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.date.strftime('%Y-%m-%d %H:%M')} - {self.product} for ${self.total_value}"
\ No newline at end of file
+        quantity = f"{self.quantity}x " if self.quantity != 1 else ""
+        return f"{self.date.strftime('%Y-%m-%d %H:%M')} - {quantity}{self.product} for ${self.total_value}"
+
+
+class OrderLineFilament(BaseModel):
+    """
+    Filament consumed by a whole order line, and its cost at the prices of the
+    day of the sale. Lets deleting or editing a sale put back exactly what it took.
+    """
+    line = ForeignKeyField(OrderLine, backref='filament_usage', on_delete='CASCADE')
+    filament = ForeignKeyField(Filament, backref='sale_usage', on_delete='CASCADE')
+    grams = DecimalField(decimal_places=2)
+    cost = DecimalField(decimal_places=4)
+
+
+# Names from before sales were grouped into orders; a Sale is an order line
+# (quantity defaults to 1), so code written against them keeps working.
+Sale = OrderLine
+SaleFilament = OrderLineFilament
+
+
+class DailySalesRollup(BaseModel):
+    """
+    Materialized per-day, per-product sales totals.
+    Maintained by triggers on the orderline table (see database.db_manager), so
+    it is updated inside the same transaction as every OrderLine insert, update
+    and delete. units sums line quantities; cost sums the recorded cost of the
+    costed_units units whose line has a unit_cost.
+    """
+    date = DateField()
+    product = ForeignKeyField(Product, backref='daily_sales', on_delete='CASCADE')
+    units = IntegerField(default=0)
+    revenue = DecimalField(decimal_places=2, default=0.00)
+    cost = DecimalField(decimal_places=2, default=0.00)
+    costed_units = IntegerField(default=0)
+
+    class Meta:
+        indexes = (
+            (('date', 'product'), True),
+        )
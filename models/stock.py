@@ -0,0 +1,42 @@
+from peewee import CharField, DecimalField, IntegerField, ForeignKeyField, DateTimeField
+from datetime import datetime
+from .base import BaseModel
+from .filament import Filament
+from .product import Product
+
+
+class StockMovement(BaseModel):
+    """
+    Append-only ledger of stock changes. Each row records the change a sale,
+    purchase or manual adjustment made to one filament or one product.
+    Rows are never updated; reversals are recorded as new movements.
+    """
+    SALE = 'sale'
+    SALE_EDIT = 'sale_edit'
+    SALE_DELETE = 'sale_delete'
+    PURCHASE = 'purchase'
+    ADJUST = 'adjust'
+
+    date = DateTimeField(default=datetime.now, index=True)
+    reason = CharField()
+    filament = ForeignKeyField(Filament, null=True, backref='stock_movements', on_delete='CASCADE')
+    product = ForeignKeyField(Product, null=True, backref='stock_movements', on_delete='CASCADE')
+    grams_delta = DecimalField(decimal_places=2, default=0)  # change to Filament.grams_remaining
+    rolls_delta = IntegerField(default=0)                    # change to Filament.rolls_in_stock
+    units_delta = IntegerField(default=0)                    # change to Product.inventory_count
+    sale_id = IntegerField(null=True)                        # originating sale, kept after the sale is deleted
+
+
+class StockSnapshot(BaseModel):
+    """
+    Periodic copy of every filament's and product's stock.
+    last_movement_id is the newest StockMovement already reflected in the
+    snapshot, so point-in-time queries only replay the movements after it.
+    """
+    taken_at = DateTimeField(default=datetime.now, index=True)
+    last_movement_id = IntegerField(index=True)
+    filament = ForeignKeyField(Filament, null=True, backref='stock_snapshots', on_delete='CASCADE')
+    product = ForeignKeyField(Product, null=True, backref='stock_snapshots', on_delete='CASCADE')
+    grams_remaining = DecimalField(decimal_places=2, null=True)
+    rolls_in_stock = IntegerField(null=True)
+    inventory_count = IntegerField(null=True)
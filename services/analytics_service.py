@@ -0,0 +1,184 @@
+from models import DailySalesRollup, Product, OrderLine, OrderLineFilament
+from services.bom_resolver import BomResolver
+from services.cost_cache import product_cost_cache, material_cost
+from peewee import fn
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+import math
+import logging
+
+logger = logging.getLogger(__name__)
+
+CENTS = Decimal('0.01')
+# Precision of OrderLineFilament.cost
+COST_PLACES = Decimal('0.0001')
+
+# Bucket -> SQLite strftime() format and modifiers giving the date its bucket starts on
+BUCKETS = {
+    'day': ('%Y-%m-%d',),
+    'week': ('%Y-%m-%d', 'weekday 0', '-6 days'),  # the Monday of the week
+    'month': ('%Y-%m-01',),
+}
+
+# Chart width assumed when the caller does not know it
+DEFAULT_CHART_WIDTH_PX = 800
+# Narrowest spacing between two points of a chart that still reads as a line of markers
+MIN_PIXELS_PER_POINT = 6
+
+
+class AnalyticsService:
+    """
+    Aggregates sales data from the DailySalesRollup table, which already holds
+    revenue, unit counts and the material cost recorded at sale time grouped
+    per day and product, and from the filament usage recorded on each order line
+    (OrderLineFilament). Units recorded without a cost (lines written to the
+    orderline table directly) are costed with the per-product cost/usage vector at current
+    prices (see services.cost_cache).
+    """
+
+    @staticmethod
+    def choose_bucket(start_date, end_date, width_px=DEFAULT_CHART_WIDTH_PX):
+        """
+        Returns the finest bucket ('day', 'week' or 'month') whose number of
+        points over the range fits a chart width_px pixels wide.
+        """
+        max_points = max(width_px // MIN_PIXELS_PER_POINT, 1)
+        days = (end_date.date() - start_date.date()).days + 1
+        if days <= max_points:
+            return 'day'
+        if math.ceil(days / 7) <= max_points:
+            return 'week'
+        return 'month'
+
+    @staticmethod
+    def get_analytics_data(start_date, end_date, bucket='day'):
+        """
+        Aggregates sales data within a date range.
+        start_date, end_date: datetime objects
+        bucket: 'day', 'week' or 'month', the period daily_stats is grouped by
+        Returns the dict shape consumed by AnalyticsView.
+        """
+        data = {
+            'total_sales_count': 0,
+            'gross_revenue': Decimal('0.00'),
+            'total_cost': Decimal('0.00'),
+            'net_profit': Decimal('0.00'),
+            'product_breakdown': {}, # product_name: {count, revenue, cost}
+            'filament_usage': {},    # filament_name: {grams, cost}
+            'bucket': bucket,
+            'daily_stats': {},       # date_str the bucket starts on: {revenue, cost, profit}
+        }
+
+        grouped = AnalyticsService._grouped_sales(start_date, end_date, bucket)
+        if not grouped:
+            return data
+
+        product_ids = {product_id for _, product_id, _, _, _, _ in grouped}
+        products = {p.id: p for p in Product.select().where(Product.id.in_(list(product_ids)))}
+        uncosted_ids = {product_id for _, product_id, count, _, _, costed in grouped if count > costed}
+        vectors = AnalyticsService.product_cost_vectors(uncosted_ids) if uncosted_ids else {}
+
+        per_product = {}
+        uncosted_units = {}
+        for day, product_id, count, revenue, cost, costed in grouped:
+            if count > costed:
+                unit_cost, _ = vectors[product_id]
+                cost += unit_cost * (count - costed)
+                uncosted_units[product_id] = uncosted_units.get(product_id, 0) + count - costed
+
+            data['total_sales_count'] += count
+            data['gross_revenue'] += revenue
+            data['total_cost'] += cost
+
+            totals = per_product.setdefault(product_id, [0, Decimal('0.00'), Decimal('0.00')])
+            totals[0] += count
+            totals[1] += revenue
+            totals[2] += cost
+
+            if day not in data['daily_stats']:
+                data['daily_stats'][day] = {
+                    'revenue': Decimal('0.00'),
+                    'cost': Decimal('0.00'),
+                    'profit': Decimal('0.00')
+                }
+            data['daily_stats'][day]['revenue'] += revenue
+            data['daily_stats'][day]['cost'] += cost
+            data['daily_stats'][day]['profit'] += (revenue - cost)
+
+        for product_id, (count, revenue, cost) in per_product.items():
+            data['product_breakdown'][str(products[product_id])] = {
+                'count': count,
+                'revenue': revenue,
+                'cost': cost
+            }
+
+        # Filament usage breakdown: recorded usage, plus estimates for uncosted sales
+        for filament, grams, cost in AnalyticsService._recorded_filament_usage(start_date, end_date):
+            usage = data['filament_usage'].setdefault(str(filament), {'grams': Decimal('0.00'), 'cost': Decimal('0.00')})
+            usage['grams'] += grams
+            usage['cost'] += cost
+        for product_id, count in uncosted_units.items():
+            _, per_unit = vectors[product_id]
+            for filament, grams in per_unit.items():
+                usage = data['filament_usage'].setdefault(str(filament), {'grams': Decimal('0.00'), 'cost': Decimal('0.00')})
+                usage['grams'] += grams * count
+                usage['cost'] += material_cost(filament, grams) * count
+
+        data['net_profit'] = data['gross_revenue'] - data['total_cost']
+        return data
+
+    @staticmethod
+    def product_cost_vectors(product_ids):
+        """
+        Returns {product_id: (unit_cost, {Filament: grams})} at current material
+        prices. unit_cost is rounded to cents like Product.total_cost.
+        Served from the product cost cache.
+        """
+        return {pid: tuple(cost) for pid, cost in product_cost_cache.get_many(product_ids).items()}
+
+    @staticmethod
+    def _grouped_sales(start_date, end_date, bucket='day'):
+        """
+        Returns [(date_str, product_id, count, revenue, cost, costed_count)]
+        grouped by bucket and product, ordered by date_str, the day each bucket
+        starts on. cost sums the recorded cost of the costed_count sales that
+        have one. Reads the
+        DailySalesRollup table and groups it in SQL, so the range is resolved at
+        day granularity and costs at most one row per product per bucket.
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown analytics bucket: {bucket}")
+        period = fn.strftime(BUCKETS[bucket][0], DailySalesRollup.date, *BUCKETS[bucket][1:])
+        query = (DailySalesRollup
+                 .select(period, DailySalesRollup.product,
+                         fn.SUM(DailySalesRollup.units), fn.ROUND(fn.SUM(DailySalesRollup.revenue), 2),
+                         fn.ROUND(fn.SUM(DailySalesRollup.cost), 2), fn.SUM(DailySalesRollup.costed_units))
+                 .where((DailySalesRollup.date >= start_date.date()) &
+                        (DailySalesRollup.date <= end_date.date()) &
+                        (DailySalesRollup.units > 0))
+                 .group_by(period, DailySalesRollup.product)
+                 .order_by(period))
+        return [
+            (day, product_id, units, Decimal(str(revenue)).quantize(CENTS), Decimal(str(cost)).quantize(CENTS), costed)
+            for day, product_id, units, revenue, cost, costed in query.tuples()
+        ]
+
+    @staticmethod
+    def _recorded_filament_usage(start_date, end_date):
+        """
+        Returns [(Filament, grams, cost)] summed over the filament usage recorded
+        on order lines in the date range (whole days, like the rollup).
+        """
+        start = datetime.combine(start_date.date(), time.min)
+        end = datetime.combine(end_date.date() + timedelta(days=1), time.min)
+        query = (OrderLineFilament
+                 .select(OrderLineFilament.filament, fn.SUM(OrderLineFilament.grams), fn.SUM(OrderLineFilament.cost))
+                 .join(OrderLine)
+                 .where((OrderLine.date >= start) & (OrderLine.date < end))
+                 .group_by(OrderLineFilament.filament))
+        rows = list(query.tuples())
+        filaments = BomResolver.get_filaments([filament_id for filament_id, _, _ in rows])
+        return [
+            (filaments[filament_id], Decimal(str(grams)).quantize(CENTS), Decimal(str(cost)).quantize(COST_PLACES))
+            for filament_id, grams, cost in rows
+        ]
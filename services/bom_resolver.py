@@ -0,0 +1,91 @@
+from models import Filament, Part, ProductFilament, PartFilament
+from peewee import chunked
+from decimal import Decimal
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Keeps IN (...) lists well below SQLite's bound-variable limit.
+ID_CHUNK_SIZE = 500
+
+
+class BomResolver:
+    """
+    Resolves bills of materials for many products at once.
+
+    Product.total_filament_usage walks the BOM one lazy query at a time. This
+    resolver loads the product-level and part-level junction rows for a whole
+    set of products in a fixed number of joined queries, independent of how
+    many products or parts are involved.
+    """
+
+    @staticmethod
+    def resolve_usage(product_ids=None):
+        """
+        Returns {product_id: {filament_id: grams}} for the given product IDs,
+        or for every product that has filament usage when product_ids is None.
+        Requested products without any usage map to an empty dict.
+        """
+        usage = {}
+        if product_ids is not None:
+            product_ids = list(dict.fromkeys(product_ids))
+            for pid in product_ids:
+                usage[pid] = {}
+            batches = chunked(product_ids, ID_CHUNK_SIZE)
+        else:
+            batches = [None]
+
+        for batch in batches:
+            # Product-level usage
+            query = ProductFilament.select(
+                ProductFilament.product,
+                ProductFilament.filament,
+                ProductFilament.grams_needed
+            )
+            if batch is not None:
+                query = query.where(ProductFilament.product.in_(batch))
+            for product_id, filament_id, grams in query.tuples():
+                BomResolver._accumulate(usage, product_id, filament_id, grams)
+
+            # Part-level usage, attributed to the owning product
+            query = (PartFilament
+                     .select(Part.product, PartFilament.filament, PartFilament.grams_needed)
+                     .join(Part))
+            if batch is not None:
+                query = query.where(Part.product.in_(batch))
+            for product_id, filament_id, grams in query.tuples():
+                BomResolver._accumulate(usage, product_id, filament_id, grams)
+
+        return usage
+
+    @staticmethod
+    def resolve_filament_usage(product_ids=None):
+        """
+        Same as resolve_usage, but keys the inner dicts by Filament objects
+        (like Product.total_filament_usage). All referenced filaments are
+        loaded with a single extra query.
+        """
+        usage = BomResolver.resolve_usage(product_ids)
+        filament_ids = {fid for per_product in usage.values() for fid in per_product}
+        filaments = BomResolver.get_filaments(filament_ids)
+        return {
+            pid: {filaments[fid]: grams for fid, grams in per_product.items() if fid in filaments}
+            for pid, per_product in usage.items()
+        }
+
+    @staticmethod
+    def get_filaments(filament_ids=None):
+        """Returns {filament_id: Filament} for the given IDs (all filaments when None)."""
+        if filament_ids is None:
+            return {f.id: f for f in Filament.select()}
+
+        filaments = {}
+        for batch in chunked(list(filament_ids), ID_CHUNK_SIZE):
+            for f in Filament.select().where(Filament.id.in_(batch)):
+                filaments[f.id] = f
+        return filaments
+
+    @staticmethod
+    def _accumulate(usage, product_id, filament_id, grams):
+        per_product = usage.setdefault(product_id, {})
+        per_product[filament_id] = per_product.get(filament_id, Decimal('0')) + Decimal(str(grams))
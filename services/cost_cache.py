@@ -0,0 +1,131 @@
+from models.base import add_write_listener
+from services.bom_resolver import BomResolver
+from collections import OrderedDict, namedtuple
+from decimal import Decimal
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Products kept in the cache before the least recently used ones are evicted
+DEFAULT_MAX_SIZE = 2048
+
+# Material cost of one unit at current prices (rounded to cents, like Product.total_cost)
+# and the grams it uses per filament: {Filament: grams}
+ProductCost = namedtuple('ProductCost', ['unit_cost', 'usage'])
+
+
+def material_cost(filament, grams):
+    """Cost of `grams` of a filament at its current price per roll (not rounded)."""
+    return (grams / filament.grams_per_roll) * filament.cost_per_roll
+
+
+class ProductCostCache:
+    """
+    Process-wide LRU cache of each product's resolved filament usage and
+    material cost, keyed by product id.
+
+    InventoryService invalidates it on every write that can change a cached
+    value (BOM edits, filament price edits and deletes); switching or
+    resetting the database clears it. Edits made to BOM rows directly
+    through the models must call invalidate_product / invalidate_filament.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # product_id -> ProductCost, least recently used first
+        self._lock = threading.RLock()
+        # Bumped by every invalidation; a load that overlapped one is not cached
+        self._generation = 0
+
+    def get(self, product_id):
+        """Returns the ProductCost of one product."""
+        return self.get_many([product_id])[product_id]
+
+    def get_many(self, product_ids):
+        """
+        Returns {product_id: ProductCost}. Products not in the cache are
+        resolved together with one batched BOM lookup.
+        """
+        result = {}
+        missing = []
+        with self._lock:
+            for pid in dict.fromkeys(product_ids):
+                entry = self._entries.get(pid)
+                if entry is None:
+                    missing.append(pid)
+                else:
+                    self._entries.move_to_end(pid)
+                    result[pid] = entry
+            self.hits += len(result)
+            self.misses += len(missing)
+            generation = self._generation
+
+        if missing:
+            loaded = self.load(missing)
+            with self._lock:
+                # An invalidation during the load may have made it stale
+                if generation == self._generation:
+                    for pid, entry in loaded.items():
+                        self._entries[pid] = entry
+                        self._entries.move_to_end(pid)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            result.update(loaded)
+        return result
+
+    def invalidate_product(self, product_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(product_id, None)
+
+    def invalidate_filament(self, filament_id):
+        """Drops every product that uses the filament."""
+        with self._lock:
+            self._generation += 1
+            stale = [pid for pid, entry in self._entries.items()
+                     if any(f.id == filament_id for f in entry.usage)]
+            for pid in stale:
+                del self._entries[pid]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Returns hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+            }
+
+    @staticmethod
+    def load(product_ids):
+        """Resolves {product_id: ProductCost} from the BOM, bypassing the cache."""
+        costs = {}
+        for product_id, usage in BomResolver.resolve_filament_usage(product_ids).items():
+            unit_cost = Decimal('0.00')
+            for filament, grams in usage.items():
+                unit_cost += material_cost(filament, grams)
+            costs[product_id] = ProductCost(unit_cost.quantize(Decimal('0.01')), usage)
+        return costs
+
+
+product_cost_cache = ProductCostCache()
+
+
+def _on_write(table):
+    # A switched or reset database invalidates everything
+    if table is None:
+        product_cost_cache.clear()
+
+
+add_write_listener(_on_write)
@@ -0,0 +1,137 @@
+from models import db
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+# How often attach() polls for finished tasks
+POLL_INTERVAL_MS = 30
+
+
+class Task:
+    """A unit of work submitted to a ServiceExecutor."""
+
+    def __init__(self, fn, args, kwargs, on_done, on_error, group):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_done = on_done
+        self.on_error = on_error
+        self.group = group
+        self.cancelled = False
+        self.result = None
+        self.error = None
+        self._finished = threading.Event()
+
+    def cancel(self):
+        """Skips the task if it has not started, and discards its result otherwise."""
+        self.cancelled = True
+
+    @property
+    def finished(self):
+        return self._finished.is_set()
+
+    def wait(self, timeout=None):
+        """Blocks until the worker has finished (or skipped) the task."""
+        return self._finished.wait(timeout)
+
+
+class ServiceExecutor:
+    """
+    Runs database and aggregation work on one dedicated worker thread.
+
+    The worker opens its own SQLite connection (peewee connections are per
+    thread) and runs tasks in submission order. Results are handed back on
+    the thread that calls poll(); attach() polls from the Tk event loop with
+    after(), so on_done/on_error callbacks always run on the GUI thread and
+    may touch widgets.
+
+    Tasks can be tagged with a group (e.g. the view that asked for them) and
+    cancelled together, so a view that is no longer shown never receives a
+    stale result.
+    """
+
+    def __init__(self, name="service-worker"):
+        self._tasks = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, on_done=None, on_error=None, group=None, **kwargs):
+        """Queues fn(*args, **kwargs) for the worker thread and returns its Task."""
+        task = Task(fn, args, kwargs, on_done, on_error, group)
+        with self._lock:
+            self._pending.append(task)
+        self._tasks.put(task)
+        return task
+
+    def cancel_group(self, group):
+        """Cancels every unfinished task submitted with the given group."""
+        with self._lock:
+            for task in self._pending:
+                if task.group == group:
+                    task.cancel()
+
+    def cancel_all(self):
+        with self._lock:
+            for task in self._pending:
+                task.cancel()
+
+    def poll(self):
+        """
+        Delivers finished tasks to their callbacks on the calling thread.
+        Returns the number of callbacks run.
+        """
+        delivered = 0
+        while True:
+            try:
+                task = self._results.get_nowait()
+            except queue.Empty:
+                return delivered
+            with self._lock:
+                self._pending.remove(task)
+            if task.cancelled:
+                continue
+            if task.error is not None:
+                if task.on_error:
+                    task.on_error(task.error)
+            elif task.on_done:
+                task.on_done(task.result)
+            delivered += 1
+
+    def attach(self, widget, interval_ms=POLL_INTERVAL_MS):
+        """Polls for finished tasks from widget's event loop until the widget is destroyed."""
+        def tick():
+            try:
+                self.poll()
+            finally:
+                if widget.winfo_exists():
+                    widget.after(interval_ms, tick)
+        widget.after(interval_ms, tick)
+
+    def shutdown(self, wait=True):
+        """Stops the worker after the queued tasks and closes its connection."""
+        self._tasks.put(None)
+        if wait:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            if not task.cancelled:
+                try:
+                    db.connect(reuse_if_open=True)
+                    task.result = task.fn(*task.args, **task.kwargs)
+                except Exception as e:
+                    logger.error(f"Background task {getattr(task.fn, '__qualname__', task.fn)} failed: {e}",
+                                 exc_info=True)
+                    task.error = e
+            self._results.put(task)
+            task._finished.set()
+        if not db.is_closed():
+            db.close()
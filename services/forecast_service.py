@@ -0,0 +1,165 @@
+from models import DailySalesRollup, Product
+from models.base import add_write_listener
+from peewee import JOIN
+from services.query_profiler import profile_service_calls
+from datetime import date, timedelta
+import numpy as np
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Days of sales history the forecasts are fitted on
+FORECAST_HISTORY_DAYS = 182
+# Window of the moving-average forecast
+MOVING_AVERAGE_DAYS = 28
+# Weight of the newest day in simple exponential smoothing
+SMOOTHING_ALPHA = 0.1
+
+# Forecasts are derived from these tables; a write to any of them drops the cache
+_SOURCE_TABLES = {'orderline', 'dailysalesrollup', 'product'}
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _on_write(table):
+    if table is None or table in _SOURCE_TABLES:
+        with _cache_lock:
+            _cache.clear()
+
+
+add_write_listener(_on_write)
+
+
+class DemandForecast:
+    """
+    Unit-demand forecasts for every product over the next horizon_days days
+    (tomorrow onwards), one row per product in product_ids order:
+
+        moving_average  daily rate over the last MOVING_AVERAGE_DAYS days x horizon
+        exponential     simple exponential smoothing level x horizon
+        seasonal        smoothing level scaled by the product's weekday profile,
+                        summed over the weekdays in the horizon
+        seasonal_daily  the seasonal forecast per horizon day, shape (products, horizon)
+    """
+
+    METHODS = ('moving_average', 'exponential', 'seasonal')
+
+    def __init__(self, product_ids, horizon_days, moving_average, exponential, seasonal_daily):
+        self.product_ids = product_ids
+        self.horizon_days = horizon_days
+        self.moving_average = moving_average
+        self.exponential = exponential
+        self.seasonal_daily = seasonal_daily
+        self.seasonal = seasonal_daily.sum(axis=1)
+        self._index = {pid: i for i, pid in enumerate(product_ids.tolist())}
+
+    def units(self, product_id, method='seasonal'):
+        """Forecast units for one product over the horizon (0.0 for unknown products)."""
+        i = self._index.get(product_id)
+        return float(getattr(self, method)[i]) if i is not None else 0.0
+
+    def for_products(self, product_ids, method='seasonal'):
+        """Returns the forecasts for product_ids as an array aligned with it (0.0 for unknown products)."""
+        product_ids = np.asarray(product_ids, dtype=np.int64)
+        values = getattr(self, method)
+        result = np.zeros(len(product_ids))
+        if len(self.product_ids):
+            rows = np.minimum(np.searchsorted(self.product_ids, product_ids), len(self.product_ids) - 1)
+            known = self.product_ids[rows] == product_ids
+            result[known] = values[rows[known]]
+        return result
+
+    def as_dict(self, method='seasonal'):
+        """Returns {product_id: forecast units} for every product."""
+        return dict(zip(self.product_ids.tolist(), getattr(self, method).tolist()))
+
+
+@profile_service_calls
+class ForecastService:
+    """
+    Forecasts demand for the whole catalogue at once from the daily sales
+    rollup. Results are cached until the next write to sales or products.
+    """
+
+    @staticmethod
+    def get_forecasts(horizon_days=30):
+        """Returns a DemandForecast for every product, computed with one query."""
+        today = date.today()
+        key = (today, horizon_days)
+        with _cache_lock:
+            cached = _cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            product_ids, history = ForecastService.load_history(today)
+            forecast = ForecastService.forecast(product_ids, history, today, horizon_days)
+        except Exception as e:
+            logger.error(f"Error computing demand forecasts: {e}", exc_info=True)
+            raise
+        with _cache_lock:
+            _cache[key] = forecast
+        return forecast
+
+    @staticmethod
+    def load_history(today, days=FORECAST_HISTORY_DAYS):
+        """
+        Returns (product_ids, history): every product id and a (products, days)
+        array of units sold per day, the last column being `today`.
+        """
+        start = today - timedelta(days=days - 1)
+        rows = (Product
+                .select(Product.id, DailySalesRollup.date, DailySalesRollup.units)
+                .join(DailySalesRollup, JOIN.LEFT_OUTER,
+                      on=((DailySalesRollup.product == Product.id) & (DailySalesRollup.date >= start)))
+                .order_by(Product.id)
+                .tuples())
+
+        pids, dates, units = [], [], []
+        for pid, day, count in rows:
+            pids.append(pid)
+            dates.append(day)
+            units.append(count or 0)
+
+        product_ids, row_index = np.unique(np.array(pids, dtype=np.int64), return_inverse=True)
+        history = np.zeros((len(product_ids), days))
+        sold = np.array([d is not None for d in dates], dtype=bool)
+        if sold.any():
+            day_index = (np.array([d for d in dates if d is not None], dtype='datetime64[D]')
+                         - np.datetime64(start, 'D')).astype(np.int64)
+            in_range = day_index < days
+            np.add.at(history,
+                      (row_index[sold][in_range], day_index[in_range]),
+                      np.array(units, dtype=float)[sold][in_range])
+        return product_ids, history
+
+    @staticmethod
+    def forecast(product_ids, history, today, horizon_days, alpha=SMOOTHING_ALPHA,
+                 window=MOVING_AVERAGE_DAYS):
+        """Computes all forecasts from a (products, days) history ending on `today`."""
+        days = history.shape[1]
+
+        moving_average = history[:, -window:].mean(axis=1) * horizon_days
+
+        # Simple exponential smoothing, level_t = a*x_t + (1-a)*level_(t-1), as
+        # one matrix-vector product with the closed-form weights of each day
+        weights = alpha * (1 - alpha) ** np.arange(days - 1, -1, -1)
+        weights[0] = (1 - alpha) ** (days - 1)
+        level = history @ weights
+        exponential = level * horizon_days
+
+        # Weekday profile: mean units per weekday relative to the overall mean
+        start_weekday = (today - timedelta(days=days - 1)).weekday()
+        weekday_of_day = (start_weekday + np.arange(days)) % 7
+        weekday_matrix = np.eye(7)[weekday_of_day]                   # (days, 7)
+        weekday_means = (history @ weekday_matrix) / np.maximum(weekday_matrix.sum(axis=0), 1)
+        overall_mean = history.mean(axis=1, keepdims=True)
+        profile = np.divide(weekday_means, overall_mean,
+                            out=np.ones_like(weekday_means), where=overall_mean > 0)
+
+        horizon_weekdays = (today.weekday() + 1 + np.arange(horizon_days)) % 7
+        seasonal_daily = level[:, None] * profile[:, horizon_weekdays]
+
+        return DemandForecast(product_ids, horizon_days, moving_average, exponential, seasonal_daily)
@@ -1,10 +1,25 @@
-from models import Sale, Product, Part, Filament, ProductFilament, PartFilament, db
+from models import (Order, OrderLine, OrderLineFilament, Product, Part, Filament, ProductFilament, PartFilament,
+                    StockMovement, db)
+from services.bom_resolver import BomResolver
+from services.stock_ledger import StockLedger
+from services.cost_cache import ProductCostCache, product_cost_cache, material_cost
+from services.query_profiler import profile_service_calls
+from services.analytics_service import AnalyticsService
+from services.planning_service import PlanningService, PrintableCapacity
+from peewee import Tuple
 from datetime import datetime
 from decimal import Decimal
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Filament fields that cached product costs and usage depend on
+COST_FIELDS = {'brand', 'material', 'color', 'cost_per_roll', 'grams_per_roll'}
+
+# Sales returned per get_sales_page call
+SALES_PAGE_SIZE = 100
+
+@profile_service_calls
 class InventoryService:
     """
     Service layer to handle business logic and manage the state between the 
@@ -27,16 +42,28 @@ class InventoryService:
         data: dict with brand, material, color, cost_per_roll, grams_per_roll, grams_remaining, rolls_in_stock
         """
         try:
-            if filament_id:
-                filament = Filament.get_by_id(filament_id)
-                for key, value in data.items():
-                    setattr(filament, key, value)
-                filament.save()
-                logger.info(f"Updated filament ID: {filament_id}")
-                return filament
-            else:
-                filament = Filament.create(**data)
-                logger.info(f"Created new filament ID: {filament.id}")
+            with db.atomic():
+                if filament_id:
+                    filament = Filament.get_by_id(filament_id)
+                    old_grams, old_rolls = filament.grams_remaining, filament.rolls_in_stock
+                    for key, value in data.items():
+                        setattr(filament, key, value)
+                    filament.save()
+                    # Stock-only edits leave cached costs valid
+                    if COST_FIELDS & set(data):
+                        product_cost_cache.invalidate_filament(filament.id)
+                    logger.info(f"Updated filament ID: {filament_id}")
+                else:
+                    filament = Filament.create(**data)
+                    old_grams, old_rolls = Decimal('0'), 0
+                    logger.info(f"Created new filament ID: {filament.id}")
+
+                # Record manual stock edits in the ledger
+                StockLedger.record_adjustment(
+                    filament=filament,
+                    grams_delta=Decimal(str(filament.grams_remaining)) - Decimal(str(old_grams)),
+                    rolls_delta=int(filament.rolls_in_stock) - int(old_rolls)
+                )
                 return filament
         except Exception as e:
             logger.error(f"Error saving filament: {e}")
@@ -48,6 +75,7 @@ class InventoryService:
         try:
             if filament_id:
                 Filament.delete_by_id(filament_id)
+                product_cost_cache.invalidate_filament(filament_id)
                 logger.info(f"Deleted filament ID: {filament_id}")
                 return True
             return False
@@ -55,6 +83,77 @@ class InventoryService:
             logger.error(f"Error deleting filament {filament_id}: {e}")
             raise
 
+    @staticmethod
+    def record_filament_purchase(filament_id, rolls_bought):
+        """Adds purchased rolls to a filament's stock and records the purchase."""
+        try:
+            purchase = StockLedger.record_purchase(filament_id, int(rolls_bought))
+            logger.info(f"Recorded purchase of {rolls_bought} rolls for filament ID: {filament_id}")
+            return purchase
+        except Exception as e:
+            logger.error(f"Error recording purchase for filament {filament_id}: {e}")
+            raise
+
+    @staticmethod
+    def set_filament_stock(filament, grams_remaining=None, rolls_in_stock=None):
+        """
+        Manually sets a filament's stock (e.g. after a physical count) and
+        records the change in the stock ledger.
+        """
+        data = {}
+        if grams_remaining is not None:
+            data['grams_remaining'] = Decimal(str(grams_remaining))
+        if rolls_in_stock is not None:
+            data['rolls_in_stock'] = int(rolls_in_stock)
+        saved = InventoryService.save_filament(filament.id, **data)
+        for key, value in data.items():
+            setattr(filament, key, value)
+        return saved
+
+    @staticmethod
+    def set_product_inventory(product, inventory_count):
+        """Manually sets a product's inventory count and records the change in the stock ledger."""
+        try:
+            with db.atomic():
+                # Diff against the stored count; the instance may be stale
+                product.inventory_count = Product.select(Product.inventory_count).where(
+                    Product.id == product.id).scalar()
+                delta = int(inventory_count) - product.inventory_count
+                StockLedger.move_product(product, delta, StockMovement.ADJUST)
+                logger.info(f"Set inventory of product ID {product.id} to {product.inventory_count}")
+                return product
+        except Exception as e:
+            logger.error(f"Error setting inventory for product {product.id}: {e}")
+            raise
+
+    @staticmethod
+    def apply_stock_edits(products=None, filaments=None):
+        """
+        Applies many manual stock edits in one transaction; if any fails, none are kept.
+        products: {Product: inventory_count}
+        filaments: {Filament: {'grams_remaining': ..., 'rolls_in_stock': ...}} (either or both)
+        """
+        try:
+            with db.atomic():
+                for product, inventory_count in (products or {}).items():
+                    InventoryService.set_product_inventory(product, inventory_count)
+                for filament, stock in (filaments or {}).items():
+                    InventoryService.set_filament_stock(filament, **stock)
+            logger.info(f"Applied stock edits to {len(products or {})} products and {len(filaments or {})} filaments")
+        except Exception as e:
+            logger.error(f"Error applying stock edits: {e}")
+            raise
+
+    @staticmethod
+    def products_using_filaments(filament_ids):
+        """Returns the IDs of the products that use any of the filaments, directly or through a part."""
+        filament_ids = list(filament_ids)
+        if not filament_ids:
+            return set()
+        direct = ProductFilament.select(ProductFilament.product).where(ProductFilament.filament.in_(filament_ids))
+        via_parts = Part.select(Part.product).join(PartFilament).where(PartFilament.filament.in_(filament_ids))
+        return {product_id for (product_id,) in (direct | via_parts).tuples()}
+
     @staticmethod
     def get_all_products():
         """Returns all products ordered by type, color, and size."""
@@ -75,11 +174,15 @@ class InventoryService:
             with db.atomic():
                 if product_id:
                     product = Product.get_by_id(product_id)
+                    old_count = product.inventory_count
                     for key, value in product_data.items():
                         setattr(product, key, value)
                     product.save()
                 else:
                     product = Product.create(**product_data)
+                    old_count = 0
+
+                StockLedger.record_adjustment(product=product, units_delta=int(product.inventory_count) - old_count)
 
                 # Handle Parts
                 if parts_data is not None:
@@ -114,6 +217,7 @@ class InventoryService:
                         if pid not in updated_part_ids:
                             Part.delete_by_id(pid)
 
+                product_cost_cache.invalidate_product(product.id)
                 return product
         except Exception as e:
             logger.error(f"Error saving product: {e}")
@@ -121,10 +225,20 @@ class InventoryService:
 
     @staticmethod
     def delete_product(product_id):
-        """Deletes a product by ID."""
+        """Deletes a product by ID, with its sales and the orders left without lines."""
         try:
             if product_id:
-                Product.delete_by_id(product_id)
+                with db.atomic():
+                    order_ids = [line.order_id for line in
+                                 OrderLine.select(OrderLine.order).where(OrderLine.product == product_id)]
+                    # Cascades to the product's order lines
+                    Product.delete_by_id(product_id)
+                    if order_ids:
+                        (Order
+                         .delete()
+                         .where(Order.id.in_(order_ids) & Order.id.not_in(OrderLine.select(OrderLine.order)))
+                         .execute())
+                product_cost_cache.invalidate_product(product_id)
                 logger.info(f"Deleted product ID: {product_id}")
                 return True
             return False
@@ -135,79 +249,91 @@ class InventoryService:
     @staticmethod
     def create_sale(product, quantity, total_value):
         """
-        Creates a complete sale. If quantity > 1, it splits the sale into multiple records
-        as per the "1 item per sale" requirement, dividing the total value equally.
+        Creates a complete sale: an Order with one OrderLine for the whole
+        quantity. The line keeps the material cost of one unit and the
+        filament the line used at today's prices (OrderLine.unit_cost and
+        OrderLineFilament rows).
         
         product: product object
         quantity: int
         total_value: float/Decimal total value for the entire quantity
+        Returns the OrderLine, or None if quantity is not positive.
         """
         try:
-            with db.atomic():
+            with StockLedger.transaction():
                 quantity = int(quantity)
                 total_value = Decimal(str(total_value))
                 
                 if quantity <= 0:
-                    return []
+                    return None
                 
-                unit_value = (total_value / quantity).quantize(Decimal('0.01'))
-                
-                created_sales = []
-                for i in range(quantity):
-                    # For the last one, we might need to adjust for rounding to match total_value exactly
-                    # but for simplicity and since user said "divide cost by count", equal split is fine.
-                    # If they want exact precision:
-                    current_value = unit_value
-                    if i == quantity - 1:
-                        current_value = total_value - (unit_value * (quantity - 1))
-                    
-                    sale = Sale.create(
-                        product=product,
-                        total_value=current_value
-                    )
-                    created_sales.append(sale)
+                # Resolved from the live BOM: stock deductions must not depend on cache freshness
+                cost = ProductCostCache.load([product.id])[product.id]
+
+                order = Order.create(date=datetime.now())
+                line = OrderLine.create(order=order, date=order.date, product=product, quantity=quantity,
+                                        total_value=total_value, unit_cost=cost.unit_cost)
+                InventoryService._record_line_filaments(line.id, cost.usage, quantity)
                 
-                # Adjust inventory once for the whole quantity
-                product.adjust_inventory(-quantity)
+                StockLedger.move_product(product, -quantity, StockMovement.SALE, sale_id=line.id)
                 
-                # Adjust filament inventory
-                total_usage = product.total_filament_usage
-                for filament, grams_per_unit in total_usage.items():
-                    total_grams = grams_per_unit * quantity
-                    filament.adjust_inventory(total_grams)
+                # Adjust filament inventory in one set-based update
+                StockLedger.move_filaments(
+                    {filament.id: grams_per_unit * quantity for filament, grams_per_unit in cost.usage.items()},
+                    StockMovement.SALE, sale_id=line.id
+                )
                     
                 logger.info(f"Recorded sale of {quantity}x {product}")
-                return created_sales
+                return line
         except Exception as e:
             logger.error(f"Error creating sale: {e}")
             raise
 
+    @staticmethod
+    def _record_line_filaments(line_id, usage, quantity):
+        """Records the filament an order line consumed. usage: {Filament: grams per unit}"""
+        rows = []
+        for filament, grams in usage.items():
+            grams = grams * quantity
+            rows.append((line_id, filament.id, grams, material_cost(filament, grams).quantize(Decimal('0.0001'))))
+        if rows:
+            (OrderLineFilament
+             .insert_many(rows, fields=[OrderLineFilament.line, OrderLineFilament.filament,
+                                        OrderLineFilament.grams, OrderLineFilament.cost])
+             .execute())
+
+    @staticmethod
+    def _consumed_filaments(line):
+        """
+        Returns {filament_id: grams} the order line took from stock: its
+        recorded usage, or the product's current BOM for lines recorded without one.
+        """
+        if line.unit_cost is None:
+            usage = BomResolver.resolve_usage([line.product_id])[line.product_id]
+            return {fid: grams * line.quantity for fid, grams in usage.items()}
+        return {lf.filament_id: lf.grams
+                for lf in OrderLineFilament.select().where(OrderLineFilament.line == line.id)}
+
     @staticmethod
     def calculate_printable_count(product):
         """
         Calculates how many of a given product could be printed with current filament inventory.
         """
+        return InventoryService.calculate_printable_counts([product])[product.id].count
+
+    @staticmethod
+    def calculate_printable_counts(products):
+        """
+        Calculates printable counts for many products at once.
+        Returns {product_id: PrintableCapacity(count, bottleneck)}, where bottleneck
+        is the Filament that limits the count (None for products without filament usage).
+        """
+        products = list(products)
         try:
-            total_usage = product.total_filament_usage
-            if not total_usage:
-                return 0
-            
-            limit = None
-            for filament, grams_needed in total_usage.items():
-                if grams_needed <= 0:
-                    continue
-                
-                # Total grams available for this filament
-                total_available = filament.grams_remaining + (filament.rolls_in_stock * filament.grams_per_roll)
-                can_print = int(total_available // grams_needed)
-                
-                if limit is None or can_print < limit:
-                    limit = can_print
-            
-            return limit if limit is not None else 0
+            return PlanningService.printable_counts(products)
         except Exception as e:
-            logger.error(f"Error calculating printable count: {e}")
-            return 0
+            logger.error(f"Error calculating printable counts: {e}")
+            return {p.id: PrintableCapacity(0, None) for p in products}
 
     @staticmethod
     def get_active_sales():
@@ -215,43 +341,85 @@ class InventoryService:
         Returns all sales ordered by date.
         """
         try:
-            return Sale.select().order_by(Sale.date.desc())
+            return OrderLine.select().order_by(OrderLine.date.desc())
         except Exception as e:
             logger.error(f"Error fetching active sales: {e}")
             return []
 
+    @staticmethod
+    def get_sales_page(cursor=None, limit=SALES_PAGE_SIZE):
+        """
+        Returns one page of sales (order lines), newest first, as (sales, next_cursor).
+
+        Pages are keyed on (date, id) rather than OFFSET, so each page costs
+        the same however deep into the history it is. Pass the returned
+        next_cursor to get the following page; it is None after the last page.
+        Each sale's product is loaded in the same query.
+        """
+        try:
+            query = (OrderLine
+                     .select(OrderLine, Product)
+                     .join(Product)
+                     .order_by(OrderLine.date.desc(), OrderLine.id.desc())
+                     .limit(limit + 1))
+            if cursor is not None:
+                query = query.where(Tuple(OrderLine.date, OrderLine.id) < Tuple(*cursor))
+            sales = list(query)
+            if len(sales) <= limit:
+                return sales, None
+            sales = sales[:limit]
+            return sales, (sales[-1].date, sales[-1].id)
+        except Exception as e:
+            logger.error(f"Error fetching sales page: {e}")
+            return [], None
+
     @staticmethod
     def update_sale(sale_id, **data):
         """
-        Updates a sale record and adjusts product inventory if needed.
-        data: dict with product, total_value, date
+        Updates a sale (order line) and adjusts product inventory if needed.
+        Changing the product or quantity puts back the filament the line
+        recorded and records the new usage and cost at today's prices.
+        data: dict with product, quantity, total_value, date
         """
         try:
-            with db.atomic():
-                sale = Sale.get_by_id(sale_id)
-                old_product = sale.product
+            with StockLedger.transaction():
+                line = OrderLine.get_by_id(sale_id)
+                old_product, old_quantity = line.product, line.quantity
                 new_product = data.get('product', old_product)
+                new_quantity = int(data.get('quantity', old_quantity))
+                if new_quantity <= 0:
+                    raise ValueError("Quantity must be positive.")
                 
-                # If product changed, adjust inventory for both
-                if old_product != new_product:
-                    old_product.adjust_inventory(1) # Revert old
-                    new_product.adjust_inventory(-1) # Apply new
-                    
-                    # Revert filament for old product
-                    old_usage = old_product.total_filament_usage
-                    for filament, grams in old_usage.items():
-                        filament.adjust_inventory(-grams) # Negative to add back
+                if old_product != new_product or old_quantity != new_quantity:
+                    # Revert the old units, then apply the new ones
+                    StockLedger.move_product(old_product, old_quantity, StockMovement.SALE_EDIT, sale_id=sale_id)
+                    StockLedger.move_product(new_product, -new_quantity, StockMovement.SALE_EDIT, sale_id=sale_id)
                     
-                    # Apply filament for new product
-                    new_usage = new_product.total_filament_usage
-                    for filament, grams in new_usage.items():
-                        filament.adjust_inventory(grams) # Positive to subtract
+                    consumed = InventoryService._consumed_filaments(line)
+                    cost = ProductCostCache.load([new_product.id])[new_product.id]
+
+                    # Net movement per filament: add back what the line took, subtract the new usage
+                    movements = {}
+                    for fid, grams in consumed.items():
+                        movements[fid] = movements.get(fid, Decimal('0')) - grams
+                    for filament, grams in cost.usage.items():
+                        movements[filament.id] = movements.get(filament.id, Decimal('0')) + grams * new_quantity
+                    StockLedger.move_filaments(movements, StockMovement.SALE_EDIT, sale_id=sale_id)
+
+                    OrderLineFilament.delete().where(OrderLineFilament.line == sale_id).execute()
+                    InventoryService._record_line_filaments(sale_id, cost.usage, new_quantity)
+                    line.unit_cost = cost.unit_cost
                 
                 for key, value in data.items():
-                    setattr(sale, key, value)
-                sale.save()
+                    setattr(line, key, value)
+                line.quantity = new_quantity
+                line.save()
+                if 'date' in data:
+                    # The order's lines share its date
+                    Order.update(date=line.date).where(Order.id == line.order_id).execute()
+                    OrderLine.update(date=line.date).where(OrderLine.order == line.order_id).execute()
                 logger.info(f"Updated sale ID: {sale_id}")
-                return sale
+                return line
         except Exception as e:
             logger.error(f"Error updating sale {sale_id}: {e}")
             raise
@@ -259,19 +427,23 @@ class InventoryService:
     @staticmethod
     def delete_sale(sale_id):
         """
-        Deletes a sale and reverts the product inventory.
+        Deletes a sale (order line) and reverts the product inventory and the
+        filament it recorded using. An order left without lines is deleted too.
         """
         try:
-            with db.atomic():
-                sale = Sale.get_by_id(sale_id)
-                sale.product.adjust_inventory(1) # Revert inventory
+            with StockLedger.transaction():
+                line = OrderLine.get_by_id(sale_id)
+                # Revert inventory
+                StockLedger.move_product(line.product, line.quantity, StockMovement.SALE_DELETE, sale_id=sale_id)
                 
-                # Revert filament usage
-                usage = sale.product.total_filament_usage
-                for filament, grams in usage.items():
-                    filament.adjust_inventory(-grams) # Add back
+                # Revert filament usage (negative movements add back)
+                usage = InventoryService._consumed_filaments(line)
+                StockLedger.move_filaments({fid: -grams for fid, grams in usage.items()},
+                                           StockMovement.SALE_DELETE, sale_id=sale_id)
                     
-                sale.delete_instance()
+                line.delete_instance()
+                if not OrderLine.select().where(OrderLine.order == line.order_id).exists():
+                    Order.delete_by_id(line.order_id)
                 logger.info(f"Deleted sale ID: {sale_id}")
                 return True
         except Exception as e:
@@ -279,73 +451,13 @@ class InventoryService:
             raise
 
     @staticmethod
-    def get_analytics_data(start_date, end_date):
+    def get_analytics_data(start_date, end_date, bucket='day'):
         """
         Aggregates sales data within a date range.
         start_date, end_date: datetime objects
+        bucket: 'day', 'week' or 'month' (see AnalyticsService.choose_bucket)
         """
-        sales = Sale.select().where(
-            (Sale.date >= start_date) & 
-            (Sale.date <= end_date)
-        ).order_by(Sale.date)
-        
-        data = {
-            'total_sales_count': len(sales),
-            'gross_revenue': Decimal('0.00'),
-            'total_cost': Decimal('0.00'),
-            'net_profit': Decimal('0.00'),
-            'product_breakdown': {}, # product_name: {count, revenue, cost}
-            'filament_usage': {},    # filament_name: grams
-            'daily_stats': {},       # date_str: {revenue, cost, profit}
-        }
-        
-        for sale in sales:
-            prod = sale.product
-            data['gross_revenue'] += sale.total_value
-            
-            # Product breakdown
-            prod_name = str(prod)
-            if prod_name not in data['product_breakdown']:
-                data['product_breakdown'][prod_name] = {
-                    'count': 0,
-                    'revenue': Decimal('0.00'),
-                    'cost': Decimal('0.00')
-                }
-            data['product_breakdown'][prod_name]['count'] += 1
-            data['product_breakdown'][prod_name]['revenue'] += sale.total_value
-            
-            # Calculate cost for this specific sale (at current material prices)
-            sale_cost = prod.total_cost
-            data['total_cost'] += sale_cost
-            data['product_breakdown'][prod_name]['cost'] += sale_cost
-            
-            # Daily stats
-            date_str = sale.date.strftime("%Y-%m-%d")
-            if date_str not in data['daily_stats']:
-                data['daily_stats'][date_str] = {
-                    'revenue': Decimal('0.00'),
-                    'cost': Decimal('0.00'),
-                    'profit': Decimal('0.00')
-                }
-            data['daily_stats'][date_str]['revenue'] += sale.total_value
-            data['daily_stats'][date_str]['cost'] += sale_cost
-            data['daily_stats'][date_str]['profit'] += (sale.total_value - sale_cost)
-
-            # Filament usage breakdown
-            usage = prod.total_filament_usage
-            for filament, grams in usage.items():
-                fil_name = str(filament)
-                if fil_name not in data['filament_usage']:
-                    data['filament_usage'][fil_name] = {'grams': Decimal('0.00'), 'cost': Decimal('0.00')}
-                
-                data['filament_usage'][fil_name]['grams'] += grams
-                
-                # Calculate cost for this specific filament usage
-                fil_cost = (grams / filament.grams_per_roll) * filament.cost_per_roll
-                data['filament_usage'][fil_name]['cost'] += fil_cost
-                
-        data['net_profit'] = data['gross_revenue'] - data['total_cost']
-        return data
+        return AnalyticsService.get_analytics_data(start_date, end_date, bucket)
 
     @staticmethod
     def get_todo_data():
@@ -353,65 +465,9 @@ class InventoryService:
         Returns a dictionary with 'to_print' and 'to_order' lists.
         'to_print': List of top 4 products that sell most and have stock < 3.
         'to_order': List of filaments to order with quantities.
+        See PlanningService.get_todo_data.
         """
-        from peewee import fn
-        # 1. Calculate sales count for each product
-        sales_counts = (Sale
-                        .select(Sale.product, fn.COUNT(Sale.id).alias('count'))
-                        .group_by(Sale.product))
-        
-        count_map = {s.product_id: s.count for s in sales_counts}
-        
-        # 2. Get next 4 things to print
-        # Products needing stock (less than 3)
-        needing_stock = Product.select().where(Product.inventory_count < 3)
-        
-        # Sort needing_stock by sales count
-        sorted_products = sorted(needing_stock, key=lambda p: count_map.get(p.id, 0), reverse=True)
-        to_print = sorted_products[:4]
-        
-        # 3. Calculate filament to order
-        # Requirement: print min 6 of any product + what the to_print list will consume
-        
-        all_filaments = Filament.select()
-        to_order = []
-        all_products = list(Product.select())
-        
-        for filament in all_filaments:
-            # G_todo(F) = grams needed to reach stock of 3 for everything in to_print
-            grams_todo = Decimal('0')
-            for p in to_print:
-                usage = p.total_filament_usage
-                grams_needed_per_unit = usage.get(filament, Decimal('0'))
-                units_needed = max(0, 3 - p.inventory_count)
-                grams_todo += grams_needed_per_unit * Decimal(str(units_needed))
-            
-            # G_buffer(F) = max grams needed to print 6 of ANY single product
-            max_grams_for_6 = Decimal('0')
-            for p in all_products:
-                usage = p.total_filament_usage
-                grams_needed_per_unit = usage.get(filament, Decimal('0'))
-                max_grams_for_6 = max(max_grams_for_6, grams_needed_per_unit * 6)
-            
-            total_needed = grams_todo + max_grams_for_6
-            
-            # G_available(F)
-            total_available = filament.grams_remaining + (filament.rolls_in_stock * filament.grams_per_roll)
-            
-            grams_to_order = max(Decimal('0'), total_needed - total_available)
-            
-            if grams_to_order > 0:
-                rolls_to_order = int((grams_to_order / filament.grams_per_roll).to_integral_value(rounding='ROUND_UP'))
-                to_order.append({
-                    'filament': filament,
-                    'rolls': rolls_to_order,
-                    'grams': grams_to_order
-                })
-        
-        return {
-            'to_print': to_print,
-            'to_order': to_order
-        }
+        return PlanningService.get_todo_data()
 
 class SaleDraft:
     """
@@ -0,0 +1,165 @@
+from models import Filament, Product, DailySalesRollup
+from services.bom_resolver import BomResolver, ID_CHUNK_SIZE
+from services.forecast_service import ForecastService
+from services.query_profiler import profile_service_calls
+from peewee import fn
+from collections import namedtuple
+from decimal import Decimal, ROUND_CEILING
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Products with less stock than this are candidates for the print list
+MIN_STOCK = 3
+# Number of products suggested for printing at once
+PRINT_LIST_SIZE = 4
+# Filament reserve: enough to print this many of whichever product uses the most of it
+BUFFER_UNITS = 6
+# Days of forecast demand that product stock should cover
+PLANNING_HORIZON_DAYS = 30
+
+# Grams per unit of every product (rows) for every filament (columns), in
+# integer centigrams so sums and comparisons are exact
+UsageMatrix = namedtuple('UsageMatrix', ['product_ids', 'filament_ids', 'centigrams'])
+
+# How many of a product the filament stock allows, and the Filament that runs out first (None without usage)
+PrintableCapacity = namedtuple('PrintableCapacity', ['count', 'bottleneck'])
+
+
+def to_centigrams(grams):
+    return int((Decimal(str(grams)) * 100).to_integral_value())
+
+
+@profile_service_calls
+class PlanningService:
+    """
+    Print and reorder planning on a product x filament usage matrix.
+    Filament requirements for the whole catalogue are one matrix-vector
+    product of the per-product demand with the usage matrix.
+    """
+
+    @staticmethod
+    def usage_matrix(product_ids, filament_ids):
+        """
+        Builds the UsageMatrix for the given product and filament IDs (in that order).
+        Small product sets are resolved by ID; larger ones load the whole BOM in one pass.
+        """
+        product_index = {pid: i for i, pid in enumerate(product_ids)}
+        filament_index = {fid: j for j, fid in enumerate(filament_ids)}
+        if len(product_index) > ID_CHUNK_SIZE:
+            bom = BomResolver.resolve_usage()
+        else:
+            bom = BomResolver.resolve_usage(list(product_index))
+        rows, cols, values = [], [], []
+        for pid, per_product in bom.items():
+            i = product_index.get(pid)
+            if i is None:
+                continue
+            for fid, grams in per_product.items():
+                j = filament_index.get(fid)
+                if j is not None:
+                    rows.append(i)
+                    cols.append(j)
+                    values.append(to_centigrams(grams))
+
+        centigrams = np.zeros((len(product_ids), len(filament_ids)), dtype=np.int64)
+        np.add.at(centigrams, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)),
+                  np.array(values, dtype=np.int64))
+        return UsageMatrix(np.array(product_ids, dtype=np.int64), np.array(filament_ids, dtype=np.int64), centigrams)
+
+    @staticmethod
+    def available_centigrams(filaments):
+        """Returns the grams in stock (open roll plus stocked rolls) of each filament, in centigrams."""
+        return np.array([
+            to_centigrams(f.grams_remaining + f.rolls_in_stock * f.grams_per_roll) for f in filaments
+        ], dtype=np.int64)
+
+    @staticmethod
+    def printable_counts(products):
+        """
+        Returns {product_id: PrintableCapacity} for the given products.
+
+        For every product and filament it uses, the stock allows
+        available // grams_per_unit units; the product's count is the minimum
+        over its filaments and the bottleneck is the filament reaching it.
+        Computed for all products at once on the usage matrix. Products without
+        filament usage get a count of 0; negative stock counts as empty.
+        """
+        products = list(products)
+        filaments = list(Filament.select()) if products else []
+        if not filaments:
+            return {p.id: PrintableCapacity(0, None) for p in products}
+        usage = PlanningService.usage_matrix([p.id for p in products], [f.id for f in filaments])
+        available = np.maximum(PlanningService.available_centigrams(filaments), 0)
+
+        uses = usage.centigrams > 0
+        ratios = np.where(uses, available // np.where(uses, usage.centigrams, 1), np.iinfo(np.int64).max)
+        bottlenecks = ratios.argmin(axis=1)
+        has_usage = uses.any(axis=1)
+        counts = np.where(has_usage, ratios[np.arange(len(products)), bottlenecks], 0)
+
+        return {
+            pid: PrintableCapacity(count, filaments[j] if used else None)
+            for pid, count, j, used in zip(usage.product_ids.tolist(), counts.tolist(),
+                                           bottlenecks.tolist(), has_usage.tolist())
+        }
+
+    @staticmethod
+    def get_todo_data(horizon_days=PLANNING_HORIZON_DAYS):
+        """
+        Returns {'to_print': [Product], 'to_order': [{'filament', 'rolls', 'grams'}]}.
+
+        to_print: the best-selling products with less than MIN_STOCK in stock.
+        to_order: filaments whose stock does not cover
+            - printing every product up to its target stock: the forecast demand
+              over horizon_days, and at least MIN_STOCK for products on the print list,
+            - plus a reserve of BUFFER_UNITS of the product that uses the most of it.
+        """
+        try:
+            sales_counts = dict(DailySalesRollup
+                                .select(DailySalesRollup.product, fn.SUM(DailySalesRollup.units))
+                                .group_by(DailySalesRollup.product)
+                                .tuples())
+            products = list(Product.select())
+            filaments = list(Filament.select())
+
+            needing_stock = [p for p in products if p.inventory_count < MIN_STOCK]
+            needing_stock.sort(key=lambda p: sales_counts.get(p.id, 0), reverse=True)
+            to_print = needing_stock[:PRINT_LIST_SIZE]
+
+            product_ids = [p.id for p in products]
+            usage = PlanningService.usage_matrix(product_ids, [f.id for f in filaments])
+
+            # Units to print per product to reach its target stock
+            inventory = np.array([p.inventory_count for p in products], dtype=np.int64)
+            forecast = ForecastService.get_forecasts(horizon_days).for_products(product_ids)
+            target = np.ceil(np.round(forecast, 6)).astype(np.int64)
+            on_print_list = np.isin(usage.product_ids, [p.id for p in to_print])
+            target[on_print_list] = np.maximum(target[on_print_list], MIN_STOCK)
+            units_needed = np.maximum(target - inventory, 0)
+
+            required = units_needed @ usage.centigrams
+            if len(products):
+                required += BUFFER_UNITS * usage.centigrams.max(axis=0)
+            shortfall = required - PlanningService.available_centigrams(filaments)
+
+            to_order = []
+            for filament, missing in zip(filaments, shortfall.tolist()):
+                if missing <= 0:
+                    continue
+                grams_to_order = Decimal(missing).scaleb(-2)
+                rolls_to_order = int((grams_to_order / filament.grams_per_roll).to_integral_value(rounding=ROUND_CEILING))
+                to_order.append({
+                    'filament': filament,
+                    'rolls': rolls_to_order,
+                    'grams': grams_to_order
+                })
+
+            return {
+                'to_print': to_print,
+                'to_order': to_order
+            }
+        except Exception as e:
+            logger.error(f"Error building to-do plan: {e}", exc_info=True)
+            raise
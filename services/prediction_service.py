@@ -1,9 +1,12 @@
 import logging
 from datetime import datetime, timedelta
-from models import Sale, Product
+from models import DailySalesRollup, Product
+from peewee import fn
+from services.query_profiler import profile_service_calls
 
 logger = logging.getLogger(__name__)
 
+@profile_service_calls
 class PredictionService:
     """
     Service for predicting future inventory needs based on historical sales data.
@@ -16,11 +19,11 @@ class PredictionService:
         using a simple moving average of the last 90 days.
         """
         try:
-            ninety_days_ago = datetime.now() - timedelta(days=90)
-            recent_sales = Sale.select().where(
-                (Sale.product == product_id) & 
-                (Sale.date >= ninety_days_ago)
-            ).count()
+            ninety_days_ago = (datetime.now() - timedelta(days=90)).date()
+            recent_sales = DailySalesRollup.select(fn.SUM(DailySalesRollup.units)).where(
+                (DailySalesRollup.product == product_id) & 
+                (DailySalesRollup.date >= ninety_days_ago)
+            ).scalar() or 0
             
             # Simple average: sales in 90 days / 3 = predicted sales in 30 days
             prediction = round(recent_sales / 3.0, 2)
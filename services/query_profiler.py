@@ -0,0 +1,136 @@
+from models.base import add_query_listener, remove_query_listener
+from collections import Counter
+from functools import wraps
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Set INVENTORYMANAGER_PROFILE_SQL=1 to log a query summary for every service call
+_profiling_enabled = os.environ.get('INVENTORYMANAGER_PROFILE_SQL', '') not in ('', '0')
+
+# A statement shape repeated this many times within one call is flagged as a likely N+1
+N_PLUS_ONE_THRESHOLD = 5
+
+_TRANSACTION_PREFIXES = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+_PLACEHOLDER_GROUP = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_REPEATED_GROUPS = re.compile(r'\(\?\)(?:\s*,\s*\(\?\))+')
+
+_local = threading.local()
+
+
+def enable_service_profiling(enabled=True):
+    """Switches per-call query summaries for profiled services on or off at runtime."""
+    global _profiling_enabled
+    _profiling_enabled = enabled
+
+
+def statement_shape(sql):
+    """
+    Normalizes a statement so calls that differ only in bound values or in
+    the length of IN (...) / VALUES lists compare equal.
+    """
+    shape = _PLACEHOLDER_GROUP.sub('(?)', sql)
+    shape = _REPEATED_GROUPS.sub('(?)', shape)
+    return ' '.join(shape.split())
+
+
+class QueryProfiler:
+    """
+    Counts and times the SQL statements executed by the current thread while
+    active. Transaction control statements (BEGIN, SAVEPOINT, ...) are ignored.
+
+    Usage:
+        with QueryProfiler() as profiler:
+            InventoryService.get_todo_data()
+        profiler.assert_max_queries(10)
+    """
+
+    def __init__(self, label=None, n_plus_one_threshold=N_PLUS_ONE_THRESHOLD):
+        self.label = label
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.statements = []  # [(sql, seconds)]
+        self._thread_id = None
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        add_query_listener(self._on_query)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        remove_query_listener(self._on_query)
+        return False
+
+    def _on_query(self, sql, params, seconds):
+        if threading.get_ident() != self._thread_id:
+            return
+        if sql.lstrip().upper().startswith(_TRANSACTION_PREFIXES):
+            return
+        self.statements.append((sql, seconds))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def total_time(self):
+        return sum(seconds for _, seconds in self.statements)
+
+    def shape_counts(self):
+        """Returns a Counter of statement shapes."""
+        return Counter(statement_shape(sql) for sql, _ in self.statements)
+
+    def suspected_n_plus_one(self):
+        """Returns [(shape, count)] for shapes repeated at least n_plus_one_threshold times."""
+        return [(shape, count) for shape, count in self.shape_counts().most_common()
+                if count >= self.n_plus_one_threshold]
+
+    def summary(self):
+        label = self.label or "block"
+        return f"{label}: {self.count} queries in {self.total_time * 1000:.1f} ms"
+
+    def assert_max_queries(self, limit):
+        """Raises AssertionError if more than `limit` statements were executed."""
+        if self.count > limit:
+            repeated = "; ".join(f"{count}x {shape}" for shape, count in self.suspected_n_plus_one())
+            raise AssertionError(
+                f"Expected at most {limit} queries, got {self.count}."
+                + (f" Repeated: {repeated}" if repeated else "")
+            )
+
+    def log(self):
+        """Logs the summary, with a warning for each likely N+1 pattern."""
+        logger.info(self.summary())
+        for shape, count in self.suspected_n_plus_one():
+            logger.warning(f"{self.label or 'block'}: possible N+1, {count}x {shape}")
+
+
+def profile_service_calls(cls):
+    """
+    Class decorator: while profiling is enabled, every public static method of
+    the class runs inside a QueryProfiler and logs its summary. Nested service
+    calls are counted in the outermost call only.
+    """
+    for name, attr in list(vars(cls).items()):
+        if name.startswith('_') or not isinstance(attr, staticmethod):
+            continue
+        setattr(cls, name, staticmethod(_profiled(f"{cls.__name__}.{name}", attr.__func__)))
+    return cls
+
+
+def _profiled(label, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _profiling_enabled or getattr(_local, 'active', False):
+            return func(*args, **kwargs)
+        _local.active = True
+        profiler = QueryProfiler(label)
+        try:
+            with profiler:
+                return func(*args, **kwargs)
+        finally:
+            _local.active = False
+            profiler.log()
+    return wrapper
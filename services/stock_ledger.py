@@ -0,0 +1,197 @@
+from models import Filament, FilamentPurchase, Product, StockMovement, StockSnapshot, db
+from peewee import fn, chunked
+from datetime import datetime
+from decimal import Decimal
+import logging
+
+logger = logging.getLogger(__name__)
+
+# A snapshot is taken after this many movements, bounding point-in-time replays
+SNAPSHOT_INTERVAL = 500
+
+# Rows per multi-row INSERT (each row binds up to 8 parameters)
+INSERT_BATCH_SIZE = 100
+
+MOVEMENT_DEFAULTS = {'filament': None, 'product': None, 'grams_delta': Decimal('0'),
+                     'rolls_delta': 0, 'units_delta': 0, 'sale_id': None}
+SNAPSHOT_DEFAULTS = {'filament': None, 'product': None, 'grams_remaining': None,
+                     'rolls_in_stock': None, 'inventory_count': None}
+
+
+class StockLedger:
+    """
+    Applies stock changes and appends them to the StockMovement ledger.
+
+    Filament.grams_remaining, rolls_in_stock and Product.inventory_count remain
+    the current stock; the ledger is the history that lets stock_at() rebuild
+    the stock at any past date from the nearest snapshot.
+    """
+
+    @staticmethod
+    def transaction():
+        """
+        A transaction that takes the database write lock when it begins
+        (BEGIN IMMEDIATE), so filament stock read inside it cannot be changed
+        by another connection before it is written back. A transaction that
+        calls move_filaments must be opened with this; nested, it is a savepoint.
+        """
+        return db.atomic(lock_type='IMMEDIATE')
+
+    @staticmethod
+    def move_filaments(grams_by_filament, reason, sale_id=None):
+        """
+        Deducts grams per filament (negative to add back) and records one
+        movement per changed filament.
+        grams_by_filament: {filament_id: grams}
+        """
+        with StockLedger.transaction():
+            changes = Filament.apply_stock_movements(grams_by_filament)
+            StockLedger._append([
+                {'reason': reason, 'filament': fid, 'grams_delta': c.grams_delta,
+                 'rolls_delta': c.rolls_delta, 'sale_id': sale_id}
+                for fid, c in changes.items()
+            ])
+            return changes
+
+    @staticmethod
+    def move_product(product, units, reason, sale_id=None):
+        """
+        Changes a product's inventory_count by units (positive or negative).
+        The count is changed in SQL rather than read-modify-written, and the
+        given instance is kept in sync.
+        """
+        if not units:
+            return
+        with db.atomic():
+            Product.update(inventory_count=Product.inventory_count + units).where(Product.id == product.id).execute()
+            StockLedger._append([
+                {'reason': reason, 'product': product.id, 'units_delta': units, 'sale_id': sale_id}
+            ])
+        product.inventory_count += units
+
+    @staticmethod
+    def record_adjustment(filament=None, product=None, grams_delta=0, rolls_delta=0, units_delta=0):
+        """
+        Records a manual stock edit that has already been saved on the model
+        (e.g. from the filament or product form).
+        """
+        if not (grams_delta or rolls_delta or units_delta):
+            return
+        StockLedger._append([{
+            'reason': StockMovement.ADJUST,
+            'filament': filament.id if filament else None,
+            'product': product.id if product else None,
+            'grams_delta': Decimal(str(grams_delta)),
+            'rolls_delta': rolls_delta,
+            'units_delta': units_delta,
+        }])
+
+    @staticmethod
+    def record_purchase(filament_id, rolls_bought):
+        """Adds purchased rolls to stock and records the purchase and its movement."""
+        with db.atomic():
+            filament = Filament.get_by_id(filament_id)
+            purchase = FilamentPurchase.create(
+                filament=filament,
+                rolls_bought=rolls_bought,
+                grams_added=filament.grams_per_roll * rolls_bought
+            )
+            (Filament
+             .update(rolls_in_stock=Filament.rolls_in_stock + rolls_bought)
+             .where(Filament.id == filament.id)
+             .execute())
+            filament.rolls_in_stock += rolls_bought
+            StockLedger._append([
+                {'reason': StockMovement.PURCHASE, 'filament': filament.id, 'rolls_delta': rolls_bought}
+            ])
+            return purchase
+
+    @staticmethod
+    def take_snapshot():
+        """Copies the current stock of every filament and product into StockSnapshot."""
+        with db.atomic():
+            last_movement_id = StockMovement.select(fn.MAX(StockMovement.id)).scalar() or 0
+            taken_at = datetime.now()
+            rows = [
+                {'taken_at': taken_at, 'last_movement_id': last_movement_id, 'filament': fid,
+                 'grams_remaining': remaining, 'rolls_in_stock': rolls}
+                for fid, remaining, rolls in Filament.select(
+                    Filament.id, Filament.grams_remaining, Filament.rolls_in_stock).tuples()
+            ]
+            rows += [
+                {'taken_at': taken_at, 'last_movement_id': last_movement_id, 'product': pid,
+                 'inventory_count': count}
+                for pid, count in Product.select(Product.id, Product.inventory_count).tuples()
+            ]
+            for batch in chunked(rows, INSERT_BATCH_SIZE):
+                StockSnapshot.insert_many([{**SNAPSHOT_DEFAULTS, **row} for row in batch]).execute()
+            logger.info(f"Took stock snapshot at movement {last_movement_id}")
+            return last_movement_id
+
+    @staticmethod
+    def stock_at(when):
+        """
+        Reconstructs stock at a past datetime.
+        Returns {'filaments': {id: (grams_remaining, rolls_in_stock)}, 'products': {id: inventory_count}}.
+
+        Starts from the latest snapshot taken at or before `when` and replays
+        the movements recorded after it. Without such a snapshot it starts from
+        the current stock and subtracts the movements recorded after `when`.
+        """
+        snapshot = (StockSnapshot
+                    .select(StockSnapshot.last_movement_id)
+                    .where(StockSnapshot.taken_at <= when)
+                    .order_by(StockSnapshot.taken_at.desc(), StockSnapshot.id.desc())
+                    .first())
+
+        if snapshot is not None:
+            filaments, products = {}, {}
+            rows = StockSnapshot.select().where(StockSnapshot.last_movement_id == snapshot.last_movement_id)
+            for row in rows:
+                if row.filament_id is not None:
+                    filaments[row.filament_id] = (row.grams_remaining, row.rolls_in_stock)
+                else:
+                    products[row.product_id] = row.inventory_count
+            replay = ((StockMovement.id > snapshot.last_movement_id) & (StockMovement.date <= when))
+            sign = 1
+        else:
+            filaments = {
+                fid: (remaining, rolls) for fid, remaining, rolls in Filament.select(
+                    Filament.id, Filament.grams_remaining, Filament.rolls_in_stock).tuples()
+            }
+            products = dict(Product.select(Product.id, Product.inventory_count).tuples())
+            replay = (StockMovement.date > when)
+            sign = -1
+
+        deltas = (StockMovement
+                  .select(StockMovement.filament, StockMovement.product,
+                          fn.SUM(StockMovement.grams_delta), fn.SUM(StockMovement.rolls_delta),
+                          fn.SUM(StockMovement.units_delta))
+                  .where(replay)
+                  .group_by(StockMovement.filament, StockMovement.product)
+                  .tuples())
+        for fid, pid, grams, rolls, units in deltas:
+            if fid is not None:
+                remaining, in_stock = filaments.get(fid, (Decimal('0'), 0))
+                grams = Decimal(str(grams or 0)).quantize(Decimal('0.01'))
+                filaments[fid] = (remaining + sign * grams, in_stock + sign * (rolls or 0))
+            if pid is not None:
+                products[pid] = products.get(pid, 0) + sign * (units or 0)
+
+        return {'filaments': filaments, 'products': products}
+
+    @staticmethod
+    def _append(rows):
+        """Appends movement rows and takes a snapshot every SNAPSHOT_INTERVAL movements."""
+        if not rows:
+            return
+        now = datetime.now()
+        last_id = None
+        for batch in chunked(rows, INSERT_BATCH_SIZE):
+            last_id = StockMovement.insert_many(
+                [{**MOVEMENT_DEFAULTS, 'date': now, **row} for row in batch]
+            ).execute()
+
+        last_snapshot = StockSnapshot.select(fn.MAX(StockSnapshot.last_movement_id)).scalar() or 0
+        if last_id and last_id - last_snapshot >= SNAPSHOT_INTERVAL:
+            StockLedger.take_snapshot()
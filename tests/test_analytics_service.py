@@ -0,0 +1,112 @@
+import unittest
+import os
+from decimal import Decimal
+from datetime import datetime, timedelta
+
+# Set environment variable before importing models
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+from models import db, Filament, Product, Sale, OrderLineFilament
+from database import reset_database
+from services.analytics_service import AnalyticsService
+from services.inventory_service import InventoryService
+
+class TestAnalyticsService(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        db.connect(reuse_if_open=True)
+
+        self.black = Filament.create(brand="G", material="PLA", color="Black",
+                                     cost_per_roll=Decimal('14.28'), grams_per_roll=Decimal('1000'))
+        self.pink = Filament.create(brand="G", material="PLA", color="Pink",
+                                    cost_per_roll=Decimal('15.00'), grams_per_roll=Decimal('1000'))
+
+        self.hide = Product.create(product_type="Gothic hide", size="XL", color_variant="Black/Pink")
+        lid = self.hide.add_part("Lid", print_time_hours=9.62)
+        lid.add_filament_usage(self.black, 161.67)
+        lid.add_filament_usage(self.pink, 29.51)
+        base = self.hide.add_part("Base", print_time_hours=11)
+        base.add_filament_usage(self.black, 368.88)
+        base.add_filament_usage(self.pink, 71.47)
+
+        self.widget = Product.create(product_type="Widget", size="M", color_variant="Pink")
+        self.widget.add_filament_usage(self.pink, 100)
+
+    def tearDown(self):
+        db.close()
+
+    def test_grouped_totals_match_per_unit_costs(self):
+        day1 = datetime(2024, 3, 1, 10, 0)
+        day2 = datetime(2024, 3, 2, 15, 30)
+        for value in ('3.33', '3.33', '3.34'):
+            Sale.create(product=self.hide, total_value=Decimal(value), date=day1)
+        Sale.create(product=self.widget, total_value=Decimal('20.00'), date=day1)
+        Sale.create(product=self.widget, total_value=Decimal('25.00'), date=day2)
+        # Outside the range
+        Sale.create(product=self.widget, total_value=Decimal('99.00'), date=datetime(2024, 4, 1))
+
+        data = AnalyticsService.get_analytics_data(datetime(2024, 3, 1), datetime(2024, 3, 3))
+
+        hide_cost = self.hide.total_cost      # 9.09
+        widget_cost = self.widget.total_cost  # 1.50
+        self.assertEqual(data['total_sales_count'], 5)
+        self.assertEqual(data['gross_revenue'], Decimal('55.00'))
+        self.assertEqual(data['total_cost'], hide_cost * 3 + widget_cost * 2)
+        self.assertEqual(data['net_profit'], data['gross_revenue'] - data['total_cost'])
+
+        self.assertEqual(data['product_breakdown'][str(self.hide)],
+                         {'count': 3, 'revenue': Decimal('10.00'), 'cost': hide_cost * 3})
+        self.assertEqual(data['product_breakdown'][str(self.widget)]['count'], 2)
+
+        self.assertEqual(set(data['daily_stats']), {'2024-03-01', '2024-03-02'})
+        self.assertEqual(data['daily_stats']['2024-03-01']['revenue'], Decimal('30.00'))
+        self.assertEqual(data['daily_stats']['2024-03-02']['profit'], Decimal('25.00') - widget_cost)
+
+        self.assertEqual(data['filament_usage'][str(self.black)]['grams'], Decimal('530.55') * 3)
+        self.assertEqual(data['filament_usage'][str(self.pink)]['grams'], Decimal('100.98') * 3 + Decimal('100') * 2)
+
+    def test_recorded_costs_survive_price_and_bom_changes(self):
+        InventoryService.create_sale(self.hide, 2, Decimal('100.00'))
+        hide_cost = self.hide.total_cost
+        recorded_pink = OrderLineFilament.get(OrderLineFilament.filament == self.pink)  # both parts' pink merged
+        self.assertEqual(recorded_pink.grams, Decimal('100.98') * 2)
+
+        # Later price rise and redesign must not rewrite the history
+        InventoryService.save_filament(self.pink.id, cost_per_roll=Decimal('30.00'))
+        self.widget.add_filament_usage(self.pink, 50)
+        (self.hide.parts[0].filament_usage[0]).delete_instance()
+
+        today = datetime.now()
+        data = AnalyticsService.get_analytics_data(today, today)
+        self.assertEqual(data['total_cost'], hide_cost * 2)
+        self.assertEqual(data['filament_usage'][str(self.black)]['grams'], Decimal('530.55') * 2)
+        self.assertEqual(data['filament_usage'][str(self.pink)]['grams'], Decimal('100.98') * 2)
+
+    def test_week_and_month_buckets(self):
+        # Monday 2024-03-04 and Sunday 2024-03-10 share a week; 2024-03-11 starts the next
+        for day, value in ((4, '10.00'), (10, '5.00'), (11, '1.50')):
+            Sale.create(product=self.widget, total_value=Decimal(value), date=datetime(2024, 3, day, 12))
+
+        weekly = AnalyticsService.get_analytics_data(datetime(2024, 3, 6), datetime(2024, 3, 31), 'week')
+        self.assertEqual(weekly['bucket'], 'week')
+        self.assertEqual({day: stats['revenue'] for day, stats in weekly['daily_stats'].items()},
+                         {'2024-03-04': Decimal('5.00'), '2024-03-11': Decimal('1.50')})
+
+        monthly = AnalyticsService.get_analytics_data(datetime(2024, 3, 1), datetime(2024, 3, 31), 'month')
+        self.assertEqual(monthly['daily_stats']['2024-03-01']['revenue'], Decimal('16.50'))
+        self.assertEqual(monthly['total_sales_count'], 3)
+
+    def test_choose_bucket(self):
+        start = datetime(2024, 1, 1)
+        self.assertEqual(AnalyticsService.choose_bucket(start, datetime(2024, 1, 31), 800), 'day')
+        self.assertEqual(AnalyticsService.choose_bucket(start, datetime(2025, 12, 31), 800), 'week')
+        self.assertEqual(AnalyticsService.choose_bucket(start, datetime(2025, 12, 31), 300), 'month')
+
+    def test_empty_range(self):
+        data = AnalyticsService.get_analytics_data(datetime(2024, 1, 1), datetime(2024, 1, 2))
+        self.assertEqual(data['total_sales_count'], 0)
+        self.assertEqual(data['daily_stats'], {})
+        self.assertEqual(data['net_profit'], Decimal('0.00'))
+
+if __name__ == '__main__':
+    unittest.main()
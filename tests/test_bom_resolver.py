@@ -0,0 +1,62 @@
+import unittest
+import os
+from decimal import Decimal
+
+# Set environment variable before importing models
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+from models import db, Filament, Product
+from database import reset_database
+from services.bom_resolver import BomResolver
+
+class TestBomResolver(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        db.connect(reuse_if_open=True)
+
+        self.black = Filament.create(brand="G", material="PLA", color="Black",
+                                     cost_per_roll=Decimal('14.28'), grams_per_roll=Decimal('1000'))
+        self.pink = Filament.create(brand="G", material="PLA", color="Pink",
+                                    cost_per_roll=Decimal('15.00'), grams_per_roll=Decimal('1000'))
+
+        # Product-level usage plus two parts sharing a filament
+        self.hide = Product.create(product_type="Gothic hide", size="XL", color_variant="Black/Pink")
+        self.hide.add_filament_usage(self.black, 10)
+        lid = self.hide.add_part("Lid", print_time_hours=9.62)
+        lid.add_filament_usage(self.black, 161.67)
+        lid.add_filament_usage(self.pink, 29.51)
+        base = self.hide.add_part("Base", print_time_hours=11)
+        base.add_filament_usage(self.black, 368.88)
+
+        self.widget = Product.create(product_type="Widget", size="M", color_variant="Pink")
+        self.widget.add_filament_usage(self.pink, 50)
+
+        self.empty = Product.create(product_type="Empty", size="S", color_variant="None")
+
+    def tearDown(self):
+        db.close()
+
+    def test_resolve_usage_combines_product_and_parts(self):
+        usage = BomResolver.resolve_usage([self.hide.id, self.widget.id])
+
+        self.assertEqual(usage[self.hide.id], {
+            self.black.id: Decimal('540.55'),
+            self.pink.id: Decimal('29.51'),
+        })
+        self.assertEqual(usage[self.widget.id], {self.pink.id: Decimal('50')})
+
+    def test_resolve_usage_requested_product_without_usage(self):
+        usage = BomResolver.resolve_usage([self.empty.id])
+        self.assertEqual(usage, {self.empty.id: {}})
+
+    def test_resolve_usage_whole_catalogue(self):
+        usage = BomResolver.resolve_usage()
+        self.assertEqual(set(usage), {self.hide.id, self.widget.id})
+
+    def test_resolve_filament_usage_matches_model_property(self):
+        usage = BomResolver.resolve_filament_usage([self.hide.id, self.widget.id])
+        for product in (self.hide, self.widget):
+            self.assertEqual(usage[product.id], product.total_filament_usage)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import os
+from decimal import Decimal
+
+# Set environment variable before importing models
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+from models import db, Filament, Product
+from database import reset_database
+from services.cost_cache import ProductCostCache, product_cost_cache
+from services.inventory_service import InventoryService
+from services.query_profiler import QueryProfiler
+
+
+class TestProductCostCache(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        db.connect(reuse_if_open=True)
+        self.fil = InventoryService.save_filament(
+            brand="G", material="PLA", color="Red", cost_per_roll=Decimal('20.00'),
+            grams_per_roll=Decimal('1000'), grams_remaining=Decimal('1000'), rolls_in_stock=1
+        )
+        self.product = InventoryService.save_product(None, {
+            'product_type': 'Widget', 'size': 'M', 'color_variant': 'Red'
+        }, [{'name': 'Body', 'print_time_hours': Decimal('1'), 'filament_usage': {self.fil: Decimal('100')}}])
+
+    def tearDown(self):
+        db.close()
+
+    def test_hits_misses_and_lru_eviction(self):
+        cache = ProductCostCache(max_size=1)
+        other = Product.create(product_type='Other', size='S', color_variant='Red')
+
+        self.assertEqual(cache.get(self.product.id).unit_cost, Decimal('2.00'))
+        with QueryProfiler() as profiler:
+            cache.get(self.product.id)
+        self.assertEqual(profiler.count, 0)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        self.assertEqual(cache.get(other.id).unit_cost, Decimal('0.00'))
+        stats = cache.stats()
+        self.assertEqual((stats['size'], stats['hits'], stats['misses']), (1, 1, 2))
+        cache.get(self.product.id)  # evicted, so resolved again
+        self.assertEqual(cache.misses, 3)
+
+    def test_invalidation_during_load_is_not_lost(self):
+        cache = ProductCostCache()
+
+        def load_then_invalidate(product_ids):
+            loaded = ProductCostCache.load(product_ids)
+            # A price edit lands on another thread after the BOM was read
+            cache.invalidate_filament(self.fil.id)
+            return loaded
+
+        cache.load = load_then_invalidate
+        cache.get(self.product.id)
+        self.assertEqual(cache.stats()['size'], 0)
+
+        del cache.load
+        cache.get(self.product.id)
+        self.assertEqual((cache.stats()['size'], cache.misses), (1, 2))
+
+    def test_product_edit_invalidates(self):
+        self.assertEqual(product_cost_cache.get(self.product.id).unit_cost, Decimal('2.00'))
+        part = self.product.parts[0]
+        InventoryService.save_product(self.product.id, {}, [
+            {'id': part.id, 'name': 'Body', 'filament_usage': {self.fil: Decimal('300')}}
+        ])
+        self.assertEqual(product_cost_cache.get(self.product.id).unit_cost, Decimal('6.00'))
+
+    def test_filament_price_edit_invalidates_but_stock_edit_does_not(self):
+        product_cost_cache.get(self.product.id)
+
+        InventoryService.set_filament_stock(self.fil, grams_remaining=Decimal('500'))
+        misses = product_cost_cache.misses
+        product_cost_cache.get(self.product.id)
+        self.assertEqual(product_cost_cache.misses, misses)
+
+        InventoryService.save_filament(self.fil.id, cost_per_roll=Decimal('30.00'))
+        self.assertEqual(product_cost_cache.get(self.product.id).unit_cost, Decimal('3.00'))
+        self.assertEqual(product_cost_cache.misses, misses + 1)
+
+    def test_delete_invalidates(self):
+        product_cost_cache.get(self.product.id)
+        InventoryService.delete_filament(self.fil.id)
+        self.assertEqual(product_cost_cache.get(self.product.id), (Decimal('0.00'), {}))
+
+        InventoryService.delete_product(self.product.id)
+        self.assertEqual(product_cost_cache.stats()['size'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
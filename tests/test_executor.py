@@ -0,0 +1,91 @@
+import unittest
+import os
+import tempfile
+import threading
+
+# Set environment variable before importing models
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+from models import db, Product
+from models.base import InstrumentedSqliteDatabase, set_database
+from database import reset_database
+from services.executor import ServiceExecutor
+from services.inventory_service import InventoryService
+from gui.main_window import MainWindow
+
+
+class TestServiceExecutor(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        db.connect(reuse_if_open=True)
+        Product.create(product_type="Widget", size="M", color_variant="Red")
+        self.executor = ServiceExecutor()
+
+    def tearDown(self):
+        self.executor.shutdown()
+        db.close()
+
+    def test_runs_on_worker_and_delivers_on_polling_thread(self):
+        results = []
+
+        def load():
+            return threading.current_thread().name, [str(p) for p in InventoryService.get_all_products()]
+
+        task = self.executor.submit(load, on_done=lambda result: results.append((threading.current_thread(), result)))
+        self.assertTrue(task.wait(5))
+        self.assertEqual(results, [])  # nothing is delivered until polled
+
+        self.assertEqual(self.executor.poll(), 1)
+        delivered_on, (worker_name, names) = results[0]
+        self.assertIs(delivered_on, threading.current_thread())
+        self.assertEqual(worker_name, "service-worker")
+        self.assertEqual(names, ["Widget - M - Red"])
+
+    def test_errors_go_to_on_error(self):
+        errors = []
+        task = self.executor.submit(lambda: 1 / 0, on_error=errors.append)
+        task.wait(5)
+        self.executor.poll()
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+    def test_cancelled_group_is_not_delivered(self):
+        gate = threading.Event()
+        delivered = []
+        blocker = self.executor.submit(gate.wait, 5)
+        stale = self.executor.submit(lambda: 'stale', on_done=delivered.append, group='analytics')
+        current = self.executor.submit(lambda: 'current', on_done=delivered.append, group='overview')
+
+        self.executor.cancel_group('analytics')
+        gate.set()
+        for task in (blocker, stale, current):
+            task.wait(5)
+        self.executor.poll()
+
+        self.assertEqual(delivered, ['current'])
+        self.assertIsNone(stale.result)  # skipped without running
+
+    def test_switching_database_on_worker(self):
+        # The worker holds a connection to the current database, as after any earlier task
+        self.executor.submit(InventoryService.get_all_products).wait(5)
+
+        new_path = os.path.join(tempfile.mkdtemp(), "switched.db")
+        self.addCleanup(set_database, 'test')
+        old_database = db.obj
+        db.close()
+        db.initialize(InstrumentedSqliteDatabase(new_path))
+
+        errors = []
+        task = self.executor.submit(MainWindow.switch_database, old_database, on_error=errors.append)
+        self.assertTrue(task.wait(5))
+        self.executor.poll()
+        self.assertEqual(errors, [])
+
+        task = self.executor.submit(lambda: (db.obj.database, Product.select().count()))
+        task.wait(5)
+        self.assertEqual(task.result, (new_path, 0))
+        db.connect(reuse_if_open=True)
+        self.assertEqual(Product.select().count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import os
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+# Set environment variable before importing models
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+from models import db, Product, Sale
+from database import reset_database
+from services.forecast_service import ForecastService
+from services.inventory_service import InventoryService
+from services.query_profiler import QueryProfiler
+
+
+class TestForecastService(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        db.connect(reuse_if_open=True)
+        self.steady = Product.create(product_type="Steady", size="M", color_variant="Black", inventory_count=50)
+        self.mondays = Product.create(product_type="Mondays", size="M", color_variant="Black")
+        self.unsold = Product.create(product_type="Unsold", size="M", color_variant="Black")
+
+        now = datetime.now()
+        # One sale a day for the last 28 days
+        for i in range(28):
+            Sale.create(product=self.steady, total_value=Decimal('10.00'), date=now - timedelta(days=i))
+        # Two sales every Monday for the last 12 weeks
+        last_monday = now - timedelta(days=now.weekday())
+        for week in range(12):
+            for _ in range(2):
+                Sale.create(product=self.mondays, total_value=Decimal('10.00'),
+                            date=last_monday - timedelta(weeks=week))
+
+    def tearDown(self):
+        db.close()
+
+    def test_forecasts_cover_every_product_in_one_query(self):
+        with QueryProfiler() as profiler:
+            forecast = ForecastService.get_forecasts(30)
+        self.assertEqual(profiler.count, 1)
+
+        self.assertEqual(sorted(forecast.product_ids.tolist()),
+                         sorted([self.steady.id, self.mondays.id, self.unsold.id]))
+        self.assertAlmostEqual(forecast.units(self.steady.id, 'moving_average'), 30.0)
+        for method in forecast.METHODS:
+            self.assertEqual(forecast.units(self.unsold.id, method), 0.0)
+
+    def test_weekday_seasonality(self):
+        forecast = ForecastService.get_forecasts(7)
+        row = forecast.product_ids.tolist().index(self.mondays.id)
+        # Horizon days start tomorrow; only the Monday gets demand
+        for offset, units in enumerate(forecast.seasonal_daily[row]):
+            if (date.today() + timedelta(days=offset + 1)).weekday() == 0:
+                self.assertGreater(units, 0)
+            else:
+                self.assertEqual(units, 0)
+        # The weekly total matches the smoothed level over the same week
+        self.assertAlmostEqual(forecast.units(self.mondays.id, 'seasonal'),
+                               forecast.units(self.mondays.id, 'exponential'))
+
+    def test_cached_until_next_sale(self):
+        first = ForecastService.get_forecasts(30)
+        with QueryProfiler() as profiler:
+            self.assertIs(ForecastService.get_forecasts(30), first)
+        self.assertEqual(profiler.count, 0)
+
+        InventoryService.create_sale(self.unsold, 3, Decimal('30.00'))
+        refreshed = ForecastService.get_forecasts(30)
+        self.assertIsNot(refreshed, first)
+        self.assertGreater(refreshed.units(self.unsold.id, 'moving_average'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
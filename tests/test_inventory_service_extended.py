@@ -6,9 +6,10 @@ from datetime import datetime, timedelta
 # Set environment variable before importing models
 os.environ['INVENTORYMANAGER_ENV'] = 'test'
 
-from models import db, Filament, Product, Sale, Part
+from models import db, Filament, Product, Sale, Part, Order
 from database import reset_database
 from services.inventory_service import InventoryService
+from services.query_profiler import QueryProfiler
 
 class TestInventoryService(unittest.TestCase):
     def setUp(self):
@@ -93,8 +94,7 @@ class TestInventoryService(unittest.TestCase):
         prod.add_filament_usage(fil, 100)
         
         # Record sale
-        sales = InventoryService.create_sale(prod, 1, 20.00)
-        sale = sales[0]
+        sale = InventoryService.create_sale(prod, 1, 20.00)
         
         # Check inventory after sale
         prod = Product.get_by_id(prod.id)
@@ -113,10 +113,68 @@ class TestInventoryService(unittest.TestCase):
         fil = Filament.get_by_id(fil.id)
         self.assertEqual(prod.inventory_count, 10)
         # Total filament: 1000g. 
-        # Since adjust_inventory(-100) on 900g remaining results in 1000g,
+        # Since adding back 100g to 900g remaining results in 1000g,
         # which is shifted to 1 roll and 0g remaining.
         self.assertEqual(fil.grams_remaining + (fil.rolls_in_stock * fil.grams_per_roll), 1000)
 
+    def test_update_sale_quantity_moves_stock(self):
+        fil = Filament.create(brand="G", material="PLA", color="White", cost_per_roll=10,
+                              grams_per_roll=1000, grams_remaining=1000, rolls_in_stock=0)
+        prod = Product.create(product_type='TestProd', size='L', color_variant='White', inventory_count=10)
+        prod.add_filament_usage(fil, 100)
+        sale = InventoryService.create_sale(prod, 3, 30.00)
+
+        InventoryService.update_sale(sale.id, quantity=5, total_value=Decimal('50.00'))
+
+        self.assertEqual(Product.get_by_id(prod.id).inventory_count, 5)
+        self.assertEqual(Filament.get_by_id(fil.id).grams_remaining, 500)
+        self.assertEqual(Sale.get_by_id(sale.id).quantity, 5)
+
+    def test_stock_edits_are_applied_together(self):
+        fil = Filament.create(brand="G", material="PLA", color="White", cost_per_roll=10,
+                              grams_per_roll=1000, grams_remaining=1000, rolls_in_stock=0)
+        prod = Product.create(product_type='TestProd', size='L', color_variant='White', inventory_count=10)
+        other = Product.create(product_type='TestProd', size='S', color_variant='White')
+        prod.add_part("Lid").add_filament_usage(fil, 100)
+
+        InventoryService.apply_stock_edits({prod: 4}, {fil: {'rolls_in_stock': 2, 'grams_remaining': Decimal('500')}})
+
+        fil = Filament.get_by_id(fil.id)
+        self.assertEqual((fil.rolls_in_stock, fil.grams_remaining), (2, 500))
+        self.assertEqual(Product.get_by_id(prod.id).inventory_count, 4)
+        self.assertEqual(InventoryService.products_using_filaments([fil.id]), {prod.id})
+
+        # A failing edit rolls back the whole batch
+        with self.assertRaises(Exception):
+            InventoryService.apply_stock_edits({other: 7}, {fil: {'rolls_in_stock': 'many'}})
+        self.assertEqual(Product.get_by_id(other.id).inventory_count, 0)
+
+    def test_delete_product_removes_its_empty_orders(self):
+        prod = Product.create(product_type='TestProd', size='L', color_variant='White', inventory_count=10)
+        other = Product.create(product_type='TestProd', size='S', color_variant='White', inventory_count=10)
+        InventoryService.create_sale(prod, 2, 20.00)
+        kept = InventoryService.create_sale(other, 1, 10.00)
+
+        InventoryService.delete_product(prod.id)
+
+        self.assertEqual([o.id for o in Order.select()], [kept.order_id])
+
+    def test_delete_sale_reverts_recorded_usage(self):
+        fil = Filament.create(brand="G", material="PLA", color="White", cost_per_roll=10,
+                              grams_per_roll=1000, grams_remaining=1000, rolls_in_stock=0)
+        prod = Product.create(product_type='TestProd', size='L', color_variant='White', inventory_count=10)
+        usage = prod.add_filament_usage(fil, 100)
+        sale = InventoryService.create_sale(prod, 1, 20.00)
+        self.assertEqual(sale.unit_cost, Decimal('1.00'))
+
+        # The BOM changes after the sale; deleting it puts back what it took
+        usage.grams_needed = 250
+        usage.save()
+        InventoryService.delete_sale(sale.id)
+
+        fil = Filament.get_by_id(fil.id)
+        self.assertEqual(fil.grams_remaining + fil.rolls_in_stock * fil.grams_per_roll, 1000)
+
     def test_analytics_data(self):
         prod = Product.create(product_type='TestProd', size='L', color_variant='White', print_time_hours=1.0)
         fil = Filament.create(brand="G", material="PLA", color="White", cost_per_roll=10, grams_per_roll=1000)
@@ -158,5 +216,31 @@ class TestInventoryService(unittest.TestCase):
         self.assertTrue(len(todo['to_order']) > 0)
         self.assertTrue(any(item['filament'].id == fil.id for item in todo['to_order']))
 
+    def test_sales_pages(self):
+        prod = Product.create(product_type='TestProd', size='L', color_variant='White')
+        now = datetime.now().replace(microsecond=0)
+        # Several sales share a timestamp, so the id tie-breaker decides their order
+        sales = [Sale.create(product=prod, total_value=Decimal('10.00'), date=now - timedelta(days=i // 3))
+                 for i in range(10)]
+
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            page, cursor = InventoryService.get_sales_page(cursor, limit=4)
+            seen.extend(page)
+            pages += 1
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, 3)
+        expected = sorted(sales, key=lambda s: (s.date, s.id), reverse=True)
+        self.assertEqual([s.id for s in seen], [s.id for s in expected])
+        # Labels need the product, which comes from the same query
+        with QueryProfiler() as profiler:
+            page, _ = InventoryService.get_sales_page(limit=4)
+            [str(sale) for sale in page]
+        self.assertEqual(profiler.count, 1)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+import os
+
+# Set environment variable before importing models
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+from models import db, Metadata, Filament, Product, Order, OrderLine, OrderLineFilament, DailySalesRollup
+from decimal import Decimal
+from datetime import datetime
+from database import initialize_database, reset_database, seed_example_data
+from database.migrations import apply_migrations, get_schema_version, set_schema_version, LATEST_VERSION
+from services.query_profiler import QueryProfiler
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        db.connect(reuse_if_open=True)
+
+    def tearDown(self):
+        db.close()
+
+    def line_indexes(self):
+        return {index.name for index in db.get_indexes('orderline')}
+
+    def use_unit_sale_table(self, version):
+        """Replaces the order tables with the one-row-per-unit sale table of schema `version` (1 or 2)."""
+        for table in ('orderlinefilament', 'orderline', 'order'):
+            db.execute_sql(f'DROP TABLE "{table}"')
+        cost_column = ', "unit_cost" DECIMAL(10, 2)' if version >= 2 else ''
+        db.execute_sql(
+            'CREATE TABLE "sale" ("id" INTEGER NOT NULL PRIMARY KEY, "date" DATETIME NOT NULL, '
+            '"product_id" INTEGER NOT NULL, "total_value" DECIMAL(10, 2) NOT NULL' + cost_column + ', '
+            'FOREIGN KEY ("product_id") REFERENCES "product" ("id") ON DELETE CASCADE)'
+        )
+        if version >= 2:
+            db.execute_sql(
+                'CREATE TABLE "salefilament" ("id" INTEGER NOT NULL PRIMARY KEY, "sale_id" INTEGER NOT NULL, '
+                '"filament_id" INTEGER NOT NULL, "grams" DECIMAL(10, 2) NOT NULL, "cost" DECIMAL(10, 4) NOT NULL)'
+            )
+        else:
+            db.execute_sql('ALTER TABLE "dailysalesrollup" DROP COLUMN "cost"')
+            db.execute_sql('ALTER TABLE "dailysalesrollup" DROP COLUMN "costed_units"')
+        set_schema_version(version)
+
+    def migrate(self):
+        db.close()
+        initialize_database()
+        db.connect(reuse_if_open=True)
+
+    def test_new_database_is_at_latest_version(self):
+        self.assertEqual(get_schema_version(), LATEST_VERSION)
+        self.assertTrue({'orderline_date', 'orderline_product_id_date'} <= self.line_indexes())
+        self.assertEqual(apply_migrations(), [])
+
+    def test_existing_database_is_migrated_on_startup(self):
+        # Simulate a database created before the indexes and the version table
+        self.use_unit_sale_table(1)
+        Metadata.drop_table()
+
+        self.migrate()
+
+        self.assertEqual(get_schema_version(), LATEST_VERSION)
+        self.assertTrue({'orderline_date', 'orderline_product_id_date'} <= self.line_indexes())
+        self.assertNotIn('sale', db.get_tables())
+
+    def test_sale_costs_are_backfilled(self):
+        fil = Filament.create(brand="G", material="PLA", color="White", cost_per_roll=10, grams_per_roll=1000)
+        prod = Product.create(product_type="Widget", size="M", color_variant="White")
+        prod.add_filament_usage(fil, 100)
+        prod.add_part("Lid").add_filament_usage(fil, 25.5)
+        self.use_unit_sale_table(1)
+        db.execute_sql('INSERT INTO "sale" ("date", "product_id", "total_value") VALUES (?, ?, ?)',
+                       ('2024-05-01 09:00:00', prod.id, '5.00'))
+
+        self.migrate()
+
+        self.assertEqual(OrderLine.get().unit_cost, Decimal('1.26'))
+        self.assertEqual([(lf.filament_id, lf.grams, lf.cost) for lf in OrderLineFilament.select()],
+                         [(fil.id, Decimal('125.50'), Decimal('1.2550'))])
+        rollup = DailySalesRollup.get()
+        self.assertEqual((rollup.units, rollup.cost, rollup.costed_units), (1, Decimal('1.26'), 1))
+
+        # The recreated triggers maintain the cost columns
+        OrderLine.create(product=prod, total_value=Decimal('10.00'), quantity=2, unit_cost=Decimal('2.00'),
+                         date=OrderLine.get().date)
+        rollup = DailySalesRollup.get()
+        self.assertEqual((rollup.units, rollup.cost, rollup.costed_units), (3, Decimal('5.26'), 3))
+
+    def test_unit_sales_are_collapsed_into_order_lines(self):
+        fil = Filament.create(brand="G", material="PLA", color="White", cost_per_roll=10, grams_per_roll=1000)
+        prod = Product.create(product_type="Widget", size="M", color_variant="White")
+        self.use_unit_sale_table(2)
+        # One create_sale of 3 units (each row got its own datetime.now()), then a single unit later the same day
+        units = [('2024-05-01 09:00:49.126941', '3.33'), ('2024-05-01 09:00:49.127353', '3.33'),
+                 ('2024-05-01 09:00:49.127575', '3.34'), ('2024-05-01 17:30:00.000000', '4.00')]
+        for sale_id, (date, value) in enumerate(units, start=1):
+            db.execute_sql('INSERT INTO "sale" ("id", "date", "product_id", "total_value", "unit_cost") '
+                           'VALUES (?, ?, ?, ?, ?)', (sale_id, date, prod.id, value, '1.00'))
+            db.execute_sql('INSERT INTO "salefilament" ("sale_id", "filament_id", "grams", "cost") '
+                           'VALUES (?, ?, ?, ?)', (sale_id, fil.id, '100.00', '1.0000'))
+
+        self.migrate()
+
+        lines = [(line.id, line.order_id, line.quantity, line.total_value)
+                 for line in OrderLine.select().order_by(OrderLine.id)]
+        self.assertEqual(lines, [(1, 1, 3, Decimal('10.00')), (4, 4, 1, Decimal('4.00'))])
+        self.assertEqual(Order.select().count(), 2)
+        self.assertEqual(OrderLineFilament.get(OrderLineFilament.line == 1).grams, Decimal('300.00'))
+        rollup = DailySalesRollup.get()
+        self.assertEqual((rollup.units, rollup.revenue, rollup.cost, rollup.costed_units),
+                         (4, Decimal('14.00'), Decimal('4.00'), 4))
+
+    def unit_create_sale(self, product, quantity, total_value):
+        """Writes a sale the way create_sale did before orders: one row per unit, each dated when written."""
+        unit_value = (total_value / quantity).quantize(Decimal('0.01'))
+        for i in range(quantity):
+            value = total_value - unit_value * (quantity - 1) if i == quantity - 1 else unit_value
+            db.execute_sql('INSERT INTO "sale" ("date", "product_id", "total_value") VALUES (?, ?, ?)',
+                           (str(datetime.now()), product.id, str(value)))
+
+    def test_unit_rows_written_by_create_sale_are_collapsed(self):
+        widget = Product.create(product_type="Widget", size="M", color_variant="White")
+        gadget = Product.create(product_type="Gadget", size="M", color_variant="White")
+        self.use_unit_sale_table(1)
+        self.unit_create_sale(widget, 3, Decimal('30.00'))
+        self.unit_create_sale(gadget, 2, Decimal('15.00'))
+        self.unit_create_sale(widget, 1, Decimal('12.00'))
+
+        self.migrate()
+
+        lines = [(line.product_id, line.quantity, line.total_value)
+                 for line in OrderLine.select().order_by(OrderLine.id)]
+        self.assertEqual(lines, [(widget.id, 3, Decimal('30.00')), (gadget.id, 2, Decimal('15.00')),
+                                 (widget.id, 1, Decimal('12.00'))])
+        self.assertEqual(Order.select().count(), 3)
+        self.assertEqual(DailySalesRollup.get(DailySalesRollup.product == widget).units, 4)
+
+    def test_warm_start_runs_one_query(self):
+        db.close()
+        with QueryProfiler() as profiler:
+            initialize_database()
+        self.assertEqual(profiler.count, 1)
+
+    def test_seeding_runs_once(self):
+        seed_example_data()
+        self.assertEqual(Metadata.get_value(Metadata.SEEDED), '1')
+        sales = OrderLine.select().count()
+
+        with QueryProfiler() as profiler:
+            seed_example_data()
+        self.assertEqual(profiler.count, 1)
+        self.assertEqual(OrderLine.select().count(), sales)
+        self.assertEqual(Product.select().count(), 1)
+
+    def test_date_range_query_uses_index(self):
+        plan = db.execute_sql(
+            'EXPLAIN QUERY PLAN SELECT * FROM orderline WHERE product_id = ? AND date >= ?', (1, '2024-01-01')
+        ).fetchall()
+        self.assertIn('orderline_product_id_date', ' '.join(str(row[-1]) for row in plan))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,8 +5,9 @@ from decimal import Decimal
 # Set environment variable before importing models
 os.environ['INVENTORYMANAGER_ENV'] = 'test'
 
-from models import db, Filament, Product
+from models import db, Filament, Product, StockMovement
 from database import reset_database
+from services.stock_ledger import StockLedger
 
 class TestModelLogic(unittest.TestCase):
     def setUp(self):
@@ -16,7 +17,11 @@ class TestModelLogic(unittest.TestCase):
     def tearDown(self):
         db.close()
 
-    def test_filament_adjust_inventory_depletion(self):
+    def move(self, fil, grams):
+        Filament.apply_stock_movements({fil.id: Decimal(str(grams))})
+        return Filament.get_by_id(fil.id)
+
+    def test_filament_stock_depletion(self):
         # 1 roll in stock + 500g remaining = 1500g total
         fil = Filament.create(
             brand="Test", material="PLA", color="Red", cost_per_roll=20,
@@ -24,7 +29,7 @@ class TestModelLogic(unittest.TestCase):
         )
         
         # Use 600g
-        fil.adjust_inventory(600)
+        fil = self.move(fil, 600)
         # Should use 500g from remaining, then 100g from the next roll
         # 1 roll used -> rolls_in_stock=0
         # New roll: 1000 - 100 = 900g
@@ -32,18 +37,18 @@ class TestModelLogic(unittest.TestCase):
         self.assertEqual(fil.grams_remaining, 900)
         
         # Use another 1000g? No, use 800g
-        fil.adjust_inventory(800)
+        fil = self.move(fil, 800)
         self.assertEqual(fil.rolls_in_stock, 0)
         self.assertEqual(fil.grams_remaining, 100)
         
         # Use 150g (depletes it)
-        fil.adjust_inventory(150)
+        fil = self.move(fil, 150)
         self.assertEqual(fil.rolls_in_stock, 0)
         self.assertEqual(fil.grams_remaining, -50) # It stays negative if no rolls left? 
-        # Actually, the logic is: while self.grams_remaining < 0 and self.rolls_in_stock > 0:
-        # So it will stay negative if no rolls in stock.
+        # Actually, rolls are only opened while rolls_in_stock > 0,
+        # so it stays negative if no rolls in stock.
 
-    def test_filament_adjust_inventory_reversal(self):
+    def test_filament_stock_reversal(self):
         # 0 rolls in stock + 100g remaining = 100g total
         fil = Filament.create(
             brand="Test", material="PLA", color="Red", cost_per_roll=20,
@@ -51,18 +56,40 @@ class TestModelLogic(unittest.TestCase):
         )
         
         # Add back 1000g
-        fil.adjust_inventory(-1000)
+        fil = self.move(fil, -1000)
         # 100 - (-1000) = 1100
         # 1100 >= 1000 -> rolls_in_stock=1, grams_remaining=100
         self.assertEqual(fil.rolls_in_stock, 1)
         self.assertEqual(fil.grams_remaining, 100)
 
-    def test_product_adjust_inventory(self):
+    def test_apply_stock_movements_multiple_filaments(self):
+        red = Filament.create(
+            brand="Test", material="PLA", color="Red", cost_per_roll=20,
+            grams_per_roll=1000, grams_remaining=200, rolls_in_stock=3
+        )
+        blue = Filament.create(
+            brand="Test", material="PLA", color="Blue", cost_per_roll=20,
+            grams_per_roll=1000, grams_remaining=100, rolls_in_stock=0
+        )
+        
+        # Red: 200 - 2500 opens three rolls at once -> 0 rolls, 700g
+        # Blue: 100 + 2300 moves two full rolls back into stock -> 2 rolls, 400g
+        new_stock = Filament.apply_stock_movements({red.id: Decimal('2500'), blue.id: Decimal('-2300')})
+        
+        red = Filament.get_by_id(red.id)
+        blue = Filament.get_by_id(blue.id)
+        self.assertEqual((red.rolls_in_stock, red.grams_remaining), (0, 700))
+        self.assertEqual((blue.rolls_in_stock, blue.grams_remaining), (2, 400))
+        self.assertEqual(new_stock[red.id].grams_delta, Decimal('500'))
+        self.assertEqual(new_stock[red.id].rolls_delta, -3)
+
+    def test_product_stock_moves(self):
         p = Product.create(product_type="Test", size="L", color_variant="X", inventory_count=10)
-        p.adjust_inventory(-3)
+        StockLedger.move_product(p, -3, StockMovement.ADJUST)
         self.assertEqual(p.inventory_count, 7)
-        p.adjust_inventory(5)
+        StockLedger.move_product(p, 5, StockMovement.ADJUST)
         self.assertEqual(p.inventory_count, 12)
+        self.assertEqual(Product.get_by_id(p.id).inventory_count, 12)
 
 if __name__ == '__main__':
     unittest.main()
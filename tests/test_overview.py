@@ -5,7 +5,7 @@ from decimal import Decimal
 # Set environment variable before importing models
 os.environ['INVENTORYMANAGER_ENV'] = 'test'
 
-from models import db, Filament, Product, Part, Sale
+from models import db, Filament, Product, Part, OrderLine, DailySalesRollup
 from database import reset_database
 from services.inventory_service import InventoryService
 
@@ -46,27 +46,37 @@ class TestOverviewLogic(unittest.TestCase):
         p = Product.create(product_type="Widget", size="M", color_variant="Red", inventory_count=10)
         
         # Test creating a sale for 3 widgets, total $45
-        sales = InventoryService.create_sale(p, 3, 45.00)
+        sale = InventoryService.create_sale(p, 3, 45.00)
         
-        # Verify 3 sale records were created
-        self.assertEqual(len(sales), 3)
-        for s in sales:
-            self.assertEqual(s.total_value, Decimal('15.00'))
-            self.assertEqual(s.product, p)
+        # Verify one order line was created for the whole quantity
+        self.assertEqual(OrderLine.select().count(), 1)
+        self.assertEqual(sale.quantity, 3)
+        self.assertEqual(sale.total_value, Decimal('45.00'))
+        self.assertEqual(sale.product, p)
+        self.assertEqual(list(sale.order.lines), [sale])
         
         # Verify inventory decrement
         p_refreshed = Product.get_by_id(p.id)
         self.assertEqual(p_refreshed.inventory_count, 7)
 
-    def test_sale_creation_precision(self):
+    def test_sale_keeps_exact_total(self):
         p = Product.create(product_type="Widget", size="M", color_variant="Red", inventory_count=10)
         
-        # Test creating a sale for 3 widgets, total $10 (should split as 3.33, 3.33, 3.34)
-        sales = InventoryService.create_sale(p, 3, 10.00)
+        # $10 for 3 widgets is stored as the line total, not split into rounded unit values
+        sale = InventoryService.create_sale(p, 3, 10.00)
         
-        values = sorted([s.total_value for s in sales])
-        self.assertEqual(values, [Decimal('3.33'), Decimal('3.33'), Decimal('3.34')])
-        self.assertEqual(sum(values), Decimal('10.00'))
+        stored = OrderLine.get_by_id(sale.id)
+        self.assertEqual((stored.quantity, stored.total_value), (3, Decimal('10.00')))
+
+    def test_large_sale_is_one_row(self):
+        p = Product.create(product_type="Widget", size="M", color_variant="Red", inventory_count=1000)
+        
+        sale = InventoryService.create_sale(p, 700, 1400.00)
+        
+        self.assertEqual(OrderLine.select().where(OrderLine.product == p).count(), 1)
+        self.assertEqual(OrderLine.get_by_id(sale.id).quantity, 700)
+        self.assertEqual(DailySalesRollup.get(DailySalesRollup.product == p).units, 700)
+        self.assertEqual(Product.get_by_id(p.id).inventory_count, 300)
 
 if __name__ == '__main__':
     unittest.main()
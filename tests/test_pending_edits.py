@@ -0,0 +1,69 @@
+import unittest
+
+from gui.pending_edits import PendingEdits
+
+
+class _Widget:
+    """Stands in for a tkinter widget: after() callbacks only run when fire() is called."""
+
+    def __init__(self):
+        self.timers = {}
+        self._next_id = 0
+
+    def after(self, ms, callback):
+        self._next_id += 1
+        self.timers[self._next_id] = callback
+        return self._next_id
+
+    def after_cancel(self, timer_id):
+        del self.timers[timer_id]
+
+    def fire(self):
+        for callback in list(self.timers.values()):
+            callback()
+        self.timers.clear()
+
+
+class TestPendingEdits(unittest.TestCase):
+    def setUp(self):
+        self.widget = _Widget()
+        self.applied = []
+        self.edits = PendingEdits(self.widget, self.applied.append)
+
+    def test_edits_are_coalesced_per_entity(self):
+        self.edits.put(('product', 1), 'inventory_count', 4)
+        self.edits.put(('filament', 2), 'rolls_in_stock', 1)
+        self.edits.put(('product', 1), 'inventory_count', 5)
+        self.edits.put(('filament', 2), 'grams_remaining', 300)
+
+        self.assertEqual(self.applied, [])
+        self.assertEqual(len(self.widget.timers), 1)  # each edit restarts the one idle timer
+        self.widget.fire()
+
+        self.assertEqual(self.applied, [{
+            ('product', 1): {'inventory_count': 5},
+            ('filament', 2): {'rolls_in_stock': 1, 'grams_remaining': 300},
+        }])
+        self.assertEqual(len(self.edits), 0)
+
+    def test_flush_applies_at_once_and_stops_the_timer(self):
+        self.edits.put(('product', 1), 'inventory_count', 4)
+        self.edits.flush()
+        self.edits.flush()
+
+        self.assertEqual(self.applied, [{('product', 1): {'inventory_count': 4}}])
+        self.assertEqual(self.widget.timers, {})
+
+    def test_discarded_edits_are_not_applied(self):
+        self.edits.put(('product', 1), 'inventory_count', 4)
+        self.assertEqual(self.edits.get(('product', 1), 'inventory_count', 0), 4)
+        self.edits.discard(('product', 1), 'inventory_count')
+
+        self.assertEqual(self.edits.get(('product', 1), 'inventory_count', 0), 0)
+        self.assertEqual(self.widget.timers, {})
+        self.edits.flush()
+        self.assertEqual(self.applied, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Set environment variable before importing models
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+from models import db, Filament, Product, Sale
+from database import reset_database
+from services.planning_service import PlanningService
+from services.inventory_service import InventoryService
+
+
+class TestPlanningService(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        db.connect(reuse_if_open=True)
+        self.pla = Filament.create(brand="G", material="PLA", color="White", cost_per_roll=10,
+                                   grams_per_roll=1000, grams_remaining=0, rolls_in_stock=0)
+        self.petg = Filament.create(brand="G", material="PETG", color="Black", cost_per_roll=10,
+                                    grams_per_roll=1000, grams_remaining=500, rolls_in_stock=2)
+
+    def tearDown(self):
+        db.close()
+
+    def test_usage_matrix(self):
+        prod = Product.create(product_type='Box', size='L', color_variant='White')
+        prod.add_filament_usage(self.pla, Decimal('12.5'))
+        part = prod.add_part('Lid')
+        part.add_filament_usage(self.pla, Decimal('2.25'))
+        part.add_filament_usage(self.petg, 4)
+
+        usage = PlanningService.usage_matrix([prod.id], [self.pla.id, self.petg.id])
+        self.assertEqual(usage.centigrams.tolist(), [[1475, 400]])
+
+    def test_print_list_target_and_buffer_without_sales(self):
+        prod = Product.create(product_type='Box', size='L', color_variant='White', inventory_count=1)
+        prod.add_filament_usage(self.pla, 100)
+
+        todo = PlanningService.get_todo_data()
+
+        self.assertEqual([p.id for p in todo['to_print']], [prod.id])
+        # 2 units to reach the minimum stock plus a 6-unit reserve, nothing in stock
+        self.assertEqual(len(todo['to_order']), 1)
+        self.assertEqual(todo['to_order'][0]['filament'].id, self.pla.id)
+        self.assertEqual(todo['to_order'][0]['grams'], Decimal('800.00'))
+        self.assertEqual(todo['to_order'][0]['rolls'], 1)
+
+    def test_forecast_demand_is_planned(self):
+        prod = Product.create(product_type='Box', size='L', color_variant='White', inventory_count=5)
+        prod.add_filament_usage(self.pla, 10)
+        now = datetime.now()
+        for i in range(182):
+            Sale.create(product=prod, total_value=Decimal('10.00'), date=now - timedelta(days=i))
+
+        todo = PlanningService.get_todo_data()
+
+        self.assertEqual(todo['to_print'], [])
+        # Forecast of 30 units against 5 in stock, plus the reserve: 25 * 10 g + 6 * 10 g
+        self.assertEqual(todo['to_order'][0]['grams'], Decimal('310.00'))
+
+    def test_printable_counts_report_bottleneck(self):
+        # PLA: nothing in stock; PETG: 2500 g
+        box = Product.create(product_type='Box', size='L', color_variant='Black')
+        box.add_filament_usage(self.petg, 300)
+        lamp = Product.create(product_type='Lamp', size='L', color_variant='Mixed')
+        lamp.add_filament_usage(self.petg, 100)
+        lamp.add_filament_usage(self.pla, 50)
+        bare = Product.create(product_type='Bare', size='L', color_variant='None')
+
+        capacity = InventoryService.calculate_printable_counts([box, lamp, bare])
+
+        self.assertEqual(capacity[box.id].count, 8)
+        self.assertEqual(capacity[box.id].bottleneck.id, self.petg.id)
+        self.assertEqual(capacity[lamp.id].count, 0)
+        self.assertEqual(capacity[lamp.id].bottleneck.id, self.pla.id)
+        self.assertEqual(capacity[bare.id], (0, None))
+        self.assertEqual(InventoryService.calculate_printable_count(box), 8)
+
+if __name__ == '__main__':
+    unittest.main()
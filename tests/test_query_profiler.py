@@ -0,0 +1,57 @@
+import unittest
+import os
+from decimal import Decimal
+
+# Set environment variable before importing models
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+from models import db, Filament, Product
+from database import reset_database
+from services.inventory_service import InventoryService
+from services.query_profiler import QueryProfiler, enable_service_profiling, statement_shape
+
+class TestQueryProfiler(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        db.connect(reuse_if_open=True)
+
+        fil = Filament.create(brand="G", material="PLA", color="White", cost_per_roll=Decimal('10.00'),
+                              grams_per_roll=Decimal('1000'), grams_remaining=Decimal('100'), rolls_in_stock=0)
+        self.products = []
+        for i in range(10):
+            prod = Product.create(product_type="Widget", size=str(i), color_variant="White", inventory_count=1)
+            for name in ("Lid", "Base"):
+                prod.add_part(name).add_filament_usage(fil, 50)
+            self.products.append(prod)
+
+    def tearDown(self):
+        enable_service_profiling(False)
+        db.close()
+
+    def test_todo_query_count_is_independent_of_catalogue_size(self):
+        with QueryProfiler() as profiler:
+            InventoryService.get_todo_data()
+        profiler.assert_max_queries(6)
+
+    def test_detects_n_plus_one_property_chains(self):
+        with QueryProfiler() as profiler:
+            for prod in self.products:
+                prod.total_filament_usage
+        self.assertTrue(profiler.suspected_n_plus_one())
+        with self.assertRaises(AssertionError):
+            profiler.assert_max_queries(6)
+
+    def test_shape_ignores_values_and_list_lengths(self):
+        self.assertEqual(
+            statement_shape('SELECT * FROM "t" WHERE ("id" IN (?, ?, ?))'),
+            statement_shape('SELECT * FROM "t" WHERE ("id" IN (?))')
+        )
+
+    def test_service_calls_log_summary_when_enabled(self):
+        enable_service_profiling(True)
+        with self.assertLogs('services.query_profiler', level='INFO') as logs:
+            InventoryService.calculate_printable_count(self.products[0])
+        self.assertTrue(any('InventoryService.calculate_printable_count' in line for line in logs.output))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+
+from gui.sales_chart import daily_series, downsample_minmax
+
+
+class TestDailySeries(unittest.TestCase):
+    def test_fills_every_day_in_range(self):
+        stats = {
+            '2024-03-02': {'revenue': Decimal('10.50'), 'profit': Decimal('4.00')},
+            '2024-03-04': {'revenue': Decimal('5.00'), 'profit': Decimal('-1.00')},
+            '2024-04-01': {'revenue': Decimal('99.00'), 'profit': Decimal('99.00')},  # outside the range
+        }
+        dates, revenue, profit = daily_series(stats, datetime(2024, 3, 1, 15, 30), datetime(2024, 3, 4))
+
+        self.assertEqual(dates[0], np.datetime64('2024-03-01'))
+        self.assertEqual(len(dates), 4)
+        np.testing.assert_array_equal(revenue, [0.0, 10.5, 0.0, 5.0])
+        np.testing.assert_array_equal(profit, [0.0, 4.0, 0.0, -1.0])
+
+    def test_empty_stats(self):
+        dates, revenue, profit = daily_series({}, datetime(2024, 3, 1), datetime(2024, 3, 3))
+        self.assertEqual(len(dates), 3)
+        self.assertFalse(revenue.any() or profit.any())
+
+    def test_week_and_month_buckets(self):
+        stats = {'2024-02-26': {'revenue': 7, 'profit': 1}}
+        dates, revenue, _ = daily_series(stats, datetime(2024, 3, 1), datetime(2024, 3, 14), 'week')
+        np.testing.assert_array_equal(dates, np.array(['2024-02-26', '2024-03-04', '2024-03-11'], dtype='datetime64[D]'))
+        np.testing.assert_array_equal(revenue, [7.0, 0.0, 0.0])
+
+        dates, _, _ = daily_series({}, datetime(2023, 11, 15), datetime(2024, 2, 1), 'month')
+        self.assertEqual([str(d) for d in dates], ['2023-11-01', '2023-12-01', '2024-01-01', '2024-02-01'])
+
+
+class TestDownsampleMinMax(unittest.TestCase):
+    def test_keeps_extremes_in_order(self):
+        x = np.arange(1000, dtype=float)
+        y = np.sin(x / 20)
+        y[137] = 50.0
+        y[612] = -50.0
+        dx, dy = downsample_minmax(x, y, 100)
+
+        self.assertLessEqual(len(dx), 100)
+        self.assertTrue(np.all(np.diff(dx) > 0))
+        self.assertIn(137.0, dx)
+        self.assertIn(612.0, dx)
+        self.assertEqual(dy.max(), 50.0)
+        self.assertEqual(dy.min(), -50.0)
+
+    def test_short_series_unchanged(self):
+        x = np.arange(10.0)
+        dx, dy = downsample_minmax(x, x * 2, 100)
+        self.assertIs(dx, x)
+
+
+if __name__ == '__main__':
+    unittest.main()
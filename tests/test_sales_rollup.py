@@ -0,0 +1,58 @@
+import unittest
+import os
+from decimal import Decimal
+from datetime import datetime, date
+
+# Set environment variable before importing models
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+from models import db, Product, Sale, DailySalesRollup
+from database import reset_database, rebuild_sales_rollup
+from services.inventory_service import InventoryService
+
+class TestDailySalesRollup(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        db.connect(reuse_if_open=True)
+        self.widget = Product.create(product_type="Widget", size="M", color_variant="Red", inventory_count=10)
+        self.gadget = Product.create(product_type="Gadget", size="S", color_variant="Blue", inventory_count=10)
+
+    def tearDown(self):
+        db.close()
+
+    def rollup(self):
+        return {
+            (r.date, r.product_id): (r.units, r.revenue)
+            for r in DailySalesRollup.select()
+        }
+
+    def test_create_sale_updates_rollup(self):
+        InventoryService.create_sale(self.widget, 3, 10.00)
+        InventoryService.create_sale(self.widget, 1, 5.00)
+
+        self.assertEqual(self.rollup(), {(date.today(), self.widget.id): (4, Decimal('15.00'))})
+
+    def test_update_and_delete_sale_move_rollup_rows(self):
+        sale = InventoryService.create_sale(self.widget, 1, 20.00)
+        InventoryService.update_sale(sale.id, product=self.gadget, date=datetime(2024, 5, 1, 12, 0),
+                                     total_value=Decimal('25.00'))
+
+        self.assertEqual(self.rollup(), {(date(2024, 5, 1), self.gadget.id): (1, Decimal('25.00'))})
+
+        InventoryService.delete_sale(sale.id)
+        self.assertEqual(self.rollup(), {})
+
+    def test_rebuild_matches_incremental_rollup(self):
+        for day in (1, 1, 2):
+            Sale.create(product=self.widget, total_value=Decimal('3.33'), date=datetime(2024, 5, day, 9, 0))
+        Sale.create(product=self.gadget, total_value=Decimal('7.50'), date=datetime(2024, 5, 2, 18, 0))
+        incremental = self.rollup()
+
+        DailySalesRollup.delete().execute()
+        rebuild_sales_rollup()
+
+        self.assertEqual(self.rollup(), incremental)
+        self.assertEqual(incremental[(date(2024, 5, 1), self.widget.id)], (2, Decimal('6.66')))
+
+if __name__ == '__main__':
+    unittest.main()
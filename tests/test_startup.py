@@ -0,0 +1,20 @@
+import unittest
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStartupImports(unittest.TestCase):
+    def test_main_window_defers_views_and_matplotlib(self):
+        # A fresh interpreter, since this test session may already have imported them
+        code = (
+            "import sys, main\n"
+            "loaded = [m for m in ('matplotlib', 'gui.analytics_view', 'gui.sales_view') if m in sys.modules]\n"
+            "print(','.join(loaded))\n"
+        )
+        env = dict(os.environ, INVENTORYMANAGER_ENV='test')
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "")
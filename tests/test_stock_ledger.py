@@ -0,0 +1,97 @@
+import unittest
+import os
+from decimal import Decimal
+from datetime import datetime, timedelta
+
+# Set environment variable before importing models
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+from models import db, Filament, Product, StockMovement, StockSnapshot
+from database import reset_database
+from services.inventory_service import InventoryService
+from services.stock_ledger import StockLedger
+import services.stock_ledger as stock_ledger
+from models.base import add_query_listener, remove_query_listener
+
+class TestStockLedger(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        db.connect(reuse_if_open=True)
+        self.fil = InventoryService.save_filament(
+            brand="G", material="PLA", color="White", cost_per_roll=Decimal('10.00'),
+            grams_per_roll=Decimal('1000'), grams_remaining=Decimal('500'), rolls_in_stock=1
+        )
+        self.prod = InventoryService.save_product(product_data={
+            'product_type': 'Widget', 'size': 'M', 'color_variant': 'White', 'inventory_count': 10
+        })
+        self.prod.add_filament_usage(self.fil, 200)
+
+    def tearDown(self):
+        db.close()
+
+    def test_sales_purchases_and_adjustments_are_recorded(self):
+        sale = InventoryService.create_sale(self.prod, 3, 30.00)
+        InventoryService.delete_sale(sale.id)
+        InventoryService.record_filament_purchase(self.fil.id, 2)
+        InventoryService.set_product_inventory(self.prod, 4)
+
+        reasons = [m.reason for m in StockMovement.select().order_by(StockMovement.id)]
+        self.assertEqual(reasons, [
+            StockMovement.ADJUST, StockMovement.ADJUST,             # initial stock
+            StockMovement.SALE, StockMovement.SALE,                 # product, filament
+            StockMovement.SALE_DELETE, StockMovement.SALE_DELETE,
+            StockMovement.PURCHASE,
+            StockMovement.ADJUST,
+        ])
+        fil = Filament.get_by_id(self.fil.id)
+        self.assertEqual(fil.rolls_in_stock, 3)
+        self.assertEqual(Product.get_by_id(self.prod.id).inventory_count, 4)
+
+    def test_stock_at_replays_from_snapshot_and_backwards(self):
+        InventoryService.create_sale(self.prod, 2, 20.00)   # 500 + 1000 - 400 -> 100g, 1 roll
+        middle = datetime.now()
+        StockLedger.take_snapshot()
+        InventoryService.create_sale(self.prod, 1, 10.00)   # -> 900g, 0 rolls
+
+        future = StockLedger.stock_at(datetime.now() + timedelta(seconds=1))
+        self.assertEqual(future['filaments'][self.fil.id], (Decimal('900'), 0))
+        self.assertEqual(future['products'][self.prod.id], 7)
+
+        # No snapshot at or before `middle`: replays backwards from current stock
+        past = StockLedger.stock_at(middle)
+        self.assertEqual(past['filaments'][self.fil.id], (Decimal('100'), 1))
+        self.assertEqual(past['products'][self.prod.id], 8)
+
+        before_anything = StockLedger.stock_at(datetime.now() - timedelta(days=1))
+        self.assertEqual(before_anything['products'][self.prod.id], 0)
+
+    def test_snapshots_are_taken_periodically(self):
+        original = stock_ledger.SNAPSHOT_INTERVAL
+        stock_ledger.SNAPSHOT_INTERVAL = 3
+        try:
+            for _ in range(3):
+                InventoryService.create_sale(self.prod, 1, 10.00)
+        finally:
+            stock_ledger.SNAPSHOT_INTERVAL = original
+
+        self.assertTrue(StockSnapshot.select().exists())
+        latest = StockLedger.stock_at(datetime.now() + timedelta(seconds=1))
+        self.assertEqual(latest['products'][self.prod.id], 7)
+
+    def test_sales_take_the_write_lock_before_reading_stock(self):
+        statements = []
+
+        def listener(sql, params, seconds):
+            statements.append(sql)
+
+        add_query_listener(listener)
+        try:
+            sale = InventoryService.create_sale(self.prod, 1, 10.00)
+            InventoryService.update_sale(sale.id, quantity=2)
+            InventoryService.delete_sale(sale.id)
+        finally:
+            remove_query_listener(listener)
+        self.assertEqual([sql for sql in statements if sql.startswith('BEGIN')], ['BEGIN IMMEDIATE'] * 3)
+
+if __name__ == '__main__':
+    unittest.main()
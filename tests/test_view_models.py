@@ -0,0 +1,65 @@
+import unittest
+import os
+
+# Set environment variable before importing models
+os.environ['INVENTORYMANAGER_ENV'] = 'test'
+
+from models import db, Product
+from models.base import data_version
+from database import reset_database
+from gui.view_models import ViewModelCache
+from services.inventory_service import InventoryService
+
+
+class _View:
+    """Stands in for a view outside MainWindow: no executor, so loads run synchronously."""
+
+    def winfo_toplevel(self):
+        return self
+
+
+class TestViewModelCache(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        db.connect(reuse_if_open=True)
+        self.product = Product.create(product_type="Widget", size="M", color_variant="Red")
+        self.cache = ViewModelCache()
+        self.view = _View()
+        self.fetches = 0
+        self.rendered = []
+
+    def tearDown(self):
+        db.close()
+
+    def fetch(self):
+        self.fetches += 1
+        return [p.inventory_count for p in InventoryService.get_all_products()]
+
+    def load(self, view=None):
+        self.cache.load(view or self.view, "products", self.fetch, self.rendered.append)
+
+    def test_unchanged_data_is_not_fetched_again(self):
+        self.load()
+        self.load()
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual(self.rendered, [[0]])
+
+    def test_write_through_service_revalidates(self):
+        self.load()
+        version = data_version()
+        InventoryService.set_product_inventory(self.product, 5)
+        self.assertGreater(data_version(), version)
+
+        self.load()
+        self.assertEqual(self.fetches, 2)
+        self.assertEqual(self.rendered, [[0], [5]])
+
+    def test_snapshot_rendered_before_revalidating(self):
+        self.load()
+        other = _View()
+        InventoryService.set_product_inventory(self.product, 5)
+
+        # A view that has not shown the snapshot gets it first, then the fresh data
+        self.load(other)
+        self.assertEqual(self.rendered, [[0], [0], [5]])
+        self.assertTrue(self.cache.is_current("products"))